@@ -16,10 +16,17 @@ load_dotenv()
 # Import SQLModel and all models
 from sqlmodel import SQLModel
 
+# Also registers op.create_month_partitions / op.archive_month_partitions
+from app.db.partitions import is_partition
 from app.schemas.feedback import Feedback
-from app.schemas.homework import HomeworkTask
+from app.schemas.homework import (
+    TITLE_TRIGRAM_INDEX,
+    HomeworkAssignment,
+    HomeworkTask,
+)
 from app.schemas.submission import Submission
 from app.schemas.user import User
+from app.schemas.views import StudentDashboard, TeacherInbox
 
 # this is the Alembic Config object
 config = context.config
@@ -35,6 +42,20 @@ config.set_main_option("sqlalchemy.url", os.getenv("DATABASE_URL"))
 target_metadata = SQLModel.metadata
 
 
+def include_object(object, name, type_, reflected, compare_to):
+    # Created by DDL, and only where pg_trgm is available (see
+    # app/schemas/homework.py), so it isn't in the metadata
+    if type_ == "index" and name == TITLE_TRIGRAM_INDEX:
+        return False
+    # Monthly partitions and their indexes, created as months come (see
+    # app/db/partitions.py)
+    if type_ == "table":
+        return not is_partition(name)
+    if type_ in ("index", "unique_constraint", "foreign_key_constraint"):
+        return not is_partition(object.table.name)
+    return True
+
+
 def run_migrations_offline() -> None:
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
@@ -42,6 +63,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -56,7 +78,11 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
+        )
 
         with context.begin_transaction():
             context.run_migrations()
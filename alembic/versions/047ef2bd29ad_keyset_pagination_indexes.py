@@ -0,0 +1,52 @@
+"""keyset_pagination_indexes
+
+Revision ID: 047ef2bd29ad
+Revises: df194054ed21
+Create Date: 2026-10-17 09:12:41.118305
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "047ef2bd29ad"
+down_revision: Union[str, None] = "df194054ed21"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # List endpoints page on (created_at, id) within their filter column
+    op.create_index("ix_user_created_at_id", "user", ["created_at", "id"])
+    op.create_index("ix_user_role_created_at_id", "user", ["role", "created_at", "id"])
+    op.create_index(
+        "ix_homeworktask_teacher_id_created_at_id",
+        "homeworktask",
+        ["teacher_id", "created_at", "id"],
+    )
+    op.create_index(
+        "ix_submission_student_id_created_at_id",
+        "submission",
+        ["student_id", "created_at", "id"],
+    )
+    op.create_index(
+        "ix_submission_teacher_id_created_at_id",
+        "submission",
+        ["teacher_id", "created_at", "id"],
+    )
+    op.create_index(
+        "ix_feedback_submission_id_created_at_id",
+        "feedback",
+        ["submission_id", "created_at", "id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_feedback_submission_id_created_at_id", table_name="feedback")
+    op.drop_index("ix_submission_teacher_id_created_at_id", table_name="submission")
+    op.drop_index("ix_submission_student_id_created_at_id", table_name="submission")
+    op.drop_index("ix_homeworktask_teacher_id_created_at_id", table_name="homeworktask")
+    op.drop_index("ix_user_role_created_at_id", table_name="user")
+    op.drop_index("ix_user_created_at_id", table_name="user")
@@ -0,0 +1,102 @@
+"""homework_assignment_table
+
+Revision ID: 5b9e3c7a1d42
+Revises: 047ef2bd29ad
+Create Date: 2026-10-17 11:03:27.514092
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5b9e3c7a1d42"
+down_revision: Union[str, None] = "047ef2bd29ad"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "homework_assignment",
+        sa.Column("homework_id", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("student_id", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column(
+            "status",
+            postgresql.ENUM(
+                "COMPLETED", "PENDING", "CANCELLED", name="status", create_type=False
+            ),
+            nullable=False,
+        ),
+        sa.Column("assigned_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["homework_id"],
+            ["homeworktask.id"],
+        ),
+        sa.ForeignKeyConstraint(
+            ["student_id"],
+            ["user.id"],
+        ),
+        sa.PrimaryKeyConstraint("homework_id", "student_id"),
+    )
+    op.create_index(
+        "ix_homework_assignment_student_id",
+        "homework_assignment",
+        ["student_id", "homework_id"],
+    )
+
+    # Backfill one row per (homework, student) from the array. A student is
+    # done once their submission has feedback, i.e. the submission is completed.
+    # Ids in the array that don't reference a user are dropped.
+    op.execute("""
+        INSERT INTO homework_assignment (homework_id, student_id, status, assigned_at)
+        SELECT DISTINCT ON (hw.id, assigned.student_id)
+            hw.id,
+            assigned.student_id,
+            CASE
+                WHEN EXISTS (
+                    SELECT 1 FROM submission s
+                    WHERE s.homework_task_id = hw.id
+                      AND s.student_id = assigned.student_id
+                      AND s.status = 'COMPLETED'
+                ) THEN 'COMPLETED'::status
+                ELSE 'PENDING'::status
+            END,
+            hw.created_at
+        FROM homeworktask hw
+        CROSS JOIN LATERAL unnest(hw.student_ids) AS assigned(student_id)
+        JOIN "user" u ON u.id = assigned.student_id
+        """)
+
+    op.drop_column("homeworktask", "student_ids")
+
+
+def downgrade() -> None:
+    op.add_column(
+        "homeworktask",
+        sa.Column(
+            "student_ids",
+            sa.ARRAY(sa.String()),
+            nullable=False,
+            server_default="{}",
+        ),
+    )
+    op.execute("""
+        UPDATE homeworktask hw
+        SET student_ids = assigned.student_ids
+        FROM (
+            SELECT homework_id, array_agg(student_id ORDER BY assigned_at) AS student_ids
+            FROM homework_assignment
+            GROUP BY homework_id
+        ) AS assigned
+        WHERE assigned.homework_id = hw.id
+        """)
+    op.alter_column("homeworktask", "student_ids", server_default=None)
+
+    op.drop_index("ix_homework_assignment_student_id", table_name="homework_assignment")
+    op.drop_table("homework_assignment")
@@ -0,0 +1,55 @@
+"""change_seq
+
+Revision ID: 5db0c4af4c8a
+Revises: bd3c01eea0b4
+Create Date: 2026-10-17 09:30:01.310366
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.schema import CreateSequence, DropSequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5db0c4af4c8a"
+down_revision: Union[str, None] = "bd3c01eea0b4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CHANGE_SEQ = sa.Sequence("change_seq")
+# table -> user columns of its `(<column>, change_seq)` indexes
+INDEXED_BY = {
+    "homeworktask": ["teacher_id"],
+    "submission": ["student_id", "teacher_id"],
+    "feedback": ["student_id", "teacher_id"],
+}
+
+
+def upgrade() -> None:
+    op.execute(CreateSequence(CHANGE_SEQ))
+    for table, columns in INDEXED_BY.items():
+        # A volatile default: existing rows are rewritten, each taking a value
+        op.add_column(
+            table,
+            sa.Column(
+                "change_seq",
+                sa.BigInteger(),
+                server_default=sa.text("nextval('change_seq')"),
+                nullable=False,
+            ),
+        )
+        for column in columns:
+            op.create_index(
+                f"ix_{table}_{column}_change_seq", table, [column, "change_seq"]
+            )
+
+
+def downgrade() -> None:
+    for table, columns in INDEXED_BY.items():
+        for column in columns:
+            op.drop_index(f"ix_{table}_{column}_change_seq", table_name=table)
+        op.drop_column(table, "change_seq")
+    op.execute(DropSequence(CHANGE_SEQ))
@@ -0,0 +1,30 @@
+"""updated_at_indexes
+
+Revision ID: 9bc23069e77d
+Revises: 5db0c4af4c8a
+Create Date: 2026-10-17 09:38:13.964995
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9bc23069e77d"
+down_revision: Union[str, None] = "5db0c4af4c8a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Back the analytics export's `(updated_at, id)` watermark range scans
+TABLES = ["homeworktask", "submission", "feedback"]
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        op.create_index(f"ix_{table}_updated_at_id", table, ["updated_at", "id"])
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.drop_index(f"ix_{table}_updated_at_id", table_name=table)
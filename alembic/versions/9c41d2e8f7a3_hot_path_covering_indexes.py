@@ -0,0 +1,84 @@
+"""hot_path_covering_indexes
+
+Revision ID: 9c41d2e8f7a3
+Revises: 5b9e3c7a1d42
+Create Date: 2026-10-17 12:20:05.631877
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9c41d2e8f7a3"
+down_revision: Union[str, None] = "5b9e3c7a1d42"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (name, table, columns, included columns)
+INDEXES = [
+    (
+        "ix_submission_student_id_status_created_at_id",
+        "submission",
+        ["student_id", "status", "created_at", "id"],
+        [],
+    ),
+    (
+        "ix_submission_teacher_id_status_created_at_id",
+        "submission",
+        ["teacher_id", "status", "created_at", "id"],
+        [],
+    ),
+    (
+        "ix_submission_homework_task_id_student_id",
+        "submission",
+        ["homework_task_id", "student_id"],
+        ["status"],
+    ),
+    (
+        "ix_feedback_submission_id_status_created_at_id",
+        "feedback",
+        ["submission_id", "status", "created_at", "id"],
+        [],
+    ),
+    (
+        "ix_feedback_student_id_created_at_id",
+        "feedback",
+        ["student_id", "created_at", "id"],
+        [],
+    ),
+    (
+        "ix_homeworktask_teacher_id_status_created_at_id",
+        "homeworktask",
+        ["teacher_id", "status", "created_at", "id"],
+        [],
+    ),
+]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY keeps the tables writable while the indexes build, but it
+    # cannot run inside a transaction. A failed build leaves an INVALID index
+    # behind; drop it and rerun the migration.
+    with op.get_context().autocommit_block():
+        for name, table, columns, include in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_include=include,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,34 @@
+"""row_updated_at
+
+Revision ID: a4d7e0b3c925
+Revises: e6a2b94d0c18
+Create Date: 2026-10-17 16:20:41.518730
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a4d7e0b3c925"
+down_revision: Union[str, None] = "e6a2b94d0c18"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ["user", "homeworktask", "submission", "feedback"]
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        op.add_column(table, sa.Column("updated_at", sa.DateTime(), nullable=True))
+        # Existing rows count as last changed when they were created
+        op.execute(f'UPDATE "{table}" SET updated_at = created_at')
+        op.alter_column(table, "updated_at", nullable=False)
+
+
+def downgrade() -> None:
+    for table in reversed(TABLES):
+        op.drop_column(table, "updated_at")
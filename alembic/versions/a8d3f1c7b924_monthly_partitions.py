@@ -0,0 +1,122 @@
+"""monthly_partitions
+
+Revision ID: a8d3f1c7b924
+Revises: f4c2a8e6b130
+Create Date: 2026-10-17 23:12:08.604411
+
+"""
+
+from typing import List, Sequence, Tuple, Union
+
+from sqlalchemy import text
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a8d3f1c7b924"
+down_revision: Union[str, None] = "f4c2a8e6b130"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# table -> (column, referred table) of its foreign keys, named as PostgreSQL
+# named them
+FOREIGN_KEYS = {
+    "submission": [
+        ("student_id", "user"),
+        ("teacher_id", "user"),
+        ("homework_task_id", "homeworktask"),
+    ],
+    "feedback": [("student_id", "user"), ("teacher_id", "user")],
+}
+# Can't be kept once `submission.id` is only unique with `created_at`
+SUBMISSION_FOREIGN_KEY = "feedback_submission_id_fkey"
+
+
+def indexes(table: str) -> List[Tuple[str, str]]:
+    """`(name, definition)` of the table's indexes, but its primary key"""
+    return (
+        op.get_bind()
+        .execute(
+            text(
+                "SELECT indexname, indexdef FROM pg_indexes "
+                "WHERE schemaname = current_schema() AND tablename = :table "
+                "AND indexname != :pkey"
+            ),
+            {"table": table, "pkey": f"{table}_pkey"},
+        )
+        .all()
+    )
+
+
+def stored_columns(table: str) -> str:
+    """Columns to copy, leaving out the generated ones"""
+    columns = (
+        op.get_bind()
+        .execute(
+            text(
+                "SELECT column_name FROM information_schema.columns "
+                "WHERE table_schema = current_schema() AND table_name = :table "
+                "AND is_generated = 'NEVER' ORDER BY ordinal_position"
+            ),
+            {"table": table},
+        )
+        .scalars()
+    )
+    return ", ".join(columns)
+
+
+def rebuild(table: str, partitioned: bool) -> None:
+    """Recreate `table` with the same columns, indexes and foreign keys, its
+    rows copied over, either partitioned by month or as a plain table"""
+    old = f"{table}_old"
+    definitions = indexes(table)
+    # Dropped up front, so the copy doesn't maintain them and the new table
+    # can take their names
+    for name, _ in definitions:
+        op.drop_index(name, table_name=table)
+    op.rename_table(table, old)
+    op.execute(f'ALTER TABLE "{old}" RENAME CONSTRAINT {table}_pkey TO {old}_pkey')
+
+    op.execute(
+        f'CREATE TABLE "{table}" '
+        f'(LIKE "{old}" INCLUDING DEFAULTS INCLUDING GENERATED)'
+        + (" PARTITION BY RANGE (created_at)" if partitioned else "")
+    )
+    if partitioned:
+        since = op.get_bind().execute(text(f'SELECT min(created_at) FROM "{old}"'))
+        op.create_month_partitions(table, since=since.scalar())
+    columns = stored_columns(old)
+    op.execute(f'INSERT INTO "{table}" ({columns}) SELECT {columns} FROM "{old}"')
+    op.drop_table(old)
+
+    op.create_primary_key(
+        f"{table}_pkey", table, ["id", "created_at"] if partitioned else ["id"]
+    )
+    for _, definition in definitions:
+        # A partitioned table's index definitions read `ON ONLY <table>`
+        op.execute(definition.replace(" ON ONLY ", " ON ", 1))
+    for column, referred in FOREIGN_KEYS[table]:
+        op.create_foreign_key(
+            f"{table}_{column}_fkey", table, referred, [column], ["id"]
+        )
+
+
+def upgrade() -> None:
+    # Submissions a feedback row points to are checked by the API instead
+    op.drop_constraint(SUBMISSION_FOREIGN_KEY, "feedback", type_="foreignkey")
+    rebuild("submission", partitioned=True)
+    rebuild("feedback", partitioned=True)
+
+
+def downgrade() -> None:
+    # Archived partitions aren't brought back: attach them to the partitioned
+    # tables first to keep their rows
+    rebuild("feedback", partitioned=False)
+    rebuild("submission", partitioned=False)
+    op.create_foreign_key(
+        SUBMISSION_FOREIGN_KEY,
+        "feedback",
+        "submission",
+        ["submission_id"],
+        ["id"],
+    )
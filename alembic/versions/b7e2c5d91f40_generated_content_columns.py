@@ -0,0 +1,116 @@
+"""generated_content_columns
+
+Revision ID: b7e2c5d91f40
+Revises: a4d7e0b3c925
+Create Date: 2026-10-17 18:12:40.517203
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b7e2c5d91f40"
+down_revision: Union[str, None] = "a4d7e0b3c925"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CONTENT_TABLES = ["homeworktask", "submission", "feedback"]
+
+SCORE = "(content ->> 'score')::numeric"
+GENERATED_COLUMNS = [
+    ("homeworktask", "title", sa.Text(), "content ->> 'title'"),
+    ("homeworktask", "topic", sa.Text(), "content ->> 'topic'"),
+    ("homeworktask", "language_level", sa.Text(), "content ->> 'language_level'"),
+    (
+        "feedback",
+        "score",
+        sa.Integer(),
+        "CASE WHEN jsonb_typeof(content -> 'score') = 'number' "
+        f"THEN CASE WHEN abs({SCORE}) < 2147483648 THEN {SCORE}::integer END END",
+    ),
+]
+
+INDEXES = [
+    (
+        "ix_homeworktask_teacher_id_title_created_at_id",
+        "homeworktask",
+        ["teacher_id", "title", "created_at", "id"],
+        {},
+    ),
+    (
+        "ix_homeworktask_teacher_id_topic_language_level",
+        "homeworktask",
+        ["teacher_id", "topic", "language_level", "created_at", "id"],
+        {},
+    ),
+    (
+        "ix_homeworktask_content",
+        "homeworktask",
+        ["content"],
+        {"postgresql_using": "gin", "postgresql_ops": {"content": "jsonb_path_ops"}},
+    ),
+    (
+        "ix_feedback_submission_id_score_created_at_id",
+        "feedback",
+        ["submission_id", "score", "created_at", "id"],
+        {},
+    ),
+]
+
+
+def upgrade() -> None:
+    # Each ALTER rewrites its table once: the JSONB conversion, then the stored
+    # columns, which PostgreSQL computes (backfills) for every existing row
+    for table in CONTENT_TABLES:
+        op.alter_column(
+            table,
+            "content",
+            type_=postgresql.JSONB(),
+            existing_type=sa.JSON(),
+            existing_nullable=False,
+            postgresql_using="content::jsonb",
+        )
+    for table, column, type_, expression in GENERATED_COLUMNS:
+        op.add_column(
+            table,
+            sa.Column(column, type_, sa.Computed(expression, persisted=True)),
+        )
+
+    with op.get_context().autocommit_block():
+        for name, table, columns, options in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+                **options,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+
+    for table, column, _, _ in reversed(GENERATED_COLUMNS):
+        op.drop_column(table, column)
+    for table in CONTENT_TABLES:
+        op.alter_column(
+            table,
+            "content",
+            type_=sa.JSON(),
+            existing_type=postgresql.JSONB(),
+            existing_nullable=False,
+            postgresql_using="content::json",
+        )
@@ -0,0 +1,122 @@
+"""read_tables
+
+Revision ID: bd3c01eea0b4
+Revises: a8d3f1c7b924
+Create Date: 2026-10-17 09:22:13.114310
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "bd3c01eea0b4"
+down_revision: Union[str, None] = "a8d3f1c7b924"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def ids() -> postgresql.UUID:
+    # app.schemas.ids.PrefixedId stores its ids as native UUIDs
+    return postgresql.UUID(as_uuid=False)
+
+
+def status() -> postgresql.ENUM:
+    return postgresql.ENUM(name="status", create_type=False)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "teacher_inbox",
+        sa.Column("id", ids(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("status", status(), nullable=False),
+        sa.Column("student_id", ids(), nullable=False),
+        sa.Column("student_handle", sa.String(), nullable=False),
+        sa.Column("homework_task_id", ids(), nullable=False),
+        sa.Column("homework_title", sa.String(), nullable=False),
+        sa.Column("content", postgresql.JSONB(), nullable=False),
+        sa.Column(
+            "submission_preview",
+            sa.Text(),
+            sa.Computed("left(content ->> 'text', 100)", persisted=True),
+            nullable=True,
+        ),
+        sa.Column("teacher_id", ids(), nullable=False),
+        sa.ForeignKeyConstraint(["homework_task_id"], ["homeworktask.id"]),
+        sa.ForeignKeyConstraint(["student_id"], ["user.id"]),
+        sa.ForeignKeyConstraint(["teacher_id"], ["user.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "student_dashboard",
+        sa.Column("id", ids(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("status", status(), nullable=False),
+        sa.Column("homework_title", sa.String(), nullable=False),
+        sa.Column("teacher_id", ids(), nullable=False),
+        sa.Column("teacher_handle", sa.String(), nullable=False),
+        sa.Column("teacher_telegram_id", sa.String(), nullable=False),
+        sa.Column("assignment_status", status(), nullable=False),
+        sa.Column("submitted_at", sa.DateTime(), nullable=True),
+        sa.Column("student_id", ids(), nullable=False),
+        sa.ForeignKeyConstraint(["id"], ["homeworktask.id"]),
+        sa.ForeignKeyConstraint(["student_id"], ["user.id"]),
+        sa.ForeignKeyConstraint(["teacher_id"], ["user.id"]),
+        sa.PrimaryKeyConstraint("id", "student_id"),
+    )
+
+    # Filled from the source tables, as `app.db.read_tables.rebuild` does,
+    # before their indexes
+    op.execute("""
+        INSERT INTO teacher_inbox (
+            id, created_at, status, teacher_id, student_id, student_handle,
+            homework_task_id, homework_title, content
+        )
+        SELECT s.id, s.created_at, s.status, s.teacher_id, s.student_id,
+               u.tg_handle, s.homework_task_id,
+               coalesce(h.title, 'Untitled'), s.content::jsonb
+        FROM submission s
+        JOIN "user" u ON u.id = s.student_id
+        JOIN homeworktask h ON h.id = s.homework_task_id
+        WHERE s.status = 'PENDING'
+        """)
+    op.execute("""
+        INSERT INTO student_dashboard (
+            student_id, id, created_at, status, homework_title, teacher_id,
+            teacher_handle, teacher_telegram_id, assignment_status, submitted_at
+        )
+        SELECT a.student_id, h.id, h.created_at, h.status,
+               coalesce(h.title, 'Untitled'), h.teacher_id, t.tg_handle,
+               t.telegram_id, a.status, a.submitted_at
+        FROM homework_assignment a
+        JOIN homeworktask h ON h.id = a.homework_id
+        JOIN "user" t ON t.id = h.teacher_id
+        """)
+
+    op.create_index(
+        "ix_teacher_inbox_teacher_id_created_at_id",
+        "teacher_inbox",
+        ["teacher_id", "created_at", "id"],
+    )
+    op.create_index(
+        "ix_student_dashboard_student_id_created_at_id",
+        "student_dashboard",
+        ["student_id", "created_at", "id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_student_dashboard_student_id_created_at_id",
+        table_name="student_dashboard",
+    )
+    op.drop_table("student_dashboard")
+    op.drop_index(
+        "ix_teacher_inbox_teacher_id_created_at_id", table_name="teacher_inbox"
+    )
+    op.drop_table("teacher_inbox")
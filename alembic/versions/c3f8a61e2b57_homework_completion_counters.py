@@ -0,0 +1,70 @@
+"""homework_completion_counters
+
+Revision ID: c3f8a61e2b57
+Revises: 9c41d2e8f7a3
+Create Date: 2026-10-17 13:41:52.207316
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c3f8a61e2b57"
+down_revision: Union[str, None] = "9c41d2e8f7a3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COUNTERS = ["assigned_count", "submitted_count", "graded_count"]
+
+
+def upgrade() -> None:
+    op.add_column(
+        "homework_assignment", sa.Column("submitted_at", sa.DateTime(), nullable=True)
+    )
+    for counter in COUNTERS:
+        op.add_column(
+            "homeworktask",
+            sa.Column(counter, sa.Integer(), nullable=False, server_default="0"),
+        )
+
+    # A student has submitted from their first submission on
+    op.execute("""
+        UPDATE homework_assignment a
+        SET submitted_at = first.submitted_at
+        FROM (
+            SELECT homework_task_id, student_id, min(created_at) AS submitted_at
+            FROM submission
+            GROUP BY homework_task_id, student_id
+        ) AS first
+        WHERE first.homework_task_id = a.homework_id
+          AND first.student_id = a.student_id
+        """)
+    op.execute("""
+        UPDATE homeworktask hw
+        SET assigned_count = counts.assigned,
+            submitted_count = counts.submitted,
+            graded_count = counts.graded
+        FROM (
+            SELECT
+                homework_id,
+                count(*) AS assigned,
+                count(submitted_at) AS submitted,
+                count(*) FILTER (WHERE status = 'COMPLETED') AS graded
+            FROM homework_assignment
+            GROUP BY homework_id
+        ) AS counts
+        WHERE counts.homework_id = hw.id
+        """)
+
+    for counter in COUNTERS:
+        op.alter_column("homeworktask", counter, server_default=None)
+
+
+def downgrade() -> None:
+    for counter in reversed(COUNTERS):
+        op.drop_column("homeworktask", counter)
+    op.drop_column("homework_assignment", "submitted_at")
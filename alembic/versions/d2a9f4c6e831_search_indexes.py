@@ -0,0 +1,94 @@
+"""search_indexes
+
+Revision ID: d2a9f4c6e831
+Revises: b7e2c5d91f40
+Create Date: 2026-10-17 19:26:03.114958
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d2a9f4c6e831"
+down_revision: Union[str, None] = "b7e2c5d91f40"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Must match app.schemas.base.search_vector, or queries won't use them
+SEARCH_INDEXES = [
+    (
+        "ix_homeworktask_search",
+        "homeworktask",
+        "to_tsvector('english'::regconfig, (coalesce(content ->> 'title', '') "
+        "|| ' ') || coalesce(content ->> 'description', ''))",
+    ),
+    (
+        "ix_submission_search",
+        "submission",
+        "to_tsvector('english'::regconfig, coalesce(content ->> 'text', ''))",
+    ),
+    (
+        "ix_feedback_search",
+        "feedback",
+        "to_tsvector('english'::regconfig, coalesce(content ->> 'text', ''))",
+    ),
+]
+TITLE_TRIGRAM_INDEX = "ix_homeworktask_title_trgm"
+
+
+def pg_trgm_available() -> bool:
+    return (
+        op.get_bind()
+        .execute(
+            sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        )
+        .scalar()
+        is not None
+    )
+
+
+def upgrade() -> None:
+    # pg_trgm is a contrib extension; without it, title search falls back to
+    # substring matching (see app/api/endpoints/search.py)
+    trigram = pg_trgm_available()
+    if trigram:
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    with op.get_context().autocommit_block():
+        for name, table, expression in SEARCH_INDEXES:
+            op.create_index(
+                name,
+                table,
+                [sa.text(expression)],
+                postgresql_using="gin",
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+        if trigram:
+            op.create_index(
+                TITLE_TRIGRAM_INDEX,
+                "homeworktask",
+                ["title"],
+                postgresql_using="gin",
+                postgresql_ops={"title": "gin_trgm_ops"},
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table in [(TITLE_TRIGRAM_INDEX, "homeworktask")] + [
+            (name, table) for name, table, _ in reversed(SEARCH_INDEXES)
+        ]:
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+    # The extension is left installed; other database objects may use it
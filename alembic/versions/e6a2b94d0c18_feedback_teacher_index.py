@@ -0,0 +1,39 @@
+"""feedback_teacher_index
+
+Revision ID: e6a2b94d0c18
+Revises: c3f8a61e2b57
+Create Date: 2026-10-17 15:02:18.940263
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e6a2b94d0c18"
+down_revision: Union[str, None] = "c3f8a61e2b57"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Backs the teacher's feedback timeline view
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_feedback_teacher_id_created_at_id",
+            "feedback",
+            ["teacher_id", "created_at", "id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_feedback_teacher_id_created_at_id",
+            table_name="feedback",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,113 @@
+"""uuid_ids
+
+Revision ID: f4c2a8e6b130
+Revises: d2a9f4c6e831
+Create Date: 2026-10-17 21:04:37.215840
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f4c2a8e6b130"
+down_revision: Union[str, None] = "d2a9f4c6e831"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# table -> (column, id prefix), see app.schemas.ids.PrefixedId
+ID_COLUMNS = {
+    "user": [("id", "usr")],
+    "homeworktask": [("id", "hw"), ("teacher_id", "usr")],
+    "homework_assignment": [("homework_id", "hw"), ("student_id", "usr")],
+    "submission": [
+        ("id", "sub"),
+        ("student_id", "usr"),
+        ("teacher_id", "usr"),
+        ("homework_task_id", "hw"),
+    ],
+    "feedback": [
+        ("id", "fb"),
+        ("student_id", "usr"),
+        ("teacher_id", "usr"),
+        ("submission_id", "sub"),
+    ],
+}
+
+# (table, column, referred table), named as PostgreSQL named them
+FOREIGN_KEYS = [
+    ("homeworktask", "teacher_id", "user"),
+    ("homework_assignment", "homework_id", "homeworktask"),
+    ("homework_assignment", "student_id", "user"),
+    ("submission", "student_id", "user"),
+    ("submission", "teacher_id", "user"),
+    ("submission", "homework_task_id", "homeworktask"),
+    ("feedback", "student_id", "user"),
+    ("feedback", "teacher_id", "user"),
+    ("feedback", "submission_id", "submission"),
+]
+
+# As in app.schemas.ids when this migration was written
+RESERVED_IDS = ("usr_ai_teacher",)
+UUID_PATTERN = "^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$"
+
+
+def to_uuid(column: str, prefix: str) -> str:
+    """`<prefix>_<uuid>` to its UUID; any other id to `md5(id)::uuid`"""
+    tail = f"substr({column}, {len(prefix) + 2})"
+    reserved = ", ".join(f"'{id}'" for id in RESERVED_IDS)
+    return (
+        f"CASE WHEN left({column}, {len(prefix) + 1}) = '{prefix}_' "
+        f"AND {tail} ~* '{UUID_PATTERN}' AND {column} NOT IN ({reserved}) "
+        f"THEN {tail}::uuid ELSE md5({column})::uuid END"
+    )
+
+
+def to_text(column: str, prefix: str) -> str:
+    text = f"'{prefix}_' || {column}::text"
+    reserved = [id for id in RESERVED_IDS if id.startswith(f"{prefix}_")]
+    if not reserved:
+        return text
+    cases = " ".join(
+        f"WHEN {column} = md5('{id}')::uuid THEN '{id}'" for id in reserved
+    )
+    return f"CASE {cases} ELSE {text} END"
+
+
+def alter_id_columns(type_: str, using) -> None:
+    # All of a table's columns in one ALTER, so it's rewritten once. Indexes
+    # on the columns are rebuilt along with it
+    for table, columns in ID_COLUMNS.items():
+        changes = ", ".join(
+            f"ALTER COLUMN {column} TYPE {type_} USING {using(column, prefix)}"
+            for column, prefix in columns
+        )
+        op.execute(f'ALTER TABLE "{table}" {changes}')
+
+
+def drop_foreign_keys() -> None:
+    for table, column, _ in FOREIGN_KEYS:
+        op.drop_constraint(f"{table}_{column}_fkey", table, type_="foreignkey")
+
+
+def create_foreign_keys() -> None:
+    for table, column, referred in FOREIGN_KEYS:
+        op.create_foreign_key(
+            f"{table}_{column}_fkey", table, referred, [column], ["id"]
+        )
+
+
+def upgrade() -> None:
+    # Ids keep their API form: `hw_<uuid4>` becomes the uuid4 and reads back
+    # the same. Ids without a UUID become `md5(id)::uuid`, which only
+    # `RESERVED_IDS` read back as before
+    drop_foreign_keys()
+    alter_id_columns("uuid", to_uuid)
+    create_foreign_keys()
+
+
+def downgrade() -> None:
+    drop_foreign_keys()
+    alter_id_columns("varchar", to_text)
+    create_foreign_keys()
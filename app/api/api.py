@@ -1,6 +1,16 @@
 from fastapi import APIRouter
 
-from .endpoints import feedback, homework, submission, user
+from .endpoints import (
+    analytics,
+    export,
+    feedback,
+    homework,
+    search,
+    submission,
+    sync,
+    user,
+    views,
+)
 
 api_router = APIRouter()
 
@@ -10,3 +20,8 @@ api_router.include_router(
     submission.router, prefix="/submissions", tags=["submissions"]
 )
 api_router.include_router(feedback.router, prefix="/feedback", tags=["feedback"])
+api_router.include_router(views.router, prefix="/views", tags=["views"])
+api_router.include_router(export.router, prefix="/export", tags=["export"])
+api_router.include_router(analytics.router, prefix="/analytics", tags=["analytics"])
+api_router.include_router(search.router, prefix="/search", tags=["search"])
+api_router.include_router(sync.router, prefix="/sync", tags=["sync"])
@@ -0,0 +1,32 @@
+"""
+Fetch-by-ids shared by the `POST /<resource>/batch` endpoints.
+
+Clients that need several rows at once (e.g. the students behind a teacher's
+submissions) send the ids in one request, which resolves them in a single
+`IN (...)` query instead of one round trip per id.
+"""
+
+from typing import List
+
+from pydantic import BaseModel, Field
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+MAX_BATCH_SIZE = 500
+
+
+class BatchRequest(BaseModel):
+    ids: List[str] = Field(..., max_length=MAX_BATCH_SIZE)
+
+
+async def fetch_by_ids(db: AsyncSession, model, ids: List[str], *where) -> List:
+    """Rows of `model` for `ids`, in request order; unknown ids are skipped
+
+    `where` narrows the query further, e.g. to the partitions the ids are in.
+    """
+    if not ids:
+        return []
+    query = select(model).where(model.id.in_(set(ids)), *where)
+    rows = (await db.exec(query)).all()
+    by_id = {row.id: row for row in rows}
+    return [by_id[id] for id in dict.fromkeys(ids) if id in by_id]
@@ -1,3 +1,23 @@
-from . import feedback, homework, submission, user
+from . import (
+    analytics,
+    export,
+    feedback,
+    homework,
+    search,
+    submission,
+    sync,
+    user,
+    views,
+)
 
-__all__ = ["user", "homework", "submission", "feedback"]
+__all__ = [
+    "user",
+    "homework",
+    "submission",
+    "feedback",
+    "views",
+    "export",
+    "analytics",
+    "search",
+    "sync",
+]
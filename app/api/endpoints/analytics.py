@@ -0,0 +1,31 @@
+"""
+1. `POST /analytics/export` - Export homework, submissions and feedback to Parquet
+
+Writes each table's changes since the last export under the server's
+`ANALYTICS_EXPORT_DIR` (see `app/db/analytics_export.py`), so analysts read
+Parquet files instead of querying the production database. The rows are read
+from the replica, when there is one. While another export to the same
+directory runs, it answers 409.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ...db import analytics_export
+from ...db.base import get_read_db
+from ...schemas.analytics import AnalyticsExportResult
+
+router = APIRouter()
+
+
+@router.post("/export", response_model=AnalyticsExportResult)
+async def export_analytics(db: AsyncSession = Depends(get_read_db)):
+    if analytics_export.pa is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Analytics export needs pyarrow installed",
+        )
+    try:
+        return await analytics_export.export_analytics(db)
+    except analytics_export.ExportInProgress as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
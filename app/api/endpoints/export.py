@@ -0,0 +1,144 @@
+"""
+1. `GET /export/teacher/{teacher_id}` - Everything a teacher has assigned, received and graded
+2. `GET /export/student/{student_id}` - Everything a student was assigned, submitted and received
+
+Both stream NDJSON, one `{"type": ..., "data": {...}}` object per line: first
+the `user`, then its `homework`, `assignment`, `submission` and `feedback`
+rows, in creation order (assignments by homework). Rows are read from a
+server-side cursor in batches of `EXPORT_BATCH_SIZE`, so memory stays flat
+however large the history is, and the first line goes out before the first
+query completes.
+"""
+
+from typing import AsyncIterator, Callable, List, Tuple
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ...db.base import get_read_db, get_read_session_factory
+from ...schemas.feedback import Feedback
+from ...schemas.homework import HomeworkAssignment, HomeworkTask
+from ...schemas.submission import Submission
+from ...schemas.user import User, UserRole
+from ..serialization import dumps, row_fields
+from .views import get_user_with_role
+
+EXPORT_BATCH_SIZE = 1000
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+router = APIRouter()
+
+
+def ndjson_line(type: str, data) -> bytes:
+    return dumps({"type": type, "data": data}) + b"\n"
+
+
+def section(model, *where, join=None, order_by=None) -> Select:
+    """Plain table rows of `model` (no ORM objects to track)"""
+    query = select(model.__table__)
+    if join is not None:
+        query = query.join(*join)
+    return query.where(*where).order_by(
+        *(order_by if order_by is not None else (model.created_at, model.id))
+    )
+
+
+async def export_lines(
+    session_factory: Callable[[], AsyncSession],
+    user: User,
+    sections: List[Tuple[str, Select]],
+) -> AsyncIterator[bytes]:
+    yield ndjson_line("user", row_fields(user))
+
+    async with session_factory() as session:
+        for type, query in sections:
+            result = await session.stream(
+                query.execution_options(yield_per=EXPORT_BATCH_SIZE)
+            )
+            async for rows in result.partitions():
+                yield b"".join(ndjson_line(type, row._mapping) for row in rows)
+
+
+def export_response(
+    session_factory: Callable[[], AsyncSession],
+    user: User,
+    sections: List[Tuple[str, Select]],
+) -> StreamingResponse:
+    return StreamingResponse(
+        export_lines(session_factory, user, sections),
+        media_type=NDJSON_MEDIA_TYPE,
+        headers={"Content-Disposition": f'attachment; filename="{user.id}.ndjson"'},
+    )
+
+
+@router.get("/teacher/{teacher_id}")
+async def export_teacher(
+    teacher_id: str,
+    db: AsyncSession = Depends(get_read_db),
+    session_factory: Callable[[], AsyncSession] = Depends(get_read_session_factory),
+):
+    teacher = await get_user_with_role(db, teacher_id, UserRole.TEACHER)
+
+    return export_response(
+        session_factory,
+        teacher,
+        [
+            ("homework", section(HomeworkTask, HomeworkTask.teacher_id == teacher_id)),
+            (
+                "assignment",
+                section(
+                    HomeworkAssignment,
+                    HomeworkTask.teacher_id == teacher_id,
+                    join=(
+                        HomeworkTask,
+                        HomeworkTask.id == HomeworkAssignment.homework_id,
+                    ),
+                    order_by=(
+                        HomeworkAssignment.homework_id,
+                        HomeworkAssignment.student_id,
+                    ),
+                ),
+            ),
+            ("submission", section(Submission, Submission.teacher_id == teacher_id)),
+            ("feedback", section(Feedback, Feedback.teacher_id == teacher_id)),
+        ],
+    )
+
+
+@router.get("/student/{student_id}")
+async def export_student(
+    student_id: str,
+    db: AsyncSession = Depends(get_read_db),
+    session_factory: Callable[[], AsyncSession] = Depends(get_read_session_factory),
+):
+    student = await get_user_with_role(db, student_id, UserRole.STUDENT)
+
+    return export_response(
+        session_factory,
+        student,
+        [
+            (
+                "homework",
+                section(
+                    HomeworkTask,
+                    HomeworkAssignment.student_id == student_id,
+                    join=(
+                        HomeworkAssignment,
+                        HomeworkAssignment.homework_id == HomeworkTask.id,
+                    ),
+                ),
+            ),
+            (
+                "assignment",
+                section(
+                    HomeworkAssignment,
+                    HomeworkAssignment.student_id == student_id,
+                    order_by=(HomeworkAssignment.homework_id,),
+                ),
+            ),
+            ("submission", section(Submission, Submission.student_id == student_id)),
+            ("feedback", section(Feedback, Feedback.student_id == student_id)),
+        ],
+    )
@@ -2,55 +2,140 @@
 1. `GET /feedback/{feedback_id}` - Get specific feedback
 2. `POST /feedback/` - Create new feedback
 3. `GET /feedback/submission/{submission_id}` - Get all feedback for a submission
+4. `POST /feedback/batch` - Get several feedback items by ID
+
+List endpoints take `fields=` / `view=summary` to return only some columns
+(see `app/api/fields.py`). The submission list filters on the `score`
+generated from `content` with `min_score=` / `max_score=`, and sorts with
+`sort=score` / `sort=-score`.
 """
 
+import asyncio
 import logging
+from datetime import datetime
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import and_, case, delete, insert, literal, or_, update
+from sqlalchemy.orm import aliased
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from ...db.base import get_db
+from ...db.base import get_db, get_read_db
+from ...db.partitions import ID_TIME_SLACK, created_at_matches_id, created_near
 from ...queue.notifications import notify_feedback_provided
-from ...schemas.base import Status
+from ...schemas.base import Status, generated_fields
 from ...schemas.feedback import Feedback
-from ...schemas.homework import HomeworkTask
+from ...schemas.homework import HomeworkAssignment, HomeworkTask
 from ...schemas.submission import Submission
 from ...schemas.user import User, UserRole
+from ...schemas.views import StudentDashboard, TeacherInbox
+from ..batch import BatchRequest, fetch_by_ids
+from ..etag import check_etag
+from ..fields import parse_fields, select_columns, to_dicts
+from ..pagination import paginate, parse_sort, set_next_cursor
+from ..serialization import fast_json
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Enough to list feedback without its full text
+FEEDBACK_SUMMARY = [
+    "status",
+    "submission_id",
+    "student_id",
+    "teacher_id",
+    "content.score",
+]
+FEEDBACK_SORTS = {"score": Feedback.score}
+
 
 @router.get("/{feedback_id}", response_model=Feedback)
-def get_feedback_by_id(feedback_id: str, db: Session = Depends(get_db)):
-    feedback = db.get(Feedback, feedback_id)
+async def get_feedback_by_id(
+    feedback_id: str,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
+):
+    # Bounded by the id's time, to only look into that month's partition
+    feedback = (
+        await db.exec(
+            select(Feedback).where(
+                Feedback.id == feedback_id, *created_near(Feedback, [feedback_id])
+            )
+        )
+    ).first()
     if not feedback:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Feedback not found"
         )
+    not_modified = check_etag(request, response, [feedback])
+    if not_modified:
+        return not_modified
     return feedback
 
 
+@router.post("/batch", response_model=List[Feedback])
+async def get_feedback_batch(
+    batch: BatchRequest, db: AsyncSession = Depends(get_read_db)
+):
+    return await fetch_by_ids(
+        db, Feedback, batch.ids, *created_near(Feedback, batch.ids)
+    )
+
+
 @router.post("/", response_model=Feedback)
-def create_feedback(feedback: Feedback, db: Session = Depends(get_db)):
+async def create_feedback(feedback: Feedback, db: AsyncSession = Depends(get_db)):
+    if not created_at_matches_id(feedback):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="created_at doesn't match the time in the id",
+        )
+
+    # Everything the checks and the notification need, in one query
+    teacher = aliased(User)
+    student = aliased(User)
+    found = (
+        await db.exec(
+            select(
+                teacher.role,
+                teacher.tg_handle,
+                Submission.id.label("submission_id"),
+                Submission.student_id,
+                Submission.teacher_id,
+                Submission.homework_task_id,
+                HomeworkTask.title,
+                student.telegram_id.label("student_telegram_id"),
+            )
+            .select_from(teacher)
+            .outerjoin(
+                Submission,
+                and_(
+                    Submission.id == feedback.submission_id,
+                    *created_near(Submission, [feedback.submission_id]),
+                ),
+            )
+            .outerjoin(HomeworkTask, HomeworkTask.id == Submission.homework_task_id)
+            .outerjoin(student, student.id == Submission.student_id)
+            .where(teacher.id == feedback.teacher_id)
+        )
+    ).first()
+
     # Verify teacher exists and is actually a teacher
-    teacher = db.get(User, feedback.teacher_id)
-    if not teacher or teacher.role != UserRole.TEACHER:
+    if not found or found.role != UserRole.TEACHER:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Teacher not found"
         )
 
     # Verify submission exists
-    submission = db.get(Submission, feedback.submission_id)
-    if not submission:
+    if not found.submission_id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Submission not found"
         )
 
     # Verify student matches submission
-    if feedback.student_id != submission.student_id:
+    if feedback.student_id != found.student_id:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Student ID doesn't match submission's student",
@@ -58,7 +143,7 @@ def create_feedback(feedback: Feedback, db: Session = Depends(get_db)):
 
     # Verify teacher matches submission
     if (
-        feedback.teacher_id != submission.teacher_id
+        feedback.teacher_id != found.teacher_id
         and feedback.teacher_id != "usr_ai_teacher"
     ):
         raise HTTPException(
@@ -67,92 +152,178 @@ def create_feedback(feedback: Feedback, db: Session = Depends(get_db)):
         )
 
     try:
-        # Add feedback
-        db.add(feedback)
-
-        # Update submission status
-        submission = db.get(Submission, feedback.submission_id)
-        submission.status = Status.COMPLETED
-
-        # Update homework status
-        homework = db.get(HomeworkTask, submission.homework_task_id)
-
-        # Check if all students have completed submissions with feedback
-        all_completed = True
-        for student_id in homework.student_ids:
-            student_submission = db.exec(
-                select(Submission).where(
-                    Submission.homework_task_id == homework.id,
-                    Submission.student_id == student_id,
-                )
-            ).first()
-
-            if not student_submission or student_submission.status != Status.COMPLETED:
-                all_completed = False
-                break
+        # The status updates run in the same statement as the insert. Each
+        # sets `updated_at` anonymously, as the insert's own parameter takes
+        # the name
+        now = datetime.utcnow()
+        completed_submission = (
+            update(Submission)
+            .where(
+                Submission.id == feedback.submission_id,
+                *created_near(Submission, [feedback.submission_id]),
+            )
+            .values(status=Status.COMPLETED, updated_at=literal(now))
+            .cte("completed_submission")
+        )
 
-        if all_completed:
-            homework.status = Status.COMPLETED
+        # Complete the student's assignment, once per student
+        first_grade = (
+            update(HomeworkAssignment)
+            .where(
+                HomeworkAssignment.homework_id == found.homework_task_id,
+                HomeworkAssignment.student_id == found.student_id,
+                HomeworkAssignment.status != Status.COMPLETED,
+            )
+            .values(status=Status.COMPLETED)
+            .returning(HomeworkAssignment.homework_id)
+            .cte("first_grade")
+        )
 
-        db.commit()
+        # Homework is completed once every assigned student has been graded
+        graded = (
+            update(HomeworkTask)
+            .where(HomeworkTask.id == first_grade.c.homework_id)
+            .values(
+                graded_count=HomeworkTask.graded_count + 1,
+                status=case(
+                    (
+                        HomeworkTask.graded_count + 1 >= HomeworkTask.assigned_count,
+                        literal(Status.COMPLETED, HomeworkTask.status.type),
+                    ),
+                    else_=HomeworkTask.status,
+                ),
+                updated_at=literal(now),
+            )
+            .returning(HomeworkTask.id, HomeworkTask.status)
+            .cte("graded")
+        )
 
-        # Get notification data for student
-        student = db.get(User, feedback.student_id)
-        teacher = db.get(User, feedback.teacher_id)
+        # The read tables follow (see app/db/read_tables.py): the submission
+        # leaves the teacher's inbox, the student's dashboard row completes,
+        # and every student's row once the homework is complete
+        uninboxed = (
+            delete(TeacherInbox)
+            .where(TeacherInbox.id == feedback.submission_id)
+            .cte("uninboxed")
+        )
+        graded_student = StudentDashboard.student_id == found.student_id
+        dashboard = (
+            update(StudentDashboard)
+            .where(
+                StudentDashboard.id == graded.c.id,
+                or_(graded_student, graded.c.status == Status.COMPLETED),
+            )
+            .values(
+                status=graded.c.status,
+                assignment_status=case(
+                    (
+                        graded_student,
+                        literal(Status.COMPLETED, StudentDashboard.status.type),
+                    ),
+                    else_=StudentDashboard.assignment_status,
+                ),
+            )
+            .cte("dashboard")
+        )
 
-        # Notify student about new feedback
-        notify_feedback_provided(
-            student_tg_id=student.telegram_id,
+        feedback = (
+            await db.exec(
+                insert(Feedback)
+                .values(**feedback.model_dump(exclude=generated_fields(Feedback)))
+                .returning(Feedback)
+                .add_cte(
+                    completed_submission, first_grade, graded, uninboxed, dashboard
+                )
+            )
+        ).scalar_one()
+        await db.commit()
+
+        # Notify student about new feedback, off the event loop (pika blocks)
+        await asyncio.to_thread(
+            notify_feedback_provided,
+            student_tg_id=found.student_telegram_id,
             feedback_data={
-                "homework_title": homework.content.get("title", "Untitled"),
+                "homework_title": found.title or "Untitled",
                 "feedback_id": feedback.id,
                 "content_preview": (
                     feedback.content.get("text", "")[:100] + "..."
                     if len(feedback.content.get("text", "")) > 100
                     else feedback.content.get("text", "")
                 ),
-                "teacher_name": teacher.tg_handle,
+                "teacher_name": found.tg_handle,
             },
         )
 
         return feedback
 
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
         )
 
 
 @router.get("/submission/{submission_id}", response_model=List[Feedback])
-def get_submission_feedback(
+async def get_submission_feedback(
     submission_id: str,
+    request: Request,
+    response: Response,
     submission_status: Optional[str] = None,
-    offset: int = 0,
+    min_score: Optional[int] = None,
+    max_score: Optional[int] = None,
+    sort: Optional[str] = None,
+    fields: Optional[str] = None,
+    view: Optional[str] = None,
+    cursor: Optional[str] = None,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     # Verify submission exists
-    submission = db.get(Submission, submission_id)
+    submission = (
+        await db.exec(
+            select(Submission).where(
+                Submission.id == submission_id,
+                *created_near(Submission, [submission_id]),
+            )
+        )
+    ).first()
     if not submission:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Submission not found"
         )
 
-    query = select(Feedback).where(Feedback.submission_id == submission_id)
+    selected = parse_fields(Feedback, fields, view, FEEDBACK_SUMMARY)
+    sort_by = parse_sort(sort, FEEDBACK_SORTS)
+    query = select(*select_columns(Feedback, selected, sort_by)).where(
+        Feedback.submission_id == submission_id,
+        # Feedback comes after its submission: skip the months before it
+        Feedback.created_at >= submission.created_at - ID_TIME_SLACK,
+    )
 
     if submission_status:
         query = query.where(Feedback.status == submission_status)
+    if min_score is not None:
+        query = query.where(Feedback.score >= min_score)
+    if max_score is not None:
+        query = query.where(Feedback.score <= max_score)
 
-    feedback_list = db.exec(query.offset(offset).limit(limit)).all()
+    feedback_list = (
+        await db.exec(paginate(query, Feedback, cursor, limit, sort_by))
+    ).all()
+    set_next_cursor(response, feedback_list, limit, sort_by)
+    not_modified = check_etag(request, response, feedback_list)
+    if not_modified:
+        return not_modified
 
-    return feedback_list
+    if selected is None:
+        return fast_json(request, response, feedback_list)
+    return fast_json(request, response, to_dicts(feedback_list, selected))
 
 
 import os
 from typing import Dict, List
 
-from openai import OpenAI
+from openai import AsyncOpenAI
 from pydantic import BaseModel, Field
 
 
@@ -173,7 +344,9 @@ class FeedbackGenerationModel(BaseModel):
 
 
 @router.post("/generate/", response_model=Dict)
-def generate_feedback(request: GenerateFeedbackRequest, db: Session = Depends(get_db)):
+async def generate_feedback(
+    request: GenerateFeedbackRequest, db: AsyncSession = Depends(get_db)
+):
     # logger.info(f"Received feedback generation request: {request}")
 
     chat_context = request.chat_context
@@ -206,7 +379,7 @@ def generate_feedback(request: GenerateFeedbackRequest, db: Session = Depends(ge
     Note: Base your evaluation solely on the actual submitted content, not on what an ideal submission might contain.
 """
 
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
     # Modify the last user message
     if chat_context and chat_context[-1]["role"] == "user":
@@ -217,7 +390,7 @@ def generate_feedback(request: GenerateFeedbackRequest, db: Session = Depends(ge
     logger.info(f"Submission generation messages: {json.dumps(chat_context, indent=4)}")
 
     try:
-        completion = client.beta.chat.completions.parse(
+        completion = await client.beta.chat.completions.parse(
             model="gpt-4o",
             messages=chat_context,
             response_format=FeedbackGenerationModel,
@@ -240,10 +413,10 @@ def generate_feedback(request: GenerateFeedbackRequest, db: Session = Depends(ge
 
         # Save to database using the create_feedback endpoint
         # db.add(feedback)
-        # db.commit()
-        # db.refresh(feedback)
+        # await db.commit()
+        # await db.refresh(feedback)
 
-        result = create_feedback(feedback=feedback, db=db)
+        result = await create_feedback(feedback=feedback, db=db)
 
         logger.info(f"Created feedback: {result.id}")
 
@@ -3,20 +3,49 @@
 2. `POST /homework/assign/` - Assign new homework
 3. `GET /homework/student/{student_id}` - Get all homework for a student
 4. `GET /homework/teacher/{teacher_id}` - Get all homework from a teacher
+5. `POST /homework/batch` - Get several homework by ID
+6. `POST /homework/assign/bulk` - Assign many homework tasks in one transaction
+
+List endpoints take `fields=` / `view=summary` to return only some columns
+(see `app/api/fields.py`). They filter in SQL on the columns generated from
+`content`: `title=` (case-insensitive substring), `topic=`, `language_level=`,
+and `content=` (a JSON object the content must contain, e.g.
+`{"stress_level": "high"}`); and sort with `sort=title|topic|language_level`
+(`-` prefix for descending).
 """
 
+import asyncio
+import json
 import logging
-from typing import List, Optional
+from typing import Dict, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
-
-from ...db.base import get_db
-from ...queue.notifications import notify_homework_assigned
-from ...schemas.base import Status
-from ...schemas.homework import HomeworkTask
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from pydantic import BaseModel, Field
+from sqlalchemy import insert, update
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ...db.base import get_db, get_read_db
+from ...db.read_tables import insert_dashboard_rows
+from ...queue.notifications import (
+    notify_homework_assigned,
+    notify_homework_assigned_batch,
+)
+from ...schemas.base import Status, generated_fields
+from ...schemas.homework import (
+    HomeworkAssignment,
+    HomeworkTask,
+    HomeworkTaskBase,
+    HomeworkTaskWithStudents,
+)
 from ...schemas.submission import Submission
 from ...schemas.user import User, UserRole
+from ...schemas.views import StudentDashboard
+from ..batch import MAX_BATCH_SIZE, BatchRequest, fetch_by_ids
+from ..etag import check_etag
+from ..fields import parse_fields, select_columns, to_dicts
+from ..pagination import paginate, parse_sort, set_next_cursor
+from ..serialization import fast_json
 
 logger = logging.getLogger(__name__)
 
@@ -24,43 +53,155 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-from openai import OpenAI
+from openai import AsyncOpenAI
 
 router = APIRouter()
 
 
-@router.get("/{homework_id}", response_model=HomeworkTask)
-def get_homework_by_id(homework_id: str, db: Session = Depends(get_db)):
-    homework = db.get(HomeworkTask, homework_id)
+# Enough to render the bot's homework menus
+HOMEWORK_SUMMARY = ["status", "teacher_id", "content.title", "student_ids"]
+HOMEWORK_SORTS = {
+    "title": HomeworkTask.title,
+    "topic": HomeworkTask.topic,
+    "language_level": HomeworkTask.language_level,
+}
+
+
+def filter_homework(
+    query,
+    homework_status: Optional[str],
+    title: Optional[str],
+    topic: Optional[str],
+    language_level: Optional[str],
+    content: Optional[str],
+):
+    """Apply the list endpoints' filters to a homework query"""
+    if homework_status:
+        query = query.where(HomeworkTask.status == homework_status)
+    if title:
+        query = query.where(HomeworkTask.title.icontains(title, autoescape=True))
+    if topic:
+        query = query.where(HomeworkTask.topic == topic)
+    if language_level:
+        query = query.where(HomeworkTask.language_level == language_level)
+    if content:
+        try:
+            contained = json.loads(content)
+        except ValueError:
+            contained = None
+        if not isinstance(contained, dict):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="content must be a JSON object",
+            )
+        query = query.where(HomeworkTask.content.contains(contained))
+    return query
+
+
+async def load_student_ids(
+    db: AsyncSession, homework_ids: List[str]
+) -> Dict[str, List[str]]:
+    """Assigned student ids of each homework, in a single query"""
+    student_ids = {homework_id: [] for homework_id in homework_ids}
+    if student_ids:
+        assignments = (
+            await db.exec(
+                select(HomeworkAssignment.homework_id, HomeworkAssignment.student_id)
+                .where(HomeworkAssignment.homework_id.in_(student_ids))
+                .order_by(HomeworkAssignment.assigned_at)
+            )
+        ).all()
+        for homework_id, student_id in assignments:
+            student_ids[homework_id].append(student_id)
+    return student_ids
+
+
+async def with_student_ids(
+    db: AsyncSession, homeworks: List[HomeworkTask]
+) -> List[HomeworkTaskWithStudents]:
+    """Attach assigned student ids to homework rows"""
+    student_ids = await load_student_ids(db, [homework.id for homework in homeworks])
+
+    # Rows are already valid, so skip re-validating every field
+    return [
+        HomeworkTaskWithStudents.model_construct(
+            **{name: getattr(homework, name) for name in HomeworkTaskBase.model_fields},
+            student_ids=student_ids[homework.id],
+        )
+        for homework in homeworks
+    ]
+
+
+async def homework_dicts(db: AsyncSession, rows, selected: List[str]) -> List[Dict]:
+    """Projected homework rows, with student ids if they were asked for"""
+    items = to_dicts(rows, selected)
+    if "student_ids" in selected:
+        student_ids = await load_student_ids(db, [item["id"] for item in items])
+        for item in items:
+            item["student_ids"] = student_ids[item["id"]]
+    return items
+
+
+@router.get("/{homework_id}", response_model=HomeworkTaskWithStudents)
+async def get_homework_by_id(
+    homework_id: str,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
+):
+    homework = await db.get(HomeworkTask, homework_id)
     if not homework:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Homework not found"
         )
-    return homework
+    not_modified = check_etag(request, response, [homework])
+    if not_modified:
+        return not_modified
+    return (await with_student_ids(db, [homework]))[0]
 
 
-@router.post("/assign/", response_model=HomeworkTask)
-def assign_homework(homework: HomeworkTask, db: Session = Depends(get_db)):
+@router.post("/batch", response_model=List[HomeworkTaskWithStudents])
+async def get_homework_batch(
+    batch: BatchRequest, db: AsyncSession = Depends(get_read_db)
+):
+    homework = await fetch_by_ids(db, HomeworkTask, batch.ids)
+    return await with_student_ids(db, homework)
+
+
+@router.post("/assign/", response_model=HomeworkTaskWithStudents)
+async def assign_homework(
+    homework: HomeworkTaskWithStudents, db: AsyncSession = Depends(get_db)
+):
     try:
         logger.info(f"Assigning homework: {homework}")
 
+        # The teacher and the students, in one query
+        users = (
+            await db.exec(
+                select(User).where(
+                    User.id.in_([homework.teacher_id, *homework.student_ids])
+                )
+            )
+        ).all()
+
         # Special case for AI teacher
         if homework.teacher_id == "usr_ai_teacher":
             logger.info("AI teacher detected, skipping teacher verification")
         else:
             # Verify teacher exists and is actually a teacher
-            teacher = db.get(User, homework.teacher_id)
+            teacher = next((u for u in users if u.id == homework.teacher_id), None)
             if not teacher or teacher.role != UserRole.TEACHER:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND, detail="Teacher not found"
                 )
 
         # Verify all students exist
-        students = db.exec(
-            select(User).where(
-                User.id.in_(homework.student_ids), User.role == UserRole.STUDENT
-            )
-        ).all()
+        student_ids = set(homework.student_ids)
+        students = [
+            user
+            for user in users
+            if user.id in student_ids and user.role == UserRole.STUDENT
+        ]
 
         logger.info(
             f"FFFFFound {len(students)} students, for {len(homework.student_ids)} of the assigned"
@@ -74,21 +215,47 @@ def assign_homework(homework: HomeworkTask, db: Session = Depends(get_db)):
 
         logger.info(f"Found {len(students)} students")
 
-        db.add(homework)
-        db.commit()
-        db.refresh(homework)
+        homework_task = HomeworkTask(
+            **homework.model_dump(exclude={"student_ids"}),
+            assigned_count=len(students),
+        )
+        db.add(homework_task)
+        # Flush the task first so the assignments' foreign keys resolve
+        await db.flush()
+        if students:
+            # The students' dashboard rows come from the inserted assignments,
+            # in the same statement (see app/db/read_tables.py)
+            assigned = (
+                insert(HomeworkAssignment)
+                .values(
+                    [
+                        HomeworkAssignment(
+                            homework_id=homework_task.id, student_id=student.id
+                        ).model_dump()
+                        for student in students
+                    ]
+                )
+                .returning(HomeworkAssignment)
+                .cte("assigned")
+            )
+            await db.exec(insert_dashboard_rows(assigned).add_cte(assigned))
+        await db.commit()
 
         logger.info(f"Assigned homework to {len(students)} students")
 
-        # Notify each student about new homework
-        for student in students:
-            notify_homework_assigned(
-                student_tg_id=student.telegram_id,
-                homework_data={
-                    "title": homework.content.get("title"),
-                    "description": homework.content.get("description"),
-                },
-            )
+        # Notify each student about new homework, off the event loop: pika
+        # blocks until the broker has each message
+        def notify_students():
+            for student in students:
+                notify_homework_assigned(
+                    student_tg_id=student.telegram_id,
+                    homework_data={
+                        "title": homework.content.get("title"),
+                        "description": homework.content.get("description") or "",
+                    },
+                )
+
+        await asyncio.to_thread(notify_students)
 
         return homework
     except Exception as e:
@@ -97,79 +264,239 @@ def assign_homework(homework: HomeworkTask, db: Session = Depends(get_db)):
         )
 
 
-@router.get("/student/{student_id}", response_model=List[HomeworkTask])
-def get_student_homework(
+# Rows per INSERT ... VALUES statement, well under PostgreSQL's bind parameter cap
+INSERT_CHUNK_SIZE = 1000
+
+
+async def insert_rows(db: AsyncSession, model, rows: List[dict]) -> None:
+    for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+        await db.exec(insert(model).values(rows[start : start + INSERT_CHUNK_SIZE]))
+
+
+class BulkAssignRequest(BaseModel):
+    tasks: List[HomeworkTaskWithStudents] = Field(
+        ..., min_length=1, max_length=MAX_BATCH_SIZE
+    )
+
+
+@router.post("/assign/bulk", response_model=List[HomeworkTaskWithStudents])
+async def assign_homework_bulk(
+    request: BulkAssignRequest, db: AsyncSession = Depends(get_db)
+):
+    tasks = request.tasks
+    for task in tasks:
+        task.student_ids = list(dict.fromkeys(task.student_ids))
+
+    # Validate every referenced teacher and student with one query each
+    teacher_ids = {task.teacher_id for task in tasks}
+    found_teacher_ids = set(
+        (
+            await db.exec(
+                select(User.id).where(
+                    User.id.in_(teacher_ids), User.role == UserRole.TEACHER
+                )
+            )
+        ).all()
+    )
+    if missing := teacher_ids - found_teacher_ids:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Teachers not found: {', '.join(sorted(missing))}",
+        )
+
+    student_ids = {student_id for task in tasks for student_id in task.student_ids}
+    students = {
+        student.id: student
+        for student in (
+            await db.exec(
+                select(User).where(
+                    User.id.in_(student_ids), User.role == UserRole.STUDENT
+                )
+            )
+        ).all()
+    }
+    if missing := student_ids - students.keys():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid student IDs: {', '.join(sorted(missing))}",
+        )
+
+    # Multi-row inserts for the tasks and their assignments, in one transaction
+    await insert_rows(
+        db,
+        HomeworkTask,
+        [
+            HomeworkTask(
+                **task.model_dump(exclude={"student_ids"}),
+                assigned_count=len(task.student_ids),
+            ).model_dump(exclude=generated_fields(HomeworkTask))
+            for task in tasks
+        ],
+    )
+    await insert_rows(
+        db,
+        HomeworkAssignment,
+        [
+            HomeworkAssignment(homework_id=task.id, student_id=student_id).model_dump()
+            for task in tasks
+            for student_id in task.student_ids
+        ],
+    )
+    # The students' dashboard rows, from the assignments just inserted
+    await db.exec(
+        insert_dashboard_rows(
+            HomeworkAssignment.__table__,
+            HomeworkAssignment.homework_id.in_([task.id for task in tasks]),
+        )
+    )
+    await db.commit()
+
+    logger.info(f"Assigned {len(tasks)} homework tasks in bulk")
+
+    if not await asyncio.to_thread(
+        notify_homework_assigned_batch,
+        [
+            (
+                students[student_id].telegram_id,
+                {
+                    "title": task.content.get("title"),
+                    "description": task.content.get("description") or "",
+                },
+            )
+            for task in tasks
+            for student_id in task.student_ids
+        ],
+    ):
+        logger.error("Failed to publish bulk homework notifications")
+
+    return tasks
+
+
+@router.get("/student/{student_id}", response_model=List[HomeworkTaskWithStudents])
+async def get_student_homework(
     student_id: str,
+    request: Request,
+    response: Response,
     homework_status: Optional[str] = None,
-    offset: int = 0,
+    title: Optional[str] = None,
+    topic: Optional[str] = None,
+    language_level: Optional[str] = None,
+    content: Optional[str] = None,
+    sort: Optional[str] = None,
+    fields: Optional[str] = None,
+    view: Optional[str] = None,
+    cursor: Optional[str] = None,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     # Verify student exists and is actually a student
-    student = db.get(User, student_id)
+    student = await db.get(User, student_id)
     if not student or student.role != UserRole.STUDENT:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Student not found"
         )
 
-    query = select(HomeworkTask).where(HomeworkTask.student_ids.contains([student_id]))
-
-    if homework_status:
-        query = query.where(HomeworkTask.status == homework_status)
-
-    homework = db.exec(query.offset(offset).limit(limit)).all()
-
-    return homework
-
-
-@router.get("/teacher/{teacher_id}", response_model=List[HomeworkTask])
-def get_teacher_homework(
+    selected = parse_fields(
+        HomeworkTask, fields, view, HOMEWORK_SUMMARY, extra=["student_ids"]
+    )
+    sort_by = parse_sort(sort, HOMEWORK_SORTS)
+    query = (
+        select(*select_columns(HomeworkTask, selected, sort_by))
+        .join(HomeworkAssignment, HomeworkAssignment.homework_id == HomeworkTask.id)
+        .where(HomeworkAssignment.student_id == student_id)
+    )
+    query = filter_homework(
+        query, homework_status, title, topic, language_level, content
+    )
+
+    homework = (
+        await db.exec(paginate(query, HomeworkTask, cursor, limit, sort_by))
+    ).all()
+    set_next_cursor(response, homework, limit, sort_by)
+    not_modified = check_etag(request, response, homework)
+    if not_modified:
+        return not_modified
+
+    if selected is None:
+        return fast_json(request, response, await with_student_ids(db, homework))
+    return fast_json(request, response, await homework_dicts(db, homework, selected))
+
+
+@router.get("/teacher/{teacher_id}", response_model=List[HomeworkTaskWithStudents])
+async def get_teacher_homework(
     teacher_id: str,
+    request: Request,
+    response: Response,
     homework_status: Optional[str] = None,
-    offset: int = 0,
+    title: Optional[str] = None,
+    topic: Optional[str] = None,
+    language_level: Optional[str] = None,
+    content: Optional[str] = None,
+    sort: Optional[str] = None,
+    fields: Optional[str] = None,
+    view: Optional[str] = None,
+    cursor: Optional[str] = None,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     # Verify teacher exists and is actually a teacher
-    teacher = db.get(User, teacher_id)
+    teacher = await db.get(User, teacher_id)
     if not teacher or teacher.role != UserRole.TEACHER:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Teacher not found"
         )
 
-    query = select(HomeworkTask).where(HomeworkTask.teacher_id == teacher_id)
-
-    if homework_status:
-        query = query.where(HomeworkTask.status == homework_status)
-
-    homework = db.exec(query.offset(offset).limit(limit)).all()
-
-    return homework
+    selected = parse_fields(
+        HomeworkTask, fields, view, HOMEWORK_SUMMARY, extra=["student_ids"]
+    )
+    sort_by = parse_sort(sort, HOMEWORK_SORTS)
+    query = select(*select_columns(HomeworkTask, selected, sort_by)).where(
+        HomeworkTask.teacher_id == teacher_id
+    )
+    query = filter_homework(
+        query, homework_status, title, topic, language_level, content
+    )
+
+    homework = (
+        await db.exec(paginate(query, HomeworkTask, cursor, limit, sort_by))
+    ).all()
+    set_next_cursor(response, homework, limit, sort_by)
+    not_modified = check_etag(request, response, homework)
+    if not_modified:
+        return not_modified
+
+    if selected is None:
+        return fast_json(request, response, await with_student_ids(db, homework))
+    return fast_json(request, response, await homework_dicts(db, homework, selected))
 
 
 @router.patch("/{homework_id}/status")
-def update_homework_status(
-    homework_id: str, status: Status, db: Session = Depends(get_db)
+async def update_homework_status(
+    homework_id: str, status: Status, db: AsyncSession = Depends(get_db)
 ):
-    homework = db.get(HomeworkTask, homework_id)
+    homework = await db.get(HomeworkTask, homework_id)
     if not homework:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Homework not found"
         )
 
     homework.status = status
-    db.commit()
-    db.refresh(homework)
-    return homework
+    await db.exec(
+        update(StudentDashboard)
+        .where(StudentDashboard.id == homework_id)
+        .values(status=status)
+    )
+    await db.commit()
+    return (await with_student_ids(db, [homework]))[0]
 
 
 # @router.get("/by_submission/{submission_id}", response_model=HomeworkTask)
 # def get_homework_by_submission_id(
 #     submission_id: str,
-#     db: Session = Depends(get_db)
+#     db: AsyncSession = Depends(get_db)
 # ):
 #     # First get the submission to find its homework_task_id
-#     submission = db.get(Submission, submission_id)
+#     submission = await db.get(Submission, submission_id)
 #     if not submission:
 #         raise HTTPException(
 #             status_code=status.HTTP_404_NOT_FOUND,
@@ -177,7 +504,7 @@ def update_homework_status(
 #         )
 
 #     # Then get the homework task
-#     homework = db.get(HomeworkTask, submission.homework_task_id)
+#     homework = await db.get(HomeworkTask, submission.homework_task_id)
 #     if not homework:
 #         raise HTTPException(
 #             status_code=status.HTTP_404_NOT_FOUND,
@@ -207,7 +534,9 @@ class GenerateHomeworkRequest(BaseModel):
 
 
 @router.post("/generate/", response_model=Dict)
-def generate_homework(request: GenerateHomeworkRequest, db: Session = Depends(get_db)):
+async def generate_homework(
+    request: GenerateHomeworkRequest, db: AsyncSession = Depends(get_db)
+):
     logger.info(f"Received request: {request}")
 
     topic = request.homework_topic
@@ -216,7 +545,7 @@ def generate_homework(request: GenerateHomeworkRequest, db: Session = Depends(ge
     chat_context = request.chat_context
     student_id = request.student_id
 
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
     # Modify the last user message
     if chat_context and chat_context[-1]["role"] == "user":
@@ -227,7 +556,7 @@ def generate_homework(request: GenerateHomeworkRequest, db: Session = Depends(ge
     logger.info(f"Completion: {chat_context}")
 
     try:
-        completion = client.beta.chat.completions.parse(
+        completion = await client.beta.chat.completions.parse(
             model="gpt-4o",
             messages=chat_context,
             response_format=HomeworkGenerationModel,
@@ -239,7 +568,7 @@ def generate_homework(request: GenerateHomeworkRequest, db: Session = Depends(ge
         title = completion.choices[0].message.parsed.title
 
         # Create a HomeworkTask instance
-        homework_task = HomeworkTask(
+        homework_task = HomeworkTaskWithStudents(
             teacher_id="usr_ai_teacher",
             student_ids=[student_id],
             content={
@@ -254,7 +583,7 @@ def generate_homework(request: GenerateHomeworkRequest, db: Session = Depends(ge
         logger.info(f"Parsed all data: {homework_task}")
 
         # Call assign_homework with the created instance
-        result = assign_homework(homework=homework_task, db=db)
+        result = await assign_homework(homework=homework_task, db=db)
 
         logger.info(f"Assigned: {result.id}")
 
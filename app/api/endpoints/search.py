@@ -0,0 +1,213 @@
+"""
+1. `GET /search/homework?q=` - Homework matching by title or text
+2. `GET /search/submissions?q=` - Submissions matching by text or homework title
+3. `GET /search/feedback?q=` - Feedback matching by text or homework title
+
+Every search is scoped to one user, `student_id=` or `teacher_id=`, and
+returns up to `limit` rows, best matches first. Titles match fuzzily through
+pg_trgm word similarity ("past tnse" finds "Past tense"); text bodies match
+through the full-text indexes, with `q` in web search syntax. Each row's `rank`
+is the better of its title similarity and its text rank.
+
+Where the pg_trgm extension isn't installed, titles fall back to an
+unindexed case-insensitive substring match.
+"""
+
+from typing import List, Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import case, func, literal, or_, text
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ...db.base import get_read_db
+from ...schemas.base import SEARCH_CONFIG, search_vector
+from ...schemas.feedback import Feedback
+from ...schemas.homework import HomeworkAssignment, HomeworkTask
+from ...schemas.search import (
+    FeedbackSearchResult,
+    HomeworkSearchResult,
+    SubmissionSearchResult,
+)
+from ...schemas.submission import Submission
+from ...schemas.user import UserRole
+from ..serialization import fast_json
+from .views import get_user_with_role
+
+SEARCH_LIMIT = 10
+MAX_SEARCH_LIMIT = 100
+
+router = APIRouter()
+
+# Whether the database has pg_trgm, looked up once per process
+_pg_trgm: Optional[bool] = None
+
+
+async def has_pg_trgm(db: AsyncSession) -> bool:
+    global _pg_trgm
+    if _pg_trgm is None:
+        result = await db.execute(
+            text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        )
+        _pg_trgm = result.scalar() is not None
+    return _pg_trgm
+
+
+def title_match(title, q: str, trigram: bool) -> Tuple:
+    """Condition and rank of a fuzzy title match"""
+    if trigram:
+        # `q <% title` is the indexable form of word_similarity >= threshold
+        return literal(q).op("<%")(title), func.word_similarity(q, title)
+    matched = title.icontains(q, autoescape=True)
+    return matched, case((matched, 1.0), else_=0.0)
+
+
+def text_match(vector, q: str) -> Tuple:
+    """Condition and rank of a full-text match"""
+    tsquery = func.websearch_to_tsquery(text(f"'{SEARCH_CONFIG}'::regconfig"), q)
+    return vector.op("@@")(tsquery), func.ts_rank(vector, tsquery)
+
+
+async def search_scope(
+    db: AsyncSession, student_id: Optional[str], teacher_id: Optional[str]
+) -> Tuple[UserRole, str]:
+    """The one user a search is scoped to"""
+    if bool(student_id) == bool(teacher_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Pass exactly one of student_id or teacher_id",
+        )
+    if student_id:
+        await get_user_with_role(db, student_id, UserRole.STUDENT)
+        return UserRole.STUDENT, student_id
+    await get_user_with_role(db, teacher_id, UserRole.TEACHER)
+    return UserRole.TEACHER, teacher_id
+
+
+def ranked(query, model, matches: List[Tuple], limit: int):
+    """Keep rows with any match, best first"""
+    conditions, ranks = zip(*matches)
+    rank = func.greatest(*ranks)
+    return (
+        query.add_columns(rank.label("rank"))
+        .where(or_(*conditions))
+        .order_by(rank.desc(), model.created_at.desc(), model.id)
+        .limit(limit)
+    )
+
+
+@router.get("/homework", response_model=List[HomeworkSearchResult])
+async def search_homework(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=1),
+    student_id: Optional[str] = None,
+    teacher_id: Optional[str] = None,
+    limit: int = Query(SEARCH_LIMIT, ge=1, le=MAX_SEARCH_LIMIT),
+    db: AsyncSession = Depends(get_read_db),
+):
+    role, user_id = await search_scope(db, student_id, teacher_id)
+
+    query = select(
+        HomeworkTask.id,
+        HomeworkTask.created_at,
+        HomeworkTask.status,
+        HomeworkTask.teacher_id,
+        HomeworkTask.title,
+        HomeworkTask.content,
+    )
+    if role == UserRole.STUDENT:
+        query = query.join(
+            HomeworkAssignment, HomeworkAssignment.homework_id == HomeworkTask.id
+        ).where(HomeworkAssignment.student_id == user_id)
+    else:
+        query = query.where(HomeworkTask.teacher_id == user_id)
+
+    trigram = await has_pg_trgm(db)
+    matches = [
+        title_match(HomeworkTask.title, q, trigram),
+        text_match(search_vector(HomeworkTask.content, "title", "description"), q),
+    ]
+    rows = (await db.exec(ranked(query, HomeworkTask, matches, limit))).all()
+    return fast_json(request, response, [row._mapping for row in rows])
+
+
+@router.get("/submissions", response_model=List[SubmissionSearchResult])
+async def search_submissions(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=1),
+    student_id: Optional[str] = None,
+    teacher_id: Optional[str] = None,
+    submission_status: Optional[str] = None,
+    limit: int = Query(SEARCH_LIMIT, ge=1, le=MAX_SEARCH_LIMIT),
+    db: AsyncSession = Depends(get_read_db),
+):
+    role, user_id = await search_scope(db, student_id, teacher_id)
+
+    query = select(
+        Submission.id,
+        Submission.created_at,
+        Submission.status,
+        Submission.student_id,
+        Submission.teacher_id,
+        Submission.homework_task_id,
+        HomeworkTask.title.label("homework_title"),
+        HomeworkTask.content.label("homework_content"),
+        Submission.content,
+    ).join(HomeworkTask, HomeworkTask.id == Submission.homework_task_id)
+    if role == UserRole.STUDENT:
+        query = query.where(Submission.student_id == user_id)
+    else:
+        query = query.where(Submission.teacher_id == user_id)
+    if submission_status:
+        query = query.where(Submission.status == submission_status)
+
+    trigram = await has_pg_trgm(db)
+    matches = [
+        title_match(HomeworkTask.title, q, trigram),
+        text_match(search_vector(Submission.content, "text"), q),
+    ]
+    rows = (await db.exec(ranked(query, Submission, matches, limit))).all()
+    return fast_json(request, response, [row._mapping for row in rows])
+
+
+@router.get("/feedback", response_model=List[FeedbackSearchResult])
+async def search_feedback(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=1),
+    student_id: Optional[str] = None,
+    teacher_id: Optional[str] = None,
+    limit: int = Query(SEARCH_LIMIT, ge=1, le=MAX_SEARCH_LIMIT),
+    db: AsyncSession = Depends(get_read_db),
+):
+    role, user_id = await search_scope(db, student_id, teacher_id)
+
+    query = (
+        select(
+            Feedback.id,
+            Feedback.created_at,
+            Feedback.submission_id,
+            Feedback.student_id,
+            Feedback.teacher_id,
+            Submission.homework_task_id,
+            HomeworkTask.title.label("homework_title"),
+            Feedback.score,
+            Feedback.content,
+        )
+        .join(Submission, Submission.id == Feedback.submission_id)
+        .join(HomeworkTask, HomeworkTask.id == Submission.homework_task_id)
+    )
+    if role == UserRole.STUDENT:
+        query = query.where(Feedback.student_id == user_id)
+    else:
+        query = query.where(Feedback.teacher_id == user_id)
+
+    trigram = await has_pg_trgm(db)
+    matches = [
+        title_match(HomeworkTask.title, q, trigram),
+        text_match(search_vector(Feedback.content, "text"), q),
+    ]
+    rows = (await db.exec(ranked(query, Feedback, matches, limit))).all()
+    return fast_json(request, response, [row._mapping for row in rows])
@@ -3,80 +3,216 @@
 2. `POST /submissions/` - Create new submission
 3. `GET /submissions/student/{student_id}` - Get all submissions from a student
 4. `GET /submissions/teacher/{teacher_id}` - Get all submissions for a teacher
+5. `POST /submissions/batch` - Get several submissions by ID
+
+List endpoints take `fields=` / `view=summary` to return only some columns
+(see `app/api/fields.py`).
 """
 
+import asyncio
+from datetime import datetime
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import insert, literal, update
+from sqlalchemy.orm import aliased
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from ...db.base import get_db
+from ...db.base import get_db, get_read_db
+from ...db.partitions import created_at_matches_id, created_near
 from ...queue.notifications import notify_submission_received
 from ...schemas.base import Status
-from ...schemas.homework import HomeworkTask
+from ...schemas.homework import HomeworkAssignment, HomeworkTask
 from ...schemas.submission import Submission
 from ...schemas.user import User, UserRole
+from ...schemas.views import StudentDashboard, TeacherInbox
+from ..batch import BatchRequest, fetch_by_ids
+from ..etag import check_etag
+from ..fields import parse_fields, select_columns, to_dicts
+from ..pagination import paginate, set_next_cursor
+from ..serialization import fast_json
 
 router = APIRouter()
 
+# Enough to render and resolve the bot's submission menus
+SUBMISSION_SUMMARY = ["status", "student_id", "teacher_id", "homework_task_id"]
+
 
 @router.get("/{submission_id}", response_model=Submission)
-def get_submission_by_id(submission_id: str, db: Session = Depends(get_db)):
-    submission = db.get(Submission, submission_id)
+async def get_submission_by_id(
+    submission_id: str,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
+):
+    # Bounded by the id's time, to only look into that month's partition
+    submission = (
+        await db.exec(
+            select(Submission).where(
+                Submission.id == submission_id,
+                *created_near(Submission, [submission_id]),
+            )
+        )
+    ).first()
     if not submission:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Submission not found"
         )
+    not_modified = check_etag(request, response, [submission])
+    if not_modified:
+        return not_modified
     return submission
 
 
+@router.post("/batch", response_model=List[Submission])
+async def get_submissions_batch(
+    batch: BatchRequest, db: AsyncSession = Depends(get_read_db)
+):
+    return await fetch_by_ids(
+        db, Submission, batch.ids, *created_near(Submission, batch.ids)
+    )
+
+
 @router.post("/", response_model=Submission)
-def create_submission(submission: Submission, db: Session = Depends(get_db)):
+async def create_submission(submission: Submission, db: AsyncSession = Depends(get_db)):
+    if not created_at_matches_id(submission):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="created_at doesn't match the time in the id",
+        )
+
+    # Everything the checks and the notification need, in one query
+    student = aliased(User)
+    teacher = aliased(User)
+    found = (
+        await db.exec(
+            select(
+                student.role,
+                student.tg_handle,
+                HomeworkTask.status.label("homework_status"),
+                HomeworkTask.teacher_id,
+                HomeworkTask.title,
+                HomeworkAssignment.student_id.label("assigned_student_id"),
+                teacher.telegram_id.label("teacher_telegram_id"),
+            )
+            .select_from(student)
+            .outerjoin(HomeworkTask, HomeworkTask.id == submission.homework_task_id)
+            .outerjoin(
+                HomeworkAssignment,
+                (HomeworkAssignment.homework_id == HomeworkTask.id)
+                & (HomeworkAssignment.student_id == student.id),
+            )
+            .outerjoin(teacher, teacher.id == HomeworkTask.teacher_id)
+            .where(student.id == submission.student_id)
+        )
+    ).first()
+
     # Verify student exists and is actually a student
-    student = db.get(User, submission.student_id)
-    if not student or student.role != UserRole.STUDENT:
+    if not found or found.role != UserRole.STUDENT:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Student not found"
         )
 
     # Verify homework exists and student is assigned to it
-    homework = db.get(HomeworkTask, submission.homework_task_id)
-    if not homework:
+    if not found.homework_status:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Homework task not found"
         )
 
     # Add validation for cancelled homework
-    if homework.status == Status.CANCELLED:
+    if found.homework_status == Status.CANCELLED:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Cannot submit to cancelled homework",
         )
 
-    if submission.student_id not in homework.student_ids:
+    if not found.assigned_student_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Student is not assigned to this homework",
         )
 
     # Verify that teacher_id matches homework's teacher
-    if submission.teacher_id != homework.teacher_id:
+    if submission.teacher_id != found.teacher_id:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Teacher ID doesn't match homework's teacher",
         )
 
-    db.add(submission)
-    db.commit()
-    db.refresh(submission)
+    # Count the student towards the homework only on their first submission,
+    # in the same statement as the insert
+    now = datetime.utcnow()
+    first_submission = (
+        update(HomeworkAssignment)
+        .where(
+            HomeworkAssignment.homework_id == submission.homework_task_id,
+            HomeworkAssignment.student_id == submission.student_id,
+            HomeworkAssignment.submitted_at.is_(None),
+        )
+        .values(submitted_at=now)
+        .returning(HomeworkAssignment.homework_id)
+        .cte("first_submission")
+    )
+    counted = (
+        update(HomeworkTask)
+        .where(HomeworkTask.id == first_submission.c.homework_id)
+        .values(
+            submitted_count=HomeworkTask.submitted_count + 1,
+            # Anonymous, as the insert's own `updated_at` parameter takes the name
+            updated_at=literal(now),
+        )
+        .cte("counted")
+    )
+    # The student's dashboard and the teacher's inbox follow in the same
+    # statement too (see app/db/read_tables.py)
+    submitted = (
+        update(StudentDashboard)
+        .where(
+            StudentDashboard.id == first_submission.c.homework_id,
+            StudentDashboard.student_id == submission.student_id,
+        )
+        .values(submitted_at=literal(now))
+        .cte("submitted")
+    )
+    ctes = [first_submission, counted, submitted]
+    if submission.status == Status.PENDING:
+        inbox = TeacherInbox.__table__.c
+        row = {
+            "id": submission.id,
+            "created_at": submission.created_at,
+            "status": submission.status,
+            "teacher_id": submission.teacher_id,
+            "student_id": submission.student_id,
+            "student_handle": found.tg_handle,
+            "homework_task_id": submission.homework_task_id,
+            "homework_title": found.title or "Untitled",
+            "content": submission.content,
+        }
+        # Anonymous, as the submission's own parameters take the names
+        values = {
+            inbox[name]: literal(value, inbox[name].type) for name, value in row.items()
+        }
+        ctes.append(insert(TeacherInbox).values(values).cte("inboxed"))
+
+    submission = (
+        await db.exec(
+            insert(Submission)
+            .values(**submission.model_dump())
+            .returning(Submission)
+            .add_cte(*ctes)
+        )
+    ).scalar_one()
+    await db.commit()
 
-    # Get teacher info and notify about new submission
-    teacher = db.get(User, submission.teacher_id)
-    notify_submission_received(
-        teacher_tg_id=teacher.telegram_id,
+    # Notify the teacher about the new submission, off the event loop: pika
+    # blocks until the broker has the message
+    await asyncio.to_thread(
+        notify_submission_received,
+        teacher_tg_id=found.teacher_telegram_id,
         submission_data={
-            "student_name": student.tg_handle,
-            "homework_title": homework.content.get("title", "Untitled"),
+            "student_name": found.tg_handle,
+            "homework_title": found.title or "Untitled",
             "submission_id": submission.id,
             "content_preview": (
                 submission.content.get("text", "")[:100] + "..."
@@ -90,50 +226,76 @@ def create_submission(submission: Submission, db: Session = Depends(get_db)):
 
 
 @router.get("/student/{student_id}", response_model=List[Submission])
-def get_student_submissions(
+async def get_student_submissions(
     student_id: str,
+    request: Request,
+    response: Response,
     submission_status: Optional[str] = None,
-    offset: int = 0,
+    fields: Optional[str] = None,
+    view: Optional[str] = None,
+    cursor: Optional[str] = None,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     # Verify student exists and is actually a student
-    student = db.get(User, student_id)
+    student = await db.get(User, student_id)
     if not student or student.role != UserRole.STUDENT:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Student not found"
         )
 
-    query = select(Submission).where(Submission.student_id == student_id)
+    selected = parse_fields(Submission, fields, view, SUBMISSION_SUMMARY)
+    query = select(*select_columns(Submission, selected)).where(
+        Submission.student_id == student_id
+    )
 
     if submission_status:
         query = query.where(Submission.status == submission_status)
 
-    submissions = db.exec(query.offset(offset).limit(limit)).all()
+    submissions = (await db.exec(paginate(query, Submission, cursor, limit))).all()
+    set_next_cursor(response, submissions, limit)
+    not_modified = check_etag(request, response, submissions)
+    if not_modified:
+        return not_modified
 
-    return submissions
+    if selected is None:
+        return fast_json(request, response, submissions)
+    return fast_json(request, response, to_dicts(submissions, selected))
 
 
 @router.get("/teacher/{teacher_id}", response_model=List[Submission])
-def get_teacher_submissions(
+async def get_teacher_submissions(
     teacher_id: str,
+    request: Request,
+    response: Response,
     submission_status: Optional[str] = None,
-    offset: int = 0,
+    fields: Optional[str] = None,
+    view: Optional[str] = None,
+    cursor: Optional[str] = None,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     # Verify teacher exists and is actually a teacher
-    teacher = db.get(User, teacher_id)
+    teacher = await db.get(User, teacher_id)
     if not teacher or teacher.role != UserRole.TEACHER:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Teacher not found"
         )
 
-    query = select(Submission).where(Submission.teacher_id == teacher_id)
+    selected = parse_fields(Submission, fields, view, SUBMISSION_SUMMARY)
+    query = select(*select_columns(Submission, selected)).where(
+        Submission.teacher_id == teacher_id
+    )
 
     if submission_status:
         query = query.where(Submission.status == submission_status)
 
-    submissions = db.exec(query.offset(offset).limit(limit)).all()
+    submissions = (await db.exec(paginate(query, Submission, cursor, limit))).all()
+    set_next_cursor(response, submissions, limit)
+    not_modified = check_etag(request, response, submissions)
+    if not_modified:
+        return not_modified
 
-    return submissions
+    if selected is None:
+        return fast_json(request, response, submissions)
+    return fast_json(request, response, to_dicts(submissions, selected))
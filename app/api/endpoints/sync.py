@@ -0,0 +1,148 @@
+"""
+1. `GET /sync?scope=teacher:{id}|student:{id}&since=<cursor>` - Homework,
+   submissions and feedback created or changed after the cursor
+
+Every write to those tables takes the next value of the `change_seq`
+sequence into the row's `change_seq` column (see `change_sequence`), so the
+rows changed since a cursor are an index range per table. Clients keep the
+returned `cursor` and pass it as `since` next time; `since=0` (the default)
+returns everything in scope. `has_more` means a list was cut at `limit`:
+call again with the new cursor right away.
+
+A sequence value is taken when the row is written, not when its transaction
+commits, so a slow transaction can commit values below ones already
+returned. The cursor therefore only moves past rows unchanged for
+`SYNC_LAG`; rows changed more recently come again with the next call, and
+clients should keep the row with the highest `change_seq` per `id`.
+Transactions open for longer than that can still be missed.
+"""
+
+from datetime import datetime, timedelta
+from typing import List, Sequence
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from sqlalchemy import Select, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ...db.base import get_read_db
+from ...schemas.feedback import Feedback
+from ...schemas.homework import HomeworkAssignment, HomeworkTask
+from ...schemas.submission import Submission
+from ...schemas.sync import SyncResult
+from ...schemas.user import UserRole
+from ..serialization import fast_json
+from .views import get_user_with_role
+
+SYNC_LAG = timedelta(minutes=1)
+SYNC_LIMIT = 100
+MAX_SYNC_LIMIT = 1000
+
+router = APIRouter()
+
+
+def parse_scope(scope: str):
+    """`(role, user id)` of `teacher:{id}` or `student:{id}`"""
+    role, _, user_id = scope.partition(":")
+    if role not in (UserRole.TEACHER.value, UserRole.STUDENT.value) or not user_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid scope, expected teacher:{id} or student:{id}",
+        )
+    return UserRole(role), user_id
+
+
+def changes(model, since: int, *where, join=None) -> Select:
+    """Plain table rows of `model` changed after `since`, in change order"""
+    query = select(model.__table__)
+    if join is not None:
+        query = query.join(*join)
+    return query.where(*where, model.change_seq > since).order_by(model.change_seq)
+
+
+def scope_sections(role: UserRole, user_id: str, since: int) -> List[Select]:
+    """Changed homework, submissions and feedback of the user"""
+    if role == UserRole.TEACHER:
+        return [
+            changes(HomeworkTask, since, HomeworkTask.teacher_id == user_id),
+            changes(Submission, since, Submission.teacher_id == user_id),
+            changes(Feedback, since, Feedback.teacher_id == user_id),
+        ]
+    return [
+        changes(
+            HomeworkTask,
+            since,
+            HomeworkAssignment.student_id == user_id,
+            join=(
+                HomeworkAssignment,
+                HomeworkAssignment.homework_id == HomeworkTask.id,
+            ),
+        ),
+        changes(Submission, since, Submission.student_id == user_id),
+        changes(Feedback, since, Feedback.student_id == user_id),
+    ]
+
+
+def next_cursor(since: int, lists: Sequence[Sequence], limit: int) -> int:
+    """Highest `change_seq` up to which every row in scope has been returned"""
+    # Lists cut at `limit` continue past their last row
+    ends = [rows[-1].change_seq for rows in lists if len(rows) >= limit]
+    cursor = (
+        min(ends)
+        if ends
+        else max((row.change_seq for rows in lists for row in rows), default=since)
+    )
+    # Rows changed within `SYNC_LAG` hold it back to the last settled row
+    # before them: values between the two may belong to writes yet to commit
+    # (see the module docstring)
+    settled = datetime.utcnow() - SYNC_LAG
+    rows = [row for rows in lists for row in rows if row.change_seq <= cursor]
+    recent = [row.change_seq for row in rows if row.updated_at >= settled]
+    if recent:
+        cursor = max(
+            (row.change_seq for row in rows if row.change_seq < min(recent)),
+            default=since,
+        )
+    return max(cursor, since)
+
+
+@router.get("", response_model=SyncResult)
+async def sync(
+    scope: str,
+    request: Request,
+    response: Response,
+    since: int = Query(0, ge=0),
+    limit: int = Query(SYNC_LIMIT, ge=1, le=MAX_SYNC_LIMIT),
+    db: AsyncSession = Depends(get_read_db),
+):
+    role, user_id = parse_scope(scope)
+
+    lists = [
+        (await db.exec(query.limit(limit))).all()
+        for query in scope_sections(role, user_id, since)
+    ]
+    if not any(lists):
+        await get_user_with_role(db, user_id, role)
+    homework, submissions, feedback = lists
+    cursor = next_cursor(since, lists, limit)
+
+    return fast_json(
+        request,
+        response,
+        {
+            "homework": [row._mapping for row in homework],
+            "submissions": [row._mapping for row in submissions],
+            "feedback": [row._mapping for row in feedback],
+            "cursor": cursor,
+            # Not while recent rows hold the cursor back: the same page would
+            # come again
+            "has_more": cursor > since and any(len(rows) >= limit for rows in lists),
+        },
+    )
@@ -6,17 +6,38 @@
 5. `/users/students/` - Get all students
 6. `/users/teachers/` - Get all teachers
 7. `/users/` (POST) - Create new user
+8. `/users/batch` (POST) - Get several users by ID
+9. `/users/import` (POST) - Bulk import users from CSV or NDJSON
+10. `/users/by_telegram_id/{telegram_id}` (PUT) - Create or update a user by
+    Telegram ID, answering 201 when it was created
 """
 
 import logging
 import os
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, or_, select
-
-from ...db.base import get_db
-from ...schemas.user import User, UserRole
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import case, cast, literal, literal_column, or_, update
+from sqlalchemy.dialects.postgresql import JSONB, insert
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ...db.base import get_db, get_primary_read_db, get_read_db
+from ...db.import_users import import_users, iter_lines
+from ...schemas.user import (
+    User,
+    UserImportResult,
+    UserRole,
+    UserUpsert,
+    UserUpsertResult,
+)
+from ...schemas.views import StudentDashboard, TeacherInbox
+from ..batch import BatchRequest, fetch_by_ids
+from ..etag import check_etag
+from ..pagination import paginate, set_next_cursor
+from ..serialization import fast_json
+from ..user_cache import get_cached_user, user_cache
 
 logger = logging.getLogger(__name__)
 
@@ -25,7 +46,7 @@ router = APIRouter()
 # @router.get("/me", response_model=User)
 # def get_current_user(
 #     tg_handle: str,  # This would come from auth/security in real app
-#     db: Session = Depends(get_db)
+#     db: AsyncSession = Depends(get_db)
 # ):
 #     user = db.exec(
 #         select(User).where(User.tg_handle == tg_handle)
@@ -40,44 +61,155 @@ router = APIRouter()
 
 
 @router.get("/by_telegram_id/{telegram_id}", response_model=User)
-def get_user_by_telegram_id(telegram_id: str, db: Session = Depends(get_db)):
-    user = db.exec(select(User).where(User.telegram_id == telegram_id)).first()
+async def get_user_by_telegram_id(
+    telegram_id: str,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_primary_read_db),
+):
+    user = await get_cached_user(db, "telegram_id", telegram_id)
 
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
         )
+    not_modified = check_etag(request, response, [user])
+    if not_modified:
+        return not_modified
     return user
 
 
+@router.put("/by_telegram_id/{telegram_id}", response_model=UserUpsertResult)
+async def upsert_user_by_telegram_id(
+    telegram_id: str,
+    upsert: UserUpsert,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+):
+    if upsert.tg_handle == "":
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Cannot have an empty telegram handle for user",
+        )
+
+    user = User(
+        tg_handle=upsert.tg_handle,
+        telegram_id=telegram_id,
+        role=upsert.role,
+        meta=upsert.meta or {},
+    )
+    statement = insert(User).values(**user.model_dump())
+    excluded = statement.excluded
+    changes = {"tg_handle": excluded.tg_handle, "role": excluded.role}
+    changed = [
+        User.tg_handle.is_distinct_from(excluded.tg_handle),
+        User.role.is_distinct_from(excluded.role),
+    ]
+    if upsert.meta is not None:
+        changes["meta"] = excluded.meta
+        # json has no equality operator, jsonb does
+        changed.append(
+            cast(User.meta, JSONB).is_distinct_from(cast(excluded.meta, JSONB))
+        )
+
+    # One statement either way. The row is rewritten even when unchanged, but
+    # keeps its `updated_at`, and so its ETag. A new row has no deleting
+    # transaction, hence `xmax = 0`
+    statement = statement.on_conflict_do_update(
+        index_elements=[User.telegram_id],
+        set_={
+            **changes,
+            "updated_at": case(
+                (or_(*changed), excluded.updated_at), else_=User.updated_at
+            ),
+        },
+    ).returning(User, literal_column("xmax = 0").label("created"))
+
+    # A new handle is copied to the read tables in the same statement (see
+    # app/db/read_tables.py). Anonymous parameters, as the user's take the names
+    user_id = select(User.id).where(User.telegram_id == telegram_id).scalar_subquery()
+    handle = literal(upsert.tg_handle, User.tg_handle.type)
+    statement = statement.add_cte(
+        update(TeacherInbox)
+        .where(
+            TeacherInbox.student_id == user_id,
+            TeacherInbox.student_handle.is_distinct_from(handle),
+        )
+        .values(student_handle=handle)
+        .cte("inbox_renamed"),
+        update(StudentDashboard)
+        .where(
+            StudentDashboard.teacher_id == user_id,
+            StudentDashboard.teacher_handle.is_distinct_from(handle),
+        )
+        .values(teacher_handle=handle)
+        .cte("dashboard_renamed"),
+    )
+
+    try:
+        user, created = (
+            await db.exec(statement.execution_options(populate_existing=True))
+        ).one()
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Telegram handle is taken by another user",
+        )
+
+    user_cache.invalidate(user)
+    if created:
+        response.status_code = status.HTTP_201_CREATED
+    return UserUpsertResult(**user.model_dump(), created=created)
+
+
 @router.get("/by_telegram_handle/{tg_handle}", response_model=User)
-def get_user_by_telegram_handle(
+async def get_user_by_telegram_handle(
     tg_handle: str,  # This would come from auth/security in real app
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_primary_read_db),
 ):
-    user = db.exec(select(User).where(User.tg_handle == tg_handle)).first()
+    user = await get_cached_user(db, "tg_handle", tg_handle)
 
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
         )
+    not_modified = check_etag(request, response, [user])
+    if not_modified:
+        return not_modified
     return user
 
 
 @router.get("/{user_id}", response_model=User)
-def get_user_by_id(user_id: str, db: Session = Depends(get_db)):
-    user = db.get(User, user_id)
+async def get_user_by_id(
+    user_id: str,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_primary_read_db),
+):
+    user = await get_cached_user(db, "id", user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
         )
+    not_modified = check_etag(request, response, [user])
+    if not_modified:
+        return not_modified
     return user
 
 
+@router.post("/batch", response_model=List[User])
+async def get_users_batch(batch: BatchRequest, db: AsyncSession = Depends(get_read_db)):
+    return await fetch_by_ids(db, User, batch.ids)
+
+
 # @router.get("/by_handle/{tg_handle}", response_model=User)
 # def get_user_by_handle(
 #     tg_handle: str,
-#     db: Session = Depends(get_db)
+#     db: AsyncSession = Depends(get_db)
 # ):
 #     user = db.exec(
 #         select(User).where(User.tg_handle == tg_handle)
@@ -93,37 +225,61 @@ def get_user_by_id(user_id: str, db: Session = Depends(get_db)):
 
 @router.get("/", response_model=List[User])
 async def get_users(
+    request: Request,
+    response: Response,
     role: Optional[UserRole] = None,
-    offset: int = 0,
+    cursor: Optional[str] = None,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     query = select(User)
     if role:
         query = query.where(User.role == role)
 
-    users = db.exec(query.offset(offset).limit(limit)).all()
-    return users
+    users = (await db.exec(paginate(query, User, cursor, limit))).all()
+    set_next_cursor(response, users, limit)
+    not_modified = check_etag(request, response, users)
+    if not_modified:
+        return not_modified
+    return fast_json(request, response, users)
 
 
 @router.get("/students/", response_model=List[User])
-def get_all_students(offset: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    students = db.exec(
-        select(User).where(User.role == UserRole.STUDENT).offset(offset).limit(limit)
-    ).all()
-    return students
+async def get_all_students(
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_read_db),
+):
+    query = select(User).where(User.role == UserRole.STUDENT)
+    students = (await db.exec(paginate(query, User, cursor, limit))).all()
+    set_next_cursor(response, students, limit)
+    not_modified = check_etag(request, response, students)
+    if not_modified:
+        return not_modified
+    return fast_json(request, response, students)
 
 
 @router.get("/teachers/", response_model=List[User])
-def get_all_teachers(offset: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    teachers = db.exec(
-        select(User).where(User.role == UserRole.TEACHER).offset(offset).limit(limit)
-    ).all()
-    return teachers
+async def get_all_teachers(
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_read_db),
+):
+    query = select(User).where(User.role == UserRole.TEACHER)
+    teachers = (await db.exec(paginate(query, User, cursor, limit))).all()
+    set_next_cursor(response, teachers, limit)
+    not_modified = check_etag(request, response, teachers)
+    if not_modified:
+        return not_modified
+    return fast_json(request, response, teachers)
 
 
 @router.post("/", response_model=User)
-async def create_user(user: User, db: Session = Depends(get_db)):
+async def create_user(user: User, db: AsyncSession = Depends(get_db)):
     if user.role not in [UserRole.STUDENT, UserRole.TEACHER]:
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Invalid user role"
@@ -135,33 +291,61 @@ async def create_user(user: User, db: Session = Depends(get_db)):
             detail="Cannot have an empty telegram handle for user",
         )
 
-    # Check if user with this handle already exists
-    existing_user = db.exec(
-        select(User).where(
-            or_(User.tg_handle == user.tg_handle, User.telegram_id == user.telegram_id)
+    # Insert unless the telegram handle or ID is taken, in one statement
+    created = (
+        await db.exec(
+            insert(User)
+            .values(**user.model_dump())
+            .on_conflict_do_nothing()
+            .returning(User)
         )
-    ).first()
+    ).scalar_one_or_none()
 
-    if existing_user:
+    if not created:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="User with this telegram handle or ID already exists",
         )
 
-    db.add(user)
-    db.commit()
-    db.refresh(user)
-    return user
+    await db.commit()
+    user_cache.invalidate(created)
+    return created
+
+
+IMPORT_FORMATS = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+
+
+@router.post("/import", response_model=UserImportResult)
+async def import_users_from_file(request: Request, db: AsyncSession = Depends(get_db)):
+    """Stream a CSV or NDJSON body into `user` with COPY, reporting conflicts"""
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    format = IMPORT_FORMATS.get(content_type)
+    if not format:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Expected one of: {', '.join(IMPORT_FORMATS)}",
+        )
+
+    result = await import_users(db, iter_lines(request.stream()), format)
+    logger.info(
+        f"Imported {result.imported} users, {len(result.conflicts)} conflicts, "
+        f"{len(result.errors)} invalid rows"
+    )
+    return result
 
 
 import json
 from typing import Dict, List
 
-from openai import OpenAI
+from openai import AsyncOpenAI
 from pydantic import BaseModel, Field
 
 from ...schemas.feedback import Feedback
-from ...schemas.homework import HomeworkTask
+from ...schemas.homework import HomeworkAssignment, HomeworkTask
 from ...schemas.submission import Submission
 
 
@@ -189,22 +373,29 @@ class AnalysisRequest(BaseModel):
 
 
 @router.post("/analysis/{user_id}", response_model=Dict)
-def analyze_user(request: AnalysisRequest, db: Session = Depends(get_db)):
+async def analyze_user(request: AnalysisRequest, db: AsyncSession = Depends(get_db)):
     """Analyze user's progress and generate insights"""
     try:
         user_id = request.user_id
 
         # 1. Get all user's data
-        submissions = db.exec(
-            select(Submission).where(Submission.student_id == user_id)
+        submissions = (
+            await db.exec(select(Submission).where(Submission.student_id == user_id))
         ).all()
 
-        homeworks = db.exec(
-            select(HomeworkTask).where(HomeworkTask.student_ids.contains([user_id]))
+        homeworks = (
+            await db.exec(
+                select(HomeworkTask)
+                .join(
+                    HomeworkAssignment,
+                    HomeworkAssignment.homework_id == HomeworkTask.id,
+                )
+                .where(HomeworkAssignment.student_id == user_id)
+            )
         ).all()
 
-        feedbacks = db.exec(
-            select(Feedback).where(Feedback.student_id == user_id)
+        feedbacks = (
+            await db.exec(select(Feedback).where(Feedback.student_id == user_id))
         ).all()
 
         logger.info(
@@ -257,13 +448,13 @@ If certain aspects lack data, acknowledge the limitations.
 """
 
         # 4. Generate analysis
-        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
         chat_context = request.chat_context
         if chat_context and chat_context[-1]["role"] == "user":
             chat_context[-1]["content"] = f"{chat_context[-1]['content']}\n{_prompt}"
 
-        completion = client.beta.chat.completions.parse(
+        completion = await client.beta.chat.completions.parse(
             model="gpt-4o", messages=chat_context, response_format=UserAnalysisModel
         )
 
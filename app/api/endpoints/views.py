@@ -0,0 +1,176 @@
+"""
+1. `GET /views/teacher/{teacher_id}/pending` - Submissions awaiting a teacher's feedback
+2. `GET /views/teacher/{teacher_id}/feedback` - Feedback a teacher has given
+3. `GET /views/student/{student_id}/feedback` - Feedback a student has received
+4. `GET /views/student/{student_id}/homework` - Homework assigned to a student
+
+Each view returns display-ready rows (handles, titles, previews) built by a
+single query, so the bot needs no follow-up requests per row. Rows are
+encoded straight from the query result (see `serialization.fast_json`).
+
+The pending submissions and the student's homework are read from tables
+materialized at write time (see `app/db/read_tables.py`): one indexed query
+each, with the user only looked up to explain an empty page.
+"""
+
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import func
+from sqlalchemy.orm import aliased
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ...db.base import get_read_db
+from ...schemas.feedback import Feedback
+from ...schemas.homework import HomeworkTask
+from ...schemas.submission import Submission
+from ...schemas.user import User, UserRole
+from ...schemas.views import (
+    PREVIEW_LENGTH,
+    FeedbackView,
+    PendingSubmissionView,
+    StudentDashboard,
+    StudentHomeworkView,
+    TeacherInbox,
+)
+from ..pagination import paginate, set_next_cursor
+from ..serialization import fast_json
+
+router = APIRouter()
+
+
+def preview(column):
+    return func.left(column["text"].as_string(), PREVIEW_LENGTH)
+
+
+async def get_user_with_role(db: AsyncSession, user_id: str, role: UserRole) -> User:
+    user = await db.get(User, user_id)
+    if not user or user.role != role:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"{role.value.title()} not found",
+        )
+    return user
+
+
+def view_columns(table, view):
+    """Columns of a materialized `table` making up `view`'s rows"""
+    return [table.__table__.c[name] for name in view.model_fields]
+
+
+def homework_title():
+    return func.coalesce(HomeworkTask.title, "Untitled").label("homework_title")
+
+
+def teacher_inbox_query(teacher_id: str):
+    return select(*view_columns(TeacherInbox, PendingSubmissionView)).where(
+        TeacherInbox.teacher_id == teacher_id
+    )
+
+
+def student_dashboard_query(student_id: str):
+    return select(*view_columns(StudentDashboard, StudentHomeworkView)).where(
+        StudentDashboard.student_id == student_id
+    )
+
+
+def feedback_view_query():
+    student = aliased(User)
+    teacher = aliased(User)
+    return (
+        select(
+            Feedback.id,
+            Feedback.created_at,
+            Feedback.submission_id,
+            Submission.homework_task_id,
+            homework_title(),
+            Feedback.student_id,
+            student.tg_handle.label("student_handle"),
+            Feedback.teacher_id,
+            teacher.tg_handle.label("teacher_handle"),
+            preview(Submission.content).label("submission_preview"),
+            preview(Feedback.content).label("feedback_preview"),
+            Feedback.score,
+        )
+        .join(Submission, Submission.id == Feedback.submission_id)
+        .join(HomeworkTask, HomeworkTask.id == Submission.homework_task_id)
+        .join(student, student.id == Feedback.student_id)
+        .join(teacher, teacher.id == Feedback.teacher_id)
+    )
+
+
+@router.get("/teacher/{teacher_id}/pending", response_model=List[PendingSubmissionView])
+async def get_teacher_pending(
+    teacher_id: str,
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_read_db),
+):
+    query = teacher_inbox_query(teacher_id)
+
+    rows = (await db.exec(paginate(query, TeacherInbox, cursor, limit))).all()
+    if not rows:
+        await get_user_with_role(db, teacher_id, UserRole.TEACHER)
+    set_next_cursor(response, rows, limit)
+
+    return fast_json(request, response, [row._mapping for row in rows])
+
+
+@router.get("/teacher/{teacher_id}/feedback", response_model=List[FeedbackView])
+async def get_teacher_feedback(
+    teacher_id: str,
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_read_db),
+):
+    await get_user_with_role(db, teacher_id, UserRole.TEACHER)
+
+    query = feedback_view_query().where(Feedback.teacher_id == teacher_id)
+
+    rows = (await db.exec(paginate(query, Feedback, cursor, limit))).all()
+    set_next_cursor(response, rows, limit)
+
+    return fast_json(request, response, [row._mapping for row in rows])
+
+
+@router.get("/student/{student_id}/feedback", response_model=List[FeedbackView])
+async def get_student_feedback(
+    student_id: str,
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_read_db),
+):
+    await get_user_with_role(db, student_id, UserRole.STUDENT)
+
+    query = feedback_view_query().where(Feedback.student_id == student_id)
+
+    rows = (await db.exec(paginate(query, Feedback, cursor, limit))).all()
+    set_next_cursor(response, rows, limit)
+
+    return fast_json(request, response, [row._mapping for row in rows])
+
+
+@router.get("/student/{student_id}/homework", response_model=List[StudentHomeworkView])
+async def get_student_homework(
+    student_id: str,
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_read_db),
+):
+    query = student_dashboard_query(student_id)
+
+    rows = (await db.exec(paginate(query, StudentDashboard, cursor, limit))).all()
+    if not rows:
+        await get_user_with_role(db, student_id, UserRole.STUDENT)
+    set_next_cursor(response, rows, limit)
+
+    return fast_json(request, response, [row._mapping for row in rows])
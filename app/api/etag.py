@@ -0,0 +1,72 @@
+"""
+Strong ETags and `If-None-Match` handling for the read endpoints.
+
+An ETag is derived from the `(id, updated_at)` of every row a response is
+built from, plus the next page cursor, so it can be computed right after the
+query and before anything is serialized (or joined, e.g. homework student
+ids). When the client already holds that version the endpoint answers
+`304 Not Modified` with an empty body.
+
+Usage in an endpoint:
+
+    rows = (await db.exec(query)).all()
+    set_next_cursor(response, rows, limit)
+    not_modified = check_etag(request, response, rows)
+    if not_modified:
+        return not_modified
+"""
+
+import hashlib
+from typing import Optional, Sequence
+
+from fastapi import Request, Response, status
+
+from .pagination import NEXT_CURSOR_HEADER
+
+# Headers a 304 has to repeat from the full response
+VALIDATOR_HEADERS = ("ETag", NEXT_CURSOR_HEADER)
+ENCODING_SUFFIXES = ('-br"', '-gzip"')
+
+
+def compute_etag(rows: Sequence, next_cursor: Optional[str] = None) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for row in rows:
+        digest.update(f"{row.id}\0{row.updated_at.isoformat()}\n".encode())
+    if next_cursor:
+        digest.update(next_cursor.encode())
+    return f'"{digest.hexdigest()}"'
+
+
+def strip_encoding(etag: str) -> str:
+    for suffix in ENCODING_SUFFIXES:
+        if etag.endswith(suffix):
+            return etag[: -len(suffix)] + '"'
+    return etag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    # If-None-Match uses the weak comparison, which also ignores the
+    # content-coding suffix of compressed responses (see serialization.fast_json)
+    return "*" in candidates or etag in [strip_encoding(tag) for tag in candidates]
+
+
+def check_etag(
+    request: Request, response: Response, rows: Sequence
+) -> Optional[Response]:
+    """Tag `response`; a 304 to return instead if the client has this version"""
+    etag = compute_etag(rows, response.headers.get(NEXT_CURSOR_HEADER))
+    response.headers["ETag"] = etag
+
+    if not etag_matches(request.headers.get("If-None-Match"), etag):
+        return None
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={
+            name: response.headers[name]
+            for name in VALIDATOR_HEADERS
+            if name in response.headers
+        },
+    )
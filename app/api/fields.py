@@ -0,0 +1,124 @@
+"""
+Sparse fieldsets for the list endpoints.
+
+`?fields=status,teacher_id,content.title` selects only those columns, and
+keys inside JSON columns, in SQL; `?view=summary` selects the endpoint's
+summary fields (and can be combined with `fields`). Without either, the full
+rows are returned.
+
+Projected rows always carry `id` and `created_at`, which the keyset cursor
+needs. JSON keys come back nested as in the full representation
+(`{"content": {"title": ...}}`); a key the row doesn't have is left out, so
+`content.get("title", ...)` behaves as on a full row.
+
+Usage in an endpoint:
+
+    selected = parse_fields(HomeworkTask, fields, view, HOMEWORK_SUMMARY)
+    query = select(*select_columns(HomeworkTask, selected)).where(...)
+    rows = (await db.exec(paginate(query, HomeworkTask, cursor, limit))).all()
+    ...
+    return fast_json(request, response, to_dicts(rows, selected))
+"""
+
+import re
+from typing import Dict, List, Optional, Sequence
+
+from fastapi import HTTPException, status
+from sqlalchemy import JSON
+
+from .pagination import Sort
+
+SUMMARY_VIEW = "summary"
+VIEWS = ("full", SUMMARY_VIEW)
+# The keyset cursor is built from these
+REQUIRED_FIELDS = ("id", "created_at")
+JSON_KEY = re.compile(r"[A-Za-z0-9_]+")
+
+
+def parse_fields(
+    model,
+    fields: Optional[str],
+    view: Optional[str],
+    summary: Sequence[str],
+    extra: Sequence[str] = (),
+) -> Optional[List[str]]:
+    """Requested fields, or None for full rows
+
+    `extra` names fields an endpoint computes itself (not columns of `model`).
+    """
+    if view not in (None, *VIEWS):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown view, expected one of: {', '.join(VIEWS)}",
+        )
+
+    requested = [field.strip() for field in (fields or "").split(",")]
+    requested = [field for field in requested if field]
+    if view == SUMMARY_VIEW:
+        requested = [*summary, *requested]
+    if not requested:
+        return None
+
+    columns = model.__table__.columns
+    unknown = []
+    for field in requested:
+        column, _, key = field.partition(".")
+        if key:
+            valid = (
+                column in columns
+                and isinstance(columns[column].type, JSON)
+                and JSON_KEY.fullmatch(key)
+            )
+        else:
+            valid = column in columns or column in extra
+        if not valid:
+            unknown.append(field)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}",
+        )
+
+    return list(dict.fromkeys([*REQUIRED_FIELDS, *requested]))
+
+
+def select_columns(
+    model, selected: Optional[List[str]], sort: Optional[Sort] = None
+) -> List:
+    """What to `select()` for `selected`: the whole model, or labeled columns"""
+    if selected is None:
+        return [model]
+
+    columns = model.__table__.columns
+    # `updated_at` always comes along for the ETag, see etag.compute_etag,
+    # and the sort column for the next cursor, see pagination.set_next_cursor
+    expressions = {"updated_at": model.updated_at}
+    if sort is not None:
+        expressions[sort.name] = sort.column
+    for field in selected:
+        column, _, key = field.partition(".")
+        if column not in columns:
+            continue
+        attribute = getattr(model, column)
+        expressions[field] = attribute[key] if key else attribute
+    return [expression.label(field) for field, expression in expressions.items()]
+
+
+def to_dicts(rows: Sequence, selected: List[str]) -> List[Dict]:
+    """Projected rows in the shape of the full representation"""
+    items = []
+    for row in rows:
+        mapping = row._mapping
+        item = {}
+        for field in selected:
+            if field not in mapping:
+                continue
+            column, _, key = field.partition(".")
+            if not key:
+                item[field] = mapping[field]
+                continue
+            values = item.setdefault(column, {})
+            if mapping[field] is not None:
+                values[key] = mapping[field]
+        items.append(item)
+    return items
@@ -0,0 +1,126 @@
+"""
+Keyset (cursor) pagination shared by the list endpoints.
+
+Rows are ordered on `(created_at, id)` and each page continues strictly after
+the last row of the previous one, so deep pages cost the same as the first
+page and rows inserted meanwhile don't shift results between calls.
+
+Endpoints can also offer `?sort=<column>` / `?sort=-<column>` on a few
+indexed columns: rows are then ordered on `(column, created_at, id)`, all
+ascending or all descending, with NULLs last either way.
+
+The cursor is opaque to clients: a urlsafe base64 of the last row's key. When
+a page is full, its cursor is returned in the `X-Next-Cursor` header; the
+absence of the header means there are no more rows.
+"""
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import and_, or_, tuple_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+@dataclass
+class Sort:
+    """A `?sort=` column, leading the keyset"""
+
+    name: str
+    column: Any
+    descending: bool = False
+
+
+def parse_sort(sort: Optional[str], columns: Dict[str, Any]) -> Optional[Sort]:
+    """`sort` (a name in `columns`, `-` prefixed for descending) or None"""
+    if not sort:
+        return None
+    name = sort.removeprefix("-")
+    if name not in columns:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown sort, expected one of: {', '.join(columns)}",
+        )
+    return Sort(name, columns[name], descending=sort.startswith("-"))
+
+
+def encode_cursor(created_at: datetime, id: str, *sort_value) -> str:
+    raw = json.dumps([created_at.isoformat(), id, *sort_value]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: Optional[Sort] = None) -> Tuple:
+    """`(created_at, id)`, plus the sort column's value under a `sort`"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id, *sort_value = json.loads(base64.urlsafe_b64decode(padded))
+        if len(sort_value) != (1 if sort else 0):
+            raise ValueError("Cursor from another sort")
+        return (datetime.fromisoformat(created_at), str(id), *sort_value)
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+
+
+def after_sorted(model, sort: Sort, created_at: datetime, id: str, value):
+    """Rows past `(value, created_at, id)` in `sort` order, NULLs last"""
+    keyset = tuple_(model.created_at, model.id)
+    if sort.descending:
+        past_keyset, past_value = keyset < (created_at, id), sort.column < value
+    else:
+        past_keyset, past_value = keyset > (created_at, id), sort.column > value
+    if value is None:
+        return and_(sort.column.is_(None), past_keyset)
+    return or_(
+        past_value,
+        and_(sort.column == value, past_keyset),
+        sort.column.is_(None),
+    )
+
+
+def paginate(
+    query, model, cursor: Optional[str], limit: int, sort: Optional[Sort] = None
+):
+    """Order `query` on the keyset and continue after `cursor`"""
+    if sort is None:
+        query = query.order_by(model.created_at, model.id)
+        if cursor:
+            created_at, id = decode_cursor(cursor)
+            query = query.where(
+                tuple_(model.created_at, model.id) > (created_at, id),
+                # Implied by the row comparison, but only this form lets
+                # partitioned tables skip the earlier months' partitions
+                model.created_at >= created_at,
+            )
+        return query.limit(limit)
+
+    if sort.descending:
+        order = [sort.column.desc(), model.created_at.desc(), model.id.desc()]
+    else:
+        order = [sort.column.asc(), model.created_at.asc(), model.id.asc()]
+    query = query.order_by(order[0].nulls_last(), *order[1:])
+    if cursor:
+        query = query.where(after_sorted(model, sort, *decode_cursor(cursor, sort)))
+    return query.limit(limit)
+
+
+def set_next_cursor(
+    response: Response, rows: Sequence, limit: int, sort: Optional[Sort] = None
+) -> None:
+    """Expose the cursor of the next page when this one came back full
+
+    Under a `sort`, projected rows must carry the sort column (see
+    `fields.select_columns`).
+    """
+    if rows and len(rows) >= limit:
+        last = rows[-1]
+        sort_value = (getattr(last, sort.name),) if sort else ()
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            last.created_at, last.id, *sort_value
+        )
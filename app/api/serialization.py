@@ -0,0 +1,110 @@
+"""
+Fast JSON path for the list endpoints.
+
+With a `response_model`, FastAPI re-validates every returned row through
+pydantic before encoding it, which dominates CPU for full pages of rows with
+large `content` blobs. Endpoints opt out of that by returning `fast_json(...)`:
+rows are already valid (they came from the database), so their fields are
+handed straight to orjson. The `response_model` stays on the route for the
+OpenAPI schema.
+
+Bodies of `COMPRESSION_MIN_SIZE` bytes or more are compressed with brotli or
+gzip, whichever the client prefers in `Accept-Encoding` (brotli only when the
+`brotli` package is installed).
+
+`benchmarks/serialization.py` compares CPU per page for both paths.
+"""
+
+import gzip
+from typing import Any, Dict, Mapping, Optional
+
+import orjson
+from fastapi import Request, Response
+from sqlmodel import SQLModel
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+COMPRESSION_MIN_SIZE = 1024
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 4
+
+
+def row_fields(row: SQLModel) -> Dict[str, Any]:
+    """Declared fields of a model, without serializing their values
+
+    Fields declared with `exclude=True` (e.g. `change_seq`) are left out, as
+    pydantic leaves them out of `model_dump`.
+    """
+    return {
+        name: getattr(row, name)
+        for name, field in type(row).model_fields.items()
+        if not field.exclude
+    }
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, SQLModel):
+        return row_fields(obj)
+    if isinstance(obj, Mapping):  # e.g. the `RowMapping` of a joined query
+        return dict(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """orjson encoding that also takes models and row mappings"""
+    return orjson.dumps(content, default=_default)
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """`br`, `gzip` or None, by the client's `Accept-Encoding` preferences"""
+    accepted = {}
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        if coding:
+            accepted[coding.strip().lower()] = quality
+
+    available = ["br", "gzip"] if brotli else ["gzip"]
+    candidates = [
+        (accepted.get(coding, accepted.get("*", 0.0)), coding) for coding in available
+    ]
+    # Ties go to the first (best compressing) coding
+    quality, coding = max(candidates, key=lambda candidate: candidate[0])
+    return coding if quality > 0 else None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+def fast_json(request: Request, response: Response, content: Any) -> Response:
+    """Encode `content` with orjson, keeping headers already set on `response`"""
+    body = dumps(content)
+    headers = dict(response.headers)
+    headers["vary"] = "Accept-Encoding"
+
+    if len(body) >= COMPRESSION_MIN_SIZE:
+        encoding = negotiate_encoding(request.headers.get("Accept-Encoding"))
+        if encoding:
+            body = compress(body, encoding)
+            headers["content-encoding"] = encoding
+            # A strong ETag names one representation; see etag.etag_matches
+            if "etag" in headers:
+                headers["etag"] = f'{headers["etag"][:-1]}-{encoding}"'
+
+    return Response(
+        content=body,
+        status_code=response.status_code or 200,
+        headers=headers,
+        media_type="application/json",
+    )
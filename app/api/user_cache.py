@@ -0,0 +1,118 @@
+"""
+In-process LRU + TTL cache of `User` rows for the identity lookups.
+
+Every bot command resolves its caller through `GET /users/by_telegram_id/{id}`,
+usually more than once, so hot users are served from memory instead of
+Postgres. A user is cached once and reachable by each of its lookup keys:
+`id`, `telegram_id` and `tg_handle`.
+
+Only found users are cached, and only as read from the primary (the endpoints
+take `get_primary_read_db`): a replica lagging behind a write would refill
+the cache with the row it replaced. Writes to a user must call `invalidate`
+after committing; a lookup that raced with such a write is not stored (see
+`version`). The cache is per process, so with several API workers another
+worker's write is only picked up once the entry's TTL runs out.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ..core.config import settings
+from ..core.metrics import USER_CACHE_EVICTIONS, USER_CACHE_HITS, USER_CACHE_MISSES
+from ..schemas.user import User
+
+LOOKUPS = ("id", "telegram_id", "tg_handle")
+
+
+class UserCache:
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        # Bumped by every invalidation, see `put`
+        self.version = 0
+        self._entries: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        self._index: Dict[Tuple[str, str], str] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, lookup: str, value: str) -> Optional[User]:
+        user_id = self._index.get((lookup, value))
+        entry = self._entries.get(user_id) if user_id else None
+
+        if entry and entry[0] <= time.monotonic():
+            self._remove(user_id, "expired")
+            entry = None
+
+        if not entry:
+            USER_CACHE_MISSES.labels(lookup=lookup).inc()
+            return None
+
+        self._entries.move_to_end(user_id)
+        USER_CACHE_HITS.labels(lookup=lookup).inc()
+        return User.model_validate(entry[1])
+
+    def put(self, user: User, version: int):
+        """Cache `user` if nothing was invalidated since `version` was read"""
+        if version != self.version or self.max_size <= 0:
+            return
+
+        if user.id in self._entries:
+            self._remove(user.id)
+        self._entries[user.id] = (time.monotonic() + self.ttl, user.model_dump())
+        for lookup in LOOKUPS:
+            self._index[(lookup, str(getattr(user, lookup)))] = user.id
+
+        while len(self._entries) > self.max_size:
+            self._remove(next(iter(self._entries)), "lru")
+
+    def invalidate(self, user: User):
+        """Drop `user`, under both its current keys and the cached ones"""
+        self.version += 1
+        for lookup in LOOKUPS:
+            user_id = self._index.get((lookup, str(getattr(user, lookup))))
+            if user_id:
+                self._remove(user_id, "invalidated")
+
+    def clear(self):
+        self.version += 1
+        self._entries.clear()
+        self._index.clear()
+
+    def _remove(self, user_id: str, reason: Optional[str] = None):
+        entry = self._entries.pop(user_id, None)
+        if not entry:
+            return
+        for lookup in LOOKUPS:
+            key = (lookup, str(entry[1][lookup]))
+            if self._index.get(key) == user_id:
+                del self._index[key]
+        if reason:
+            USER_CACHE_EVICTIONS.labels(reason=reason).inc()
+
+
+user_cache = UserCache(settings.USER_CACHE_SIZE, settings.USER_CACHE_TTL)
+
+
+async def get_cached_user(db: AsyncSession, lookup: str, value: str) -> Optional[User]:
+    """`User` whose `lookup` column equals `value`, from the cache or `db`
+
+    `db` must read the primary, see the module docstring.
+    """
+    user = user_cache.get(lookup, value)
+    if user:
+        return user
+
+    version = user_cache.version
+    if lookup == "id":
+        user = await db.get(User, value)
+    else:
+        query = select(User).where(getattr(User, lookup) == value)
+        user = (await db.exec(query)).first()
+    if user:
+        user_cache.put(user, version)
+    return user
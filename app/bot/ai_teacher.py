@@ -289,29 +289,27 @@ class AITeacher:
             )
 
         try:
-            # Get all student's homework
+            # Best fuzzy match on the title, ranked by the API
             response = await self.api_client.get(
-                f"/homework/student/{memory.student_id}", timeout=10.0
+                "/search/homework",
+                params={
+                    "student_id": memory.student_id,
+                    "q": homework_title,
+                    "limit": 1,
+                },
+                timeout=10.0,
             )
             response.raise_for_status()
-            all_homework = response.json()
-
-            # Find matching homework
-            for homework in all_homework:
-                if (
-                    homework_title.lower()
-                    in homework.get("content", {}).get("title", "").lower()
-                ):
-                    return json.dumps(
-                        {
-                            "homework_task_title": homework.get("content", {}).get(
-                                "title", ""
-                            ),
-                            "homework_task_description": homework.get(
-                                "content", {}
-                            ).get("description", ""),
-                        }
-                    )
+
+            matches = response.json()
+            if matches:
+                content = matches[0].get("content", {})
+                return json.dumps(
+                    {
+                        "homework_task_title": content.get("title", ""),
+                        "homework_task_description": content.get("description", ""),
+                    }
+                )
 
             return json.dumps(
                 {
@@ -343,52 +341,45 @@ class AITeacher:
             )
 
         try:
-            # Get all student's submissions
+            # Best match among submissions still waiting for feedback
             response = await self.api_client.get(
-                f"/submissions/student/{memory.student_id}", timeout=10.0
+                "/search/submissions",
+                params={
+                    "student_id": memory.student_id,
+                    "q": homework_title,
+                    "submission_status": "pending",
+                    "limit": 1,
+                },
+                timeout=10.0,
             )
             response.raise_for_status()
-            all_submissions = response.json()
+            matches = response.json()
 
-            # For each submission, get its homework task and check the title
-            for submission in all_submissions:
+            if matches:
+                submission = matches[0]
                 homework_task_id = submission["homework_task_id"]
-
-                if homework_task_id not in memory.seen_info_buffer:
-                    homework_response = await self.api_client.get(
-                        f"/homework/{homework_task_id}"
-                    )
-                    homework_task = homework_response.json()
-                    # Add to memory
-                    homework_submission_pair = memory.add_seen_info(
-                        homework_task, submission
-                    )
-                else:
-                    homework_submission_pair = memory.get_homework_submission_pair(
-                        homework_task_id
-                    )
-
+                homework_submission_pair = memory.add_seen_info(
+                    {
+                        "id": homework_task_id,
+                        "content": submission["homework_content"],
+                    },
+                    submission,
+                )
                 logger.info(
-                    f"AI TEACHER Checking submission for homework task {homework_task_id}: {homework_submission_pair}"
+                    f"AI TEACHER Found submission for homework task {homework_task_id}: {homework_submission_pair}"
+                )
+                return json.dumps(
+                    {
+                        "homework_task_title": homework_submission_pair[
+                            "homework_task_title"
+                        ],
+                        "homework_task_description": homework_submission_pair[
+                            "homework_task_description"
+                        ],
+                        "submission_text": homework_submission_pair["submission_text"],
+                        "submission_id": homework_submission_pair["submission_id"],
+                    }
                 )
-                if (
-                    homework_title.lower()
-                    in homework_submission_pair.get("homework_task_title", "").lower()
-                ):
-                    return json.dumps(
-                        {
-                            "homework_task_title": homework_submission_pair[
-                                "homework_task_title"
-                            ],
-                            "homework_task_description": homework_submission_pair[
-                                "homework_task_description"
-                            ],
-                            "submission_text": homework_submission_pair[
-                                "submission_text"
-                            ],
-                            "submission_id": homework_submission_pair["submission_id"],
-                        }
-                    )
 
             return json.dumps(
                 {
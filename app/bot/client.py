@@ -1,7 +1,6 @@
 import os
 from typing import Any, Dict, List, Optional
 
-import httpx
 from dotenv import load_dotenv
 
 from .retrying_httpx_client import AsyncRetryingClient
@@ -17,7 +16,34 @@ class APIClient:
     def __init__(self, client: AsyncRetryingClient):
 
         self.client = client
-        self.default_pagination = {"offset": 0, "limit": 100}
+        self.default_pagination = {"limit": 100}
+        self.batch_size = 500  # Server-side cap on ids per batch request
+
+    async def _get_all_pages(self, url: str, **params) -> List[Dict]:
+        """Collect every page of a list endpoint by following its cursors"""
+        items = []
+        params = {**self.default_pagination, **params}
+        while True:
+            response = await self.client.get(url, params=params)
+            items.extend(response.json())
+            next_cursor = response.headers.get("X-Next-Cursor")
+            if not next_cursor:
+                return items
+            params["cursor"] = next_cursor
+
+    async def _get_by_ids(self, url: str, ids) -> Dict[str, Dict]:
+        """Resolve ids through a batch endpoint, keyed by id"""
+        ids = list(dict.fromkeys(ids))
+        items = {}
+        for start in range(0, len(ids), self.batch_size):
+            try:
+                response = await self.client.post(
+                    url, json={"ids": ids[start : start + self.batch_size]}
+                )
+                items.update({item["id"]: item for item in response.json()})
+            except Exception as e:
+                logger.error(f"Error fetching batch from {url}: {e}")
+        return items
 
     async def check_health(self) -> bool:
         try:
@@ -29,21 +55,15 @@ class APIClient:
             logger.error(f"Health check failed: {e}")
             return False
 
-    async def get_or_create_user(
-        self, telegram_id: str, username: str, role: str
-    ) -> Dict:
-        # No pagination needed for single user operations
-        try:
-            response = await self.client.get(
-                f"/users/by_telegram_handle/{username}", max_retries=1  # Only try once
-            )
-            if response.status_code == 200:
-                return response.json()
-        except httpx.HTTPError:
-            pass
+    async def upsert_user(self, telegram_id: str, username: str, role: str) -> Dict:
+        """Register the user, or update their handle and role, in one request
 
-        user_data = {"tg_handle": username, "telegram_id": telegram_id, "role": role}
-        response = await self.client.post("/users/", json=user_data)
+        PUT is idempotent, so retries can't create the user twice.
+        """
+        response = await self.client.put(
+            f"/users/by_telegram_id/{telegram_id}",
+            json={"tg_handle": username, "role": role},
+        )
         return response.json()
 
     async def get_user_by_telegram_id(
@@ -56,62 +76,19 @@ class APIClient:
         return response.json()
 
     async def get_all_students(self) -> List[Dict]:
-        response = await self.client.get(
-            "/users/students/", params=self.default_pagination
-        )
-        return response.json()
+        return await self._get_all_pages("/users/students/")
 
     async def get_all_teachers(self) -> List[Dict]:
-        response = await self.client.get(
-            "/users/teachers/", params=self.default_pagination
-        )
-        return response.json()
+        return await self._get_all_pages("/users/teachers/")
 
     async def get_homework_for_student(self, student_id: str) -> List[Dict]:
-        # Get base homework list
-        response = await self.client.get(
-            f"/homework/student/{student_id}", params=self.default_pagination
-        )
-        homework_list = response.json()
-
-        # Get base homework list
-        response = await self.client.get(
-            f"/homework/student/{student_id}", params=self.default_pagination
-        )
-        homework_list = response.json()
-
-        # Collect unique teacher IDs
-        teacher_ids = {hw["teacher_id"] for hw in homework_list}
-
-        # Get teacher information for each unique teacher ID
-        teachers_info = {}
-        for teacher_id in teacher_ids:
-            try:
-                teacher_response = await self.client.get(f"/users/{teacher_id}")
-                if teacher_response.status_code == 200:
-                    teacher_data = teacher_response.json()
-                    teachers_info[teacher_id] = teacher_data
-            except Exception as e:
-                logger.error(f"Error fetching teacher info for {teacher_id}: {e}")
-
-        # Enrich homework data with teacher information
-        enriched_homework = []
-        for hw in homework_list:
-            teacher_info = teachers_info.get(hw["teacher_id"], {})
-            enriched_hw = {
-                **hw,
-                "teacher_handle": teacher_info.get("tg_handle", "Unknown"),
-                "teacher_telegram_id": teacher_info.get("telegram_id", "Unknown"),
-            }
-            enriched_homework.append(enriched_hw)
-
-        return enriched_homework
+        # Comes with the title and teacher's handle, no need to look them up
+        return await self._get_all_pages(f"/views/student/{student_id}/homework")
 
     async def get_homework_for_teacher(self, teacher_id: str) -> List[Dict]:
-        response = await self.client.get(
-            f"/homework/teacher/{teacher_id}", params=self.default_pagination
+        return await self._get_all_pages(
+            f"/homework/teacher/{teacher_id}", view="summary"
         )
-        return response.json()
 
     # async def assign_homework(self, data: Dict[str, Any]) -> Dict:
     # response = await self.client.post("/homework/assign/", json=data)
@@ -139,43 +116,21 @@ class APIClient:
         return response.json()
 
     async def get_student_submissions(self, student_id: str) -> List[Dict]:
-        response = await self.client.get(
-            f"/submissions/student/{student_id}", params=self.default_pagination
-        )
-        return response.json()
+        return await self._get_all_pages(f"/submissions/student/{student_id}")
 
     async def get_teacher_submissions(self, teacher_id: str) -> List[Dict]:
         # Get base submissions list
-        response = await self.client.get(
-            f"/submissions/teacher/{teacher_id}", params=self.default_pagination
+        submissions_list = await self._get_all_pages(
+            f"/submissions/teacher/{teacher_id}", view="summary"
         )
-        submissions_list = response.json()
-
-        # Collect unique student IDs and homework IDs
-        student_ids = {sub["student_id"] for sub in submissions_list}
-        homework_ids = {sub["homework_task_id"] for sub in submissions_list}
 
-        # Get student information
-        students_info = {}
-        for student_id in student_ids:
-            try:
-                student_response = await self.client.get(f"/users/{student_id}")
-                if student_response.status_code == 200:
-                    student_data = student_response.json()
-                    students_info[student_id] = student_data
-            except Exception as e:
-                logger.error(f"Error fetching student info for {student_id}: {e}")
-
-        # Get homework information
-        homework_info = {}
-        for homework_id in homework_ids:
-            try:
-                homework_response = await self.client.get(f"/homework/{homework_id}")
-                if homework_response.status_code == 200:
-                    homework_data = homework_response.json()
-                    homework_info[homework_id] = homework_data
-            except Exception as e:
-                logger.error(f"Error fetching homework info for {homework_id}: {e}")
+        # Get student and homework information in one request each
+        students_info = await self._get_by_ids(
+            "/users/batch", (sub["student_id"] for sub in submissions_list)
+        )
+        homework_info = await self._get_by_ids(
+            "/homework/batch", (sub["homework_task_id"] for sub in submissions_list)
+        )
 
         # Enrich submissions data
         enriched_submissions = []
@@ -195,16 +150,24 @@ class APIClient:
 
         return enriched_submissions
 
+    async def get_teacher_pending_submissions(self, teacher_id: str) -> List[Dict]:
+        return await self._get_all_pages(f"/views/teacher/{teacher_id}/pending")
+
+    async def get_teacher_feedback(self, teacher_id: str) -> List[Dict]:
+        return await self._get_all_pages(f"/views/teacher/{teacher_id}/feedback")
+
+    async def get_student_feedback(self, student_id: str) -> List[Dict]:
+        return await self._get_all_pages(f"/views/student/{student_id}/feedback")
+
     async def provide_feedback(self, data: Dict[str, Any]) -> Dict:
         response = await self.client.post("/feedback/", json=data)
         return response.json()
 
     async def get_submission_feedback(self, submission_id: str) -> List[Dict]:
         # First get the basic feedback list
-        feedback_response = await self.client.get(
-            f"/feedback/submission/{submission_id}", params=self.default_pagination
+        feedback_list = await self._get_all_pages(
+            f"/feedback/submission/{submission_id}"
         )
-        feedback_list = feedback_response.json()
 
         if not feedback_list:
             return []
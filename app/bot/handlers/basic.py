@@ -52,7 +52,7 @@ class BasicHandler(BaseHandler):
         role = query.data.split("_")[1]  # 'role_student' -> 'student'
 
         try:
-            await self.api_client.get_or_create_user(
+            await self.api_client.upsert_user(
                 telegram_id=str(query.from_user.id),
                 username=query.from_user.username or f"user_{query.from_user.id}",
                 role=role,
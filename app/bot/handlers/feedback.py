@@ -20,63 +20,43 @@ class FeedbackHandler(BaseHandler):
         )
 
         if user["role"] == "student":
-            # Get student's submissions
-            submissions = await self.api_client.get_student_submissions(user["id"])
+            # Get student's feedback, already joined with homework details
+            feedback_list = await self.api_client.get_student_feedback(user["id"])
             message = "📝 Your feedback:\n\n"
 
-            for submission in submissions:
-                feedback_list = await self.api_client.get_submission_feedback(
-                    submission["id"]
+            for feedback in feedback_list:
+                homework_title = feedback["homework_title"]
+                feedback_text = feedback.get("feedback_preview") or (
+                    "No feedback provided"
+                )
+                created_at = feedback.get("created_at", "Unknown date")
+
+                message += (
+                    f"📚 Homework: {homework_title}\n"
+                    f"✍️ Feedback: {feedback_text}...\n"
+                    f"🕒 Date: {created_at}\n"
+                    f"-------------------\n\n"
                 )
-                if feedback_list:
-                    for feedback in feedback_list:
-                        homework_title = (
-                            feedback.get("homework_task", {})
-                            .get("content", {})
-                            .get("title", "Untitled")
-                        )
-                        feedback_text = feedback.get("content", {}).get(
-                            "text", "No feedback provided"
-                        )
-                        created_at = feedback.get("created_at", "Unknown date")
-
-                        message += (
-                            f"📚 Homework: {homework_title}\n"
-                            f"✍️ Feedback: {feedback_text[:100]}...\n"
-                            f"🕒 Date: {created_at}\n"
-                            f"-------------------\n\n"
-                        )
         else:
-            # Get teacher's given feedback
-            submissions = await self.api_client.get_teacher_submissions(user["id"])
+            # Get teacher's given feedback, already joined with student details
+            feedback_list = await self.api_client.get_teacher_feedback(user["id"])
             message = "📝 Feedback you've given:\n\n"
 
-            for submission in submissions:
-                feedback_list = await self.api_client.get_submission_feedback(
-                    submission["id"]
+            for feedback in feedback_list:
+                homework_title = feedback["homework_title"]
+                student_handle = feedback.get("student_handle", "Unknown student")
+                feedback_text = feedback.get("feedback_preview") or (
+                    "No feedback provided"
+                )
+                created_at = feedback.get("created_at", "Unknown date")
+
+                message += (
+                    f"👤 Student: @{student_handle}\n"
+                    f"📚 Homework: {homework_title}\n"
+                    f"✍️ Feedback: {feedback_text}...\n"
+                    f"🕒 Date: {created_at}\n"
+                    f"-------------------\n\n"
                 )
-                if feedback_list:
-                    for feedback in feedback_list:
-                        homework_title = (
-                            feedback.get("homework_task", {})
-                            .get("content", {})
-                            .get("title", "Untitled")
-                        )
-                        student_handle = feedback.get("submission", {}).get(
-                            "student_handle", "Unknown student"
-                        )
-                        feedback_text = feedback.get("content", {}).get(
-                            "text", "No feedback provided"
-                        )
-                        created_at = feedback.get("created_at", "Unknown date")
-
-                        message += (
-                            f"👤 Student: @{student_handle}\n"
-                            f"📚 Homework: {homework_title}\n"
-                            f"✍️ Feedback: {feedback_text[:100]}...\n"
-                            f"🕒 Date: {created_at}\n"
-                            f"-------------------\n\n"
-                        )
 
         await update.message.reply_text(
             message or "No feedback found!",
@@ -100,7 +80,7 @@ class FeedbackHandler(BaseHandler):
             str(update.effective_user.id)
         )
 
-        submissions = await self.api_client.get_teacher_submissions(user["id"])
+        submissions = await self.api_client.get_teacher_pending_submissions(user["id"])
 
         logger.info(
             f"User {user['id']} requested pending feedback, these are the submissions: {submissions}"
@@ -123,16 +103,8 @@ class FeedbackHandler(BaseHandler):
                 f"@{sub['student_handle']} - {sub['homework_title']}",  # display_text
             )
             for sub in submissions
-            if sub["status"] == "pending"  # Only show pending submissions
         ]
 
-        if not options:
-            await update.message.reply_text(
-                "No pending submissions to review!",
-                reply_markup=create_selection_menu([], done_button=False),
-            )
-            return ConversationHandler.END
-
         markup = create_selection_menu(options, done_button=False)
         await update.message.reply_text(
             "Select submission to review:", reply_markup=markup
@@ -42,7 +42,7 @@ class HomeworkHandler(BaseHandler):
                 }.get(hw["status"], "❓")
 
                 message += (
-                    f"{status_emoji} {hw['content'].get('title', 'Untitled')}\n"
+                    f"{status_emoji} {hw['homework_title']}\n"
                     f"ID: {hw['id']}\n"
                     f"Status: {hw['status']}\n\n"
                 )
@@ -38,7 +38,7 @@ class SubmissionHandler(BaseHandler):
         options = [
             (
                 hw["id"],  # callback_data
-                f"@{hw['teacher_handle']} - {hw['content'].get('title', 'Untitled')}",  # display_text
+                f"@{hw['teacher_handle']} - {hw['homework_title']}",  # display_text
             )
             for hw in homework_list
             if hw["status"] == "pending"  # Only show pending homework
@@ -1,13 +1,35 @@
 import asyncio
+import copy
 import logging
 import time
-from typing import Any, Dict, Optional, Union
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple, Union
 
 import httpx
 from httpx import URL, Cookies, Headers, QueryParams, Response
 
 logger = logging.getLogger(__name__)
 
+# Options of `send()` rather than `build_request()`
+SEND_OPTIONS = ("auth", "follow_redirects")
+# The cached body is kept decoded, so these no longer describe it
+ENCODING_HEADERS = ("content-encoding", "content-length", "transfer-encoding")
+
+
+class CachedResponse(Response):
+    """Response out of the validator cache
+
+    `json()` returns a copy of the payload parsed when the response was
+    cached, rather than parsing the body again.
+    """
+
+    def __init__(self, *args, payload: Any, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.payload = payload
+
+    def json(self, **kwargs) -> Any:
+        return copy.deepcopy(self.payload)
+
 
 class AsyncRetryingClient(httpx.AsyncClient):
     def __init__(
@@ -16,12 +38,19 @@ class AsyncRetryingClient(httpx.AsyncClient):
         max_retries: int = 5,
         initial_retry_delay: float = 1.0,
         max_retry_delay: float = 32.0,
+        validator_cache_size: int = 256,
         **kwargs,
     ):
         super().__init__(*args, **kwargs)
         self.max_retries = max_retries
         self.initial_retry_delay = initial_retry_delay
         self.max_retry_delay = max_retry_delay
+        # GET url -> (ETag, response, parsed JSON); a 304 reuses the cached
+        # response
+        self.validator_cache_size = validator_cache_size
+        self.validator_cache: "OrderedDict[str, Tuple[str, Response, Any]]" = (
+            OrderedDict()
+        )
         logger.info(
             f"Initialized AsyncRetryingClient with base_url: {kwargs.get('base_url')}"
         )
@@ -44,6 +73,8 @@ class AsyncRetryingClient(httpx.AsyncClient):
                 logger.debug(
                     f"Attempting {method} request to {full_url} (attempt {attempt + 1}/{self.max_retries})"
                 )
+                if method == "GET":
+                    return await self._conditional_get(url, **kwargs)
                 response = await super().request(method, url, **kwargs)
                 response.raise_for_status()
                 return response
@@ -64,6 +95,61 @@ class AsyncRetryingClient(httpx.AsyncClient):
             await asyncio.sleep(retry_delay)
             retry_delay = min(retry_delay * 2, self.max_retry_delay)
 
+    async def _conditional_get(self, url: Union[str, URL], **kwargs) -> Response:
+        """GET revalidating a cached response by its ETag
+
+        The JSON of a response with an ETag is parsed once, when it's cached.
+        Responses replayed on `304 Not Modified` hand out copies of it (see
+        `CachedResponse`), so callers may change what `json()` gives them
+        without touching the cache.
+        """
+        send_options = {
+            name: kwargs.pop(name) for name in SEND_OPTIONS if name in kwargs
+        }
+        request = self.build_request("GET", url, **kwargs)
+        key = str(request.url)
+        cached = self.validator_cache.get(key)
+        if cached:
+            request.headers["If-None-Match"] = cached[0]
+
+        response = await self.send(request, **send_options)
+        if cached and response.status_code == httpx.codes.NOT_MODIFIED:
+            self.validator_cache.move_to_end(key)
+            return self._replay(cached[1], cached[2], request)
+
+        response.raise_for_status()
+        self.validator_cache.pop(key, None)
+        etag = response.headers.get("ETag")
+        if not etag or self.validator_cache_size <= 0:
+            return response
+        try:
+            payload = response.json()
+        except ValueError:
+            return response
+        self.validator_cache[key] = (etag, response, payload)
+        while len(self.validator_cache) > self.validator_cache_size:
+            self.validator_cache.popitem(last=False)
+        return response
+
+    @staticmethod
+    def _replay(
+        cached: Response, payload: Any, request: httpx.Request
+    ) -> CachedResponse:
+        """A new response with the cached status, headers, (decoded) body and
+        parsed JSON"""
+        headers = [
+            (name, value)
+            for name, value in cached.headers.multi_items()
+            if name.lower() not in ENCODING_HEADERS
+        ]
+        return CachedResponse(
+            cached.status_code,
+            headers=headers,
+            content=cached.content,
+            request=request,
+            payload=payload,
+        )
+
     async def request(self, *args, **kwargs) -> Response:
         return await self._request_with_retry(*args, **kwargs)
 
@@ -15,6 +15,34 @@ class Settings(BaseSettings):
     # Database settings
     DATABASE_URL: str = Field(default=os.getenv("DATABASE_URL"))
     TEST_DATABASE_URL: str = Field(default="postgresql://localhost/langflow_test")
+    # Read replica for GET endpoints, see `get_read_db`; unset reads the primary
+    DATABASE_REPLICA_URL: Optional[str] = Field(
+        default=os.getenv("DATABASE_REPLICA_URL") or None
+    )
+    # Seconds a client's reads stay on the primary after it wrote, so it reads
+    # its own writes despite replication lag, see app/db/read_your_writes.py
+    READ_YOUR_WRITES_WINDOW: float = Field(
+        default=float(os.getenv("READ_YOUR_WRITES_WINDOW", "5"))
+    )
+
+    # Connection pool of each engine, see app/db/pool.py. API endpoints are
+    # async, so size it for requests in flight rather than uvicorn's threads;
+    # `db_pool_checkout_wait_seconds` shows when it is too small
+    DB_POOL_SIZE: int = Field(default=int(os.getenv("DB_POOL_SIZE", "5")))
+    DB_MAX_OVERFLOW: int = Field(default=int(os.getenv("DB_MAX_OVERFLOW", "10")))
+    # Seconds to wait for a connection before failing the checkout
+    DB_POOL_TIMEOUT: float = Field(default=float(os.getenv("DB_POOL_TIMEOUT", "30")))
+    # Seconds before a connection is replaced, -1 to keep connections forever
+    DB_POOL_RECYCLE: int = Field(default=int(os.getenv("DB_POOL_RECYCLE", "1800")))
+    # Test each connection on checkout (pessimistic); when off, stale
+    # connections surface as errors and `DB_POOL_RECYCLE` bounds their age
+    DB_POOL_PRE_PING: bool = Field(
+        default=os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    )
+    # Reuse the most recent connection first, so idle ones age out on recycle
+    DB_POOL_USE_LIFO: bool = Field(
+        default=os.getenv("DB_POOL_USE_LIFO", "false").lower() == "true"
+    )
 
     # RabbitMQ settings
     RABBITMQ_HOST: str = Field(default=os.getenv("RABBITMQ_HOST", "localhost"))
@@ -31,6 +59,15 @@ class Settings(BaseSettings):
     DEAD_LETTER_EXCHANGE: str = "dlx"
     MESSAGE_TTL: int = Field(default=86400000)  # 24 hours
 
+    # In-process user lookup cache, see app/api/user_cache.py
+    USER_CACHE_SIZE: int = Field(default=int(os.getenv("USER_CACHE_SIZE", "10000")))
+    USER_CACHE_TTL: float = Field(default=float(os.getenv("USER_CACHE_TTL", "60")))
+
+    # Parquet exports for offline analytics, see app/db/analytics_export.py
+    ANALYTICS_EXPORT_DIR: str = Field(
+        default=os.getenv("ANALYTICS_EXPORT_DIR", "exports/analytics")
+    )
+
     # Telegram settings
     TELEGRAM_BOT_TOKEN: Optional[str] = Field(default=os.getenv("TELEGRAM_BOT_TOKEN"))
 
@@ -45,6 +82,34 @@ class Settings(BaseSettings):
             )
         return v
 
+    @field_validator("DATABASE_REPLICA_URL")
+    @classmethod
+    def validate_database_replica_url(cls, v: Optional[str]) -> Optional[str]:
+        if v is not None:
+            return cls.validate_database_url(v)
+        return v
+
+    @field_validator("READ_YOUR_WRITES_WINDOW")
+    @classmethod
+    def validate_read_your_writes_window(cls, v: float) -> float:
+        if v < 0:
+            raise ValueError("READ_YOUR_WRITES_WINDOW cannot be negative")
+        return v
+
+    @field_validator("DB_POOL_SIZE", "DB_MAX_OVERFLOW")
+    @classmethod
+    def validate_pool_size(cls, v: int) -> int:
+        if v < 0:
+            raise ValueError("Pool sizes cannot be negative")
+        return v
+
+    @field_validator("DB_POOL_TIMEOUT")
+    @classmethod
+    def validate_pool_timeout(cls, v: float) -> float:
+        if v <= 0:
+            raise ValueError("DB_POOL_TIMEOUT must be positive")
+        return v
+
     @field_validator("RABBITMQ_PORT")
     @classmethod
     def validate_port(cls, v: Any) -> int:
@@ -77,7 +142,12 @@ class Settings(BaseSettings):
         """Hide sensitive information in string representation"""
         settings_dict = self.model_dump()
         # Mask sensitive fields
-        for key in ["DATABASE_URL", "TELEGRAM_BOT_TOKEN", "RABBITMQ_PASS"]:
+        for key in [
+            "DATABASE_URL",
+            "DATABASE_REPLICA_URL",
+            "TELEGRAM_BOT_TOKEN",
+            "RABBITMQ_PASS",
+        ]:
             if key in settings_dict and settings_dict[key]:
                 settings_dict[key] = "***"
         return str(settings_dict)
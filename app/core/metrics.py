@@ -18,14 +18,48 @@ REQUEST_LATENCY = Histogram(
     "http_request_duration_seconds", "HTTP request latency", ["method", "endpoint"]
 )
 
+# Connection pool state per engine, see app/db/pool.py
 DB_CONNECTION_GAUGE = Gauge(
-    "db_connections_active", "Number of active database connections"
+    "db_connections_active", "Number of active database connections", ["engine"]
+)
+
+DB_POOL_IDLE = Gauge(
+    "db_pool_connections_idle", "Open pool connections not checked out", ["engine"]
+)
+
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow", "Connections open beyond the pool size", ["engine"]
+)
+
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time to get a connection from the pool",
+    ["engine"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+
+DB_POOL_CHECKOUT_TIMEOUTS = Counter(
+    "db_pool_checkout_timeouts_total",
+    "Checkouts that gave up waiting for a connection",
+    ["engine"],
 )
 
 QUEUE_MESSAGE_COUNT = Counter(
     "queue_messages_total", "Total messages processed", ["queue_name", "status"]
 )
 
+USER_CACHE_HITS = Counter(
+    "user_cache_hits_total", "User lookups served from the cache", ["lookup"]
+)
+
+USER_CACHE_MISSES = Counter(
+    "user_cache_misses_total", "User lookups that went to the database", ["lookup"]
+)
+
+USER_CACHE_EVICTIONS = Counter(
+    "user_cache_evictions_total", "Users dropped from the cache", ["reason"]
+)
+
 
 def setup_metrics(app: FastAPI):
     @app.middleware("http")
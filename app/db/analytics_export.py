@@ -0,0 +1,307 @@
+"""
+Incremental Parquet export of homework, submissions and feedback for analytics.
+
+Each table is written as a hive-partitioned dataset under the output
+directory, one partition per creation day:
+
+    <output_dir>/<table>/created_date=2026-10-17/part-<run>-<batch>-0.parquet
+
+The `content` fields analytics needs come from their generated columns
+(`title`, `topic`, `language_level` on homework, `score` on feedback); the
+full `content` is kept as a JSON string column.
+
+Runs are incremental: `_watermarks.json` in the output directory holds the
+`(updated_at, id)` of the last row exported per table, and the next run only
+reads rows changed after it. A row changed since its last export is written
+again, so readers should keep the latest `updated_at` per `id`. The watermark
+only moves once a table's files are written, and rows changed within the last
+`WATERMARK_LAG` wait for the next run. One run at a time exports to a
+directory (see `export_lock`): another one fails with `ExportInProgress`.
+
+Usage:
+    python -m app.db.analytics_export [--output-dir exports/analytics]
+"""
+
+import argparse
+import asyncio
+import fcntl
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+from uuid import uuid4
+
+from sqlalchemy import String, Text, cast, func, select, tuple_
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ..core.config import settings
+from ..schemas.analytics import AnalyticsExportResult, AnalyticsTableExport
+from ..schemas.feedback import Feedback
+from ..schemas.homework import HomeworkTask
+from ..schemas.submission import Submission
+from .base import get_read_engine
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+
+WATERMARKS_FILE = "_watermarks.json"
+LOCK_FILE = "_export.lock"
+PARTITION_COLUMN = "created_date"
+WATERMARK_LAG = timedelta(minutes=1)
+FETCH_BATCH_SIZE = 10_000
+ROWS_PER_BATCH = 100_000
+
+
+@dataclass
+class ExportTable:
+    name: str
+    model: type
+    # Column name, SQL expression and Arrow type name (see `arrow_type`)
+    columns: List[Tuple[str, object, str]]
+
+
+def common_columns(model) -> List[Tuple[str, object, str]]:
+    return [
+        ("id", model.id, "string"),
+        ("created_at", model.created_at, "timestamp"),
+        ("updated_at", model.updated_at, "timestamp"),
+        ("status", func.lower(cast(model.status, String)), "string"),
+    ]
+
+
+EXPORT_TABLES = [
+    ExportTable(
+        "homework",
+        HomeworkTask,
+        common_columns(HomeworkTask)
+        + [
+            ("teacher_id", HomeworkTask.teacher_id, "string"),
+            ("title", HomeworkTask.title, "string"),
+            ("topic", HomeworkTask.topic, "string"),
+            ("language_level", HomeworkTask.language_level, "string"),
+            ("assigned_count", HomeworkTask.assigned_count, "int32"),
+            ("submitted_count", HomeworkTask.submitted_count, "int32"),
+            ("graded_count", HomeworkTask.graded_count, "int32"),
+            ("content", cast(HomeworkTask.content, Text), "string"),
+        ],
+    ),
+    ExportTable(
+        "submission",
+        Submission,
+        common_columns(Submission)
+        + [
+            ("homework_task_id", Submission.homework_task_id, "string"),
+            ("student_id", Submission.student_id, "string"),
+            ("teacher_id", Submission.teacher_id, "string"),
+            ("content", cast(Submission.content, Text), "string"),
+        ],
+    ),
+    ExportTable(
+        "feedback",
+        Feedback,
+        common_columns(Feedback)
+        + [
+            ("submission_id", Feedback.submission_id, "string"),
+            ("student_id", Feedback.student_id, "string"),
+            ("teacher_id", Feedback.teacher_id, "string"),
+            ("score", Feedback.score, "int32"),
+            ("content", cast(Feedback.content, Text), "string"),
+        ],
+    ),
+]
+
+
+def arrow_type(name: str):
+    return {
+        "string": pa.string(),
+        "int32": pa.int32(),
+        "timestamp": pa.timestamp("us"),
+    }[name]
+
+
+class ExportInProgress(RuntimeError):
+    """Another run is exporting to the same directory"""
+
+
+@contextmanager
+def export_lock(output_dir: str) -> Iterator[None]:
+    """Hold `output_dir` for one run
+
+    Overlapping runs (the CLI and `POST /analytics/export`, say) would read
+    the same watermarks and each write back its own.
+    """
+    with open(os.path.join(output_dir, LOCK_FILE), "a") as file:
+        try:
+            fcntl.flock(file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise ExportInProgress(f"An export to {output_dir} is already running")
+        try:
+            yield
+        finally:
+            fcntl.flock(file, fcntl.LOCK_UN)
+
+
+def read_watermarks(output_dir: str) -> Dict[str, Dict]:
+    path = os.path.join(output_dir, WATERMARKS_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as file:
+        return json.load(file)
+
+
+def write_watermarks(output_dir: str, watermarks: Dict[str, Dict]):
+    path = os.path.join(output_dir, WATERMARKS_FILE)
+    with tempfile.NamedTemporaryFile(
+        "w", dir=output_dir, prefix=f"{WATERMARKS_FILE}.", delete=False
+    ) as file:
+        json.dump(watermarks, file, indent=2)
+    os.replace(file.name, path)
+
+
+def write_batch(table: ExportTable, rows: List, output_dir: str, basename: str) -> int:
+    """Write `rows` into the table's day partitions; the number of files"""
+    schema = pa.schema(
+        [(name, arrow_type(type)) for name, _, type in table.columns]
+        + [(PARTITION_COLUMN, pa.string())]
+    )
+    columns = {name: [] for name in schema.names}
+    for row in rows:
+        for (name, _, _), value in zip(table.columns, row):
+            columns[name].append(value)
+        columns[PARTITION_COLUMN].append(row[1].date().isoformat())
+
+    written = []
+    ds.write_dataset(
+        pa.Table.from_pydict(columns, schema=schema),
+        os.path.join(output_dir, table.name),
+        format="parquet",
+        partitioning=[PARTITION_COLUMN],
+        partitioning_flavor="hive",
+        basename_template=f"{basename}-{{i}}.parquet",
+        existing_data_behavior="overwrite_or_ignore",
+        file_visitor=lambda file: written.append(file.path),
+    )
+    return len(written)
+
+
+async def export_table(
+    session: AsyncSession,
+    table: ExportTable,
+    output_dir: str,
+    run_id: str,
+    watermark: Optional[Dict],
+) -> Tuple[AnalyticsTableExport, Optional[Dict]]:
+    model = table.model
+    # Rows younger than the lag may belong to transactions not yet committed,
+    # which could commit behind the watermark; they go in the next run instead
+    query = (
+        select(*(expression for _, expression, _ in table.columns))
+        .where(model.updated_at <= datetime.utcnow() - WATERMARK_LAG)
+        .order_by(model.updated_at, model.id)
+    )
+    if watermark:
+        query = query.where(
+            tuple_(model.updated_at, model.id)
+            > (datetime.fromisoformat(watermark["updated_at"]), watermark["id"])
+        )
+
+    result = AnalyticsTableExport(table=table.name, rows=0, files=0)
+    batches = 0
+    pending: List = []
+    last = None
+
+    rows = await session.stream(query.execution_options(yield_per=FETCH_BATCH_SIZE))
+    async for partition in rows.partitions():
+        pending.extend(tuple(row) for row in partition)
+        last = pending[-1]
+        if len(pending) < ROWS_PER_BATCH:
+            continue
+        # Parquet encoding is CPU bound, keep it off the event loop
+        result.files += await asyncio.to_thread(
+            write_batch, table, pending, output_dir, f"part-{run_id}-{batches}"
+        )
+        result.rows += len(pending)
+        batches += 1
+        pending = []
+    if pending:
+        result.files += await asyncio.to_thread(
+            write_batch, table, pending, output_dir, f"part-{run_id}-{batches}"
+        )
+        result.rows += len(pending)
+
+    if last is None:
+        result.watermark = (
+            datetime.fromisoformat(watermark["updated_at"]) if watermark else None
+        )
+        return result, watermark
+    # Rows start with id, created_at, updated_at (see `common_columns`)
+    id, _, updated_at = last[:3]
+    result.watermark = updated_at
+    return result, {"updated_at": updated_at.isoformat(), "id": id}
+
+
+async def export_analytics(
+    session: AsyncSession, output_dir: Optional[str] = None
+) -> AnalyticsExportResult:
+    """Export every table's changes since its watermark to `output_dir`"""
+    if pa is None:
+        raise RuntimeError("pyarrow is required for the analytics export")
+
+    output_dir = output_dir or settings.ANALYTICS_EXPORT_DIR
+    os.makedirs(output_dir, exist_ok=True)
+    with export_lock(output_dir):
+        watermarks = read_watermarks(output_dir)
+        run_id = f"{datetime.utcnow():%Y%m%dT%H%M%S}-{uuid4().hex[:8]}"
+
+        export = AnalyticsExportResult(output_dir=output_dir)
+        for table in EXPORT_TABLES:
+            result, watermark = await export_table(
+                session, table, output_dir, run_id, watermarks.get(table.name)
+            )
+            export.tables.append(result)
+            if watermark:
+                watermarks[table.name] = watermark
+                write_watermarks(output_dir, watermarks)
+        return export
+
+
+async def run(output_dir: Optional[str]) -> AnalyticsExportResult:
+    # A bulk read: on the replica, when there is one
+    engine = get_read_engine()
+    try:
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            return await export_analytics(session, output_dir)
+    finally:
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Export homework, submissions and feedback to Parquet"
+    )
+    parser.add_argument(
+        "--output-dir", help=f"Defaults to {settings.ANALYTICS_EXPORT_DIR}"
+    )
+    args = parser.parse_args()
+
+    try:
+        result = asyncio.run(run(args.output_dir))
+    except ExportInProgress as e:
+        parser.exit(1, f"{e}\n")
+
+    print(f"Exported to {result.output_dir}")
+    for table in result.tables:
+        print(
+            f"  {table.table}: {table.rows} rows in {table.files} files, "
+            f"watermark {table.watermark}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,17 @@
 import os
-from functools import lru_cache
-from typing import Iterator
+from functools import lru_cache, partial
+from typing import AsyncIterator, Callable
 
 from dotenv import load_dotenv
-from sqlmodel import Session, SQLModel, create_engine
+from fastapi import Request
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlmodel import SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ..core.config import settings
+from .partitions import ensure_partitions
+from .pool import instrument_pool, pool_options
+from .read_your_writes import mark_write, wrote_recently
 
 load_dotenv()
 
@@ -13,31 +21,109 @@ if not DATABASE_URL:
     raise ValueError("DATABASE_URL environment variable is not set")
 
 
-# Create engine with some good defaults for PostgreSQL
+def get_async_database_url(url: str) -> str:
+    """Point a sync PostgreSQL URL at the asyncpg driver"""
+    for scheme in ("postgresql+psycopg2://", "postgresql://"):
+        if url.startswith(scheme):
+            return "postgresql+asyncpg://" + url[len(scheme) :]
+    return url
+
+
+# Sync engine, kept for scripts and tooling that run outside the event loop
 @lru_cache
 def get_engine():
-    return create_engine(
+    engine = create_engine(
         DATABASE_URL,
         echo=False,  # Set to True for SQL query logging
-        pool_pre_ping=True,  # Enables connection pool "pre-ping" feature
-        pool_size=5,  # Maximum number of permanent connections
-        max_overflow=10,  # Maximum number of additional connections
+        **pool_options(async_engine=False),
+    )
+    instrument_pool(engine.pool, "sync")
+    return engine
+
+
+# Async engine used by the API, so queries never block the event loop
+@lru_cache
+def get_async_engine():
+    engine = create_async_engine(
+        get_async_database_url(DATABASE_URL),
+        echo=False,
+        **pool_options(async_engine=True),
+    )
+    instrument_pool(engine.sync_engine.pool, "async")
+    return engine
+
+
+# Async engine on the read replica, or the primary's when there is none
+@lru_cache
+def get_replica_engine():
+    if not settings.DATABASE_REPLICA_URL:
+        return get_async_engine()
+    engine = create_async_engine(
+        get_async_database_url(settings.DATABASE_REPLICA_URL),
+        echo=False,
+        **pool_options(async_engine=True),
     )
+    instrument_pool(engine.sync_engine.pool, "replica")
+    return engine
 
 
-# Create all tables on startup
-def create_db_and_tables():
-    SQLModel.metadata.create_all(get_engine())
+# Read-only view of the replica's, or the primary's, engine. asyncpg opens its
+# transactions with BEGIN READ ONLY: the same as SET TRANSACTION READ ONLY,
+# without a statement of its own
+@lru_cache
+def get_read_engine(primary: bool = False) -> AsyncEngine:
+    engine = get_async_engine() if primary else get_replica_engine()
+    return engine.execution_options(postgresql_readonly=True)
+
+
+# Create all tables, and the coming months' partitions, on startup
+async def create_db_and_tables():
+    async with get_async_engine().begin() as connection:
+        await connection.run_sync(SQLModel.metadata.create_all)
+        await connection.run_sync(ensure_partitions)
 
 
 # Session dependency
-def get_db() -> Iterator[Session]:
-    with Session(get_engine()) as session:
+async def get_db(request: Request) -> AsyncIterator[AsyncSession]:
+    # Keep attributes loaded after commit: lazy refreshes would need implicit IO
+    async with AsyncSession(get_async_engine(), expire_on_commit=False) as session:
         try:
             yield session
-            session.commit()
+            await session.commit()
         except Exception:
-            session.rollback()
+            await session.rollback()
             raise
         finally:
-            session.close()
+            # An endpoint may have committed before failing, so stay sticky
+            if session.info.get("wrote"):
+                mark_write(request)
+
+
+# Read-only session dependency for GET endpoints. Nothing is flushed or
+# committed; closing the session ends its transaction. Reads go to the replica,
+# unless the client wrote within `READ_YOUR_WRITES_WINDOW`
+async def get_read_db(request: Request) -> AsyncIterator[AsyncSession]:
+    engine = get_read_engine(primary=wrote_recently(request))
+    async with AsyncSession(engine, expire_on_commit=False, autoflush=False) as session:
+        yield session
+
+
+# Read-only session on the primary, for reads that fill a cache (see
+# app/api/user_cache.py): a lagging replica could serve rows the cache was
+# just invalidated for, to be kept until their TTL runs out
+async def get_primary_read_db() -> AsyncIterator[AsyncSession]:
+    engine = get_read_engine(primary=True)
+    async with AsyncSession(engine, expire_on_commit=False, autoflush=False) as session:
+        yield session
+
+
+# Session factory dependency, for work that outlives the endpoint: the body of
+# a StreamingResponse is sent after `get_db` has already closed its session
+def get_session_factory() -> Callable[[], AsyncSession]:
+    return partial(AsyncSession, get_async_engine(), expire_on_commit=False)
+
+
+# Read-only counterpart of `get_session_factory`, see `get_read_db`
+def get_read_session_factory(request: Request) -> Callable[[], AsyncSession]:
+    engine = get_read_engine(primary=wrote_recently(request))
+    return partial(AsyncSession, engine, expire_on_commit=False, autoflush=False)
@@ -1,6 +1,7 @@
 import logging
 
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from ..schemas.user import User, UserRole
 
@@ -10,10 +11,10 @@ logger = logging.getLogger(__name__)
 async def create_ai_teacher(engine):
     """Create AI teacher user if it doesn't exist"""
     try:
-        with Session(engine) as session:
+        async with AsyncSession(engine) as session:
             # Check if AI teacher already exists
             statement = select(User).where(User.id == "usr_ai_teacher")
-            existing_teacher = session.exec(statement).first()
+            existing_teacher = (await session.exec(statement)).first()
 
             if not existing_teacher:
                 logger.info("Creating AI teacher user...")
@@ -25,7 +26,7 @@ async def create_ai_teacher(engine):
                     meta={"is_ai": True},
                 )
                 session.add(ai_teacher)
-                session.commit()
+                await session.commit()
                 logger.info("AI teacher user created successfully")
             else:
                 logger.info("AI teacher user already exists")
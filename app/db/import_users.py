@@ -0,0 +1,192 @@
+"""
+Bulk user import through PostgreSQL COPY.
+
+Rows are streamed into a staging table with binary COPY, then merged into
+`user` with a single `INSERT ... ON CONFLICT DO NOTHING`. Rows clashing with
+an existing user (or an earlier row of the same file) on `tg_handle` or
+`telegram_id` are reported back as conflicts instead of failing the import.
+
+Accepted formats, one user per line:
+1. `csv` - header with `tg_handle,telegram_id,role[,meta]`, meta as JSON
+2. `ndjson` - `{"tg_handle": ..., "telegram_id": ..., "role": ..., "meta": {...}}`
+
+Usage:
+    python -m app.db.import_users users.csv [--format csv|ndjson]
+"""
+
+import argparse
+import asyncio
+import codecs
+import csv
+import json
+from typing import AsyncIterable, AsyncIterator, List, Tuple
+
+from sqlalchemy import text
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ..schemas.ids import uuid7
+from ..schemas.user import (
+    UserImportConflict,
+    UserImportError,
+    UserImportResult,
+    UserRole,
+)
+from .base import get_async_engine
+
+FORMATS = ("csv", "ndjson")
+STAGING_TABLE = "user_import_staging"
+STAGING_COLUMNS = ["line", "id", "tg_handle", "telegram_id", "role", "meta"]
+READ_CHUNK_SIZE = 64 * 1024
+
+
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[str]:
+    """Split a stream of UTF-8 bytes into lines without buffering it whole"""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer.rstrip("\r")
+
+
+async def parse_rows(
+    lines: AsyncIterable[str], format: str, errors: List[UserImportError]
+) -> AsyncIterator[Tuple]:
+    """Staging records for valid rows; invalid rows are appended to `errors`"""
+    header = None
+    line_number = 0
+    async for line in lines:
+        line_number += 1
+        if not line.strip():
+            continue
+        try:
+            if format == "csv":
+                values = next(csv.reader([line]))
+                if header is None:
+                    header = [column.strip() for column in values]
+                    continue
+                row = dict(zip(header, values))
+                meta = json.loads(row["meta"]) if row.get("meta") else {}
+            else:
+                row = json.loads(line)
+                meta = row.get("meta") or {}
+
+            tg_handle = str(row.get("tg_handle") or "").strip()
+            telegram_id = str(row.get("telegram_id") or "").strip()
+            role = UserRole(str(row.get("role", "")).strip().lower())
+            if not tg_handle or not telegram_id:
+                raise ValueError("tg_handle and telegram_id are required")
+            if not isinstance(meta, dict):
+                raise ValueError("meta must be a JSON object")
+        except (ValueError, TypeError, AttributeError, csv.Error) as e:
+            errors.append(UserImportError(line=line_number, detail=str(e)))
+            continue
+
+        yield (
+            line_number,
+            uuid7(),  # the bare UUID, as `user.id` stores it
+            tg_handle,
+            telegram_id,
+            role.name,
+            json.dumps(meta),
+        )
+
+
+async def import_users(
+    db: AsyncSession, lines: AsyncIterable[str], format: str
+) -> UserImportResult:
+    """COPY `lines` into staging and merge them into `user`"""
+    errors: List[UserImportError] = []
+
+    await db.exec(
+        text(
+            f"CREATE TEMP TABLE {STAGING_TABLE} ("
+            "line integer, id uuid, tg_handle text, telegram_id text, "
+            "role text, meta text)"
+        )
+    )
+
+    connection = await db.connection()
+    raw_connection = await connection.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(
+        STAGING_TABLE,
+        records=parse_rows(lines, format, errors),
+        columns=STAGING_COLUMNS,
+    )
+
+    # Earlier lines win when the file itself repeats a handle or telegram id
+    merged = await db.exec(text(f"""
+            INSERT INTO "user"
+                (id, created_at, updated_at, tg_handle, telegram_id, role, meta)
+            SELECT id, now() AT TIME ZONE 'utc', now() AT TIME ZONE 'utc',
+                   tg_handle, telegram_id, role::userrole, meta::json
+            FROM {STAGING_TABLE}
+            ORDER BY line
+            ON CONFLICT DO NOTHING
+            """))
+    conflicts = (await db.exec(text(f"""
+                SELECT s.line, s.tg_handle, s.telegram_id
+                FROM {STAGING_TABLE} s
+                WHERE NOT EXISTS (SELECT 1 FROM "user" u WHERE u.id = s.id)
+                ORDER BY s.line
+                """))).all()
+
+    await db.exec(text(f"DROP TABLE {STAGING_TABLE}"))
+
+    return UserImportResult(
+        imported=merged.rowcount,
+        conflicts=[
+            UserImportConflict(line=line, tg_handle=tg_handle, telegram_id=telegram_id)
+            for line, tg_handle, telegram_id in conflicts
+        ],
+        errors=sorted(errors, key=lambda error: error.line),
+    )
+
+
+async def read_file(path: str) -> AsyncIterator[bytes]:
+    with open(path, "rb") as file:
+        while chunk := file.read(READ_CHUNK_SIZE):
+            yield chunk
+
+
+async def run(path: str, format: str) -> UserImportResult:
+    engine = get_async_engine()
+    try:
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            result = await import_users(session, iter_lines(read_file(path)), format)
+            await session.commit()
+            return result
+    finally:
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import users from a file")
+    parser.add_argument("path")
+    parser.add_argument(
+        "--format", choices=FORMATS, help="Defaults to the file extension"
+    )
+    args = parser.parse_args()
+
+    format = args.format or ("csv" if args.path.endswith(".csv") else "ndjson")
+    result = asyncio.run(run(args.path, format))
+
+    print(
+        f"Imported {result.imported} users, {len(result.conflicts)} conflicts, "
+        f"{len(result.errors)} invalid rows"
+    )
+    for conflict in result.conflicts:
+        print(
+            f"  line {conflict.line}: conflict on @{conflict.tg_handle} "
+            f"({conflict.telegram_id})"
+        )
+    for error in result.errors:
+        print(f"  line {error.line}: {error.detail}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Maintenance of the monthly partitions of `submission` and `feedback`.
+
+1. `ensure` - create the partitions of this month and the next
+   `--months-ahead`, so inserts never run out of partitions. Run it from cron
+   (e.g. daily), as well as at startup.
+2. `archive` - detach the partitions of the months ended by `--before` and
+   move them to the `--schema` schema, where they can be dumped and dropped.
+   Partitions are detached concurrently, one at a time, without blocking the
+   queries on the parent table. Submission partitions that feedback from
+   later months still points to are kept.
+
+Usage:
+    python -m app.db.manage_partitions ensure [--months-ahead 3]
+    python -m app.db.manage_partitions archive --before 2025-09 [--schema archive]
+"""
+
+import argparse
+from datetime import datetime
+
+from .base import get_engine
+from .partitions import (
+    ARCHIVE_SCHEMA,
+    MONTHS_AHEAD,
+    archive_partitions,
+    ensure_partitions,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Create or archive monthly partitions of submission and feedback"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    ensure = commands.add_parser("ensure", help="create upcoming partitions")
+    ensure.add_argument("--months-ahead", type=int, default=MONTHS_AHEAD)
+    archive = commands.add_parser("archive", help="detach and archive old partitions")
+    archive.add_argument(
+        "--before",
+        type=lambda value: datetime.strptime(value, "%Y-%m"),
+        required=True,
+        help="first month to keep, YYYY-MM",
+    )
+    archive.add_argument("--schema", default=ARCHIVE_SCHEMA)
+    args = parser.parse_args()
+
+    engine = get_engine()
+    try:
+        if args.command == "ensure":
+            with engine.begin() as connection:
+                names = ensure_partitions(connection, months_ahead=args.months_ahead)
+            print(f"Ensured {len(names)} partitions")
+        else:
+            # DETACH ... CONCURRENTLY can't run in a transaction
+            with engine.connect().execution_options(
+                isolation_level="AUTOCOMMIT"
+            ) as connection:
+                names = archive_partitions(
+                    connection, args.before, schema=args.schema, concurrently=True
+                )
+            print(f"Archived {len(names)} partitions")
+        for name in names:
+            print(f"  {name}")
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+"""
+Monthly range partitions of the tables that only ever grow.
+
+`submission` and `feedback` are partitioned on `created_at`, one partition
+per calendar month: `submission_2026_10` holds October 2026. Queries that
+bound `created_at` only scan the partitions of those months, and old months
+can be detached and archived without touching the current ones, so neither
+today's queries nor vacuum work through past terms.
+
+Lookups by id are bounded too: ids are UUIDv7 minted at the row's
+`created_at` (see `TimeStampedModel`), and `created_near` turns them into a
+`created_at` range.
+
+There is no default partition, so a row for a month without partition fails
+to insert. Partitions are created `MONTHS_AHEAD` months in advance: with the
+tables, on startup, and by `python -m app.db.manage_partitions ensure`, which
+deployments should also run from cron. Migrations get the same as Alembic
+operations:
+
+    op.create_month_partitions("submission", since=datetime(2026, 1, 1))
+    op.archive_month_partitions("submission", before=datetime(2025, 9, 1))
+"""
+
+import logging
+import re
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Connection
+
+from alembic.operations import MigrateOperation, Operations
+
+from ..schemas.feedback import Feedback
+from ..schemas.ids import id_time
+from ..schemas.submission import Submission
+
+logger = logging.getLogger(__name__)
+
+PARTITIONED_TABLES = (Submission.__tablename__, Feedback.__tablename__)
+# Partitioned table -> (table, column) of the rows pointing to it. There is no
+# foreign key to hold them (it would need `created_at` as well as the id), so
+# `archive_partitions` keeps the partitions they still point to
+REFERENCED_BY = {Submission.__tablename__: (Feedback.__tablename__, "submission_id")}
+MONTHS_AHEAD = 3
+ARCHIVE_SCHEMA = "archive"
+# How far a row's `created_at` may be from the time in its id, for rows
+# whose id and `created_at` were both given by a client (see
+# `created_at_matches_id`)
+ID_TIME_SLACK = timedelta(days=1)
+
+
+def month_start(value: datetime) -> datetime:
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(month: datetime, count: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + count
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(table: str, month: datetime) -> str:
+    return f"{table}_{month:%Y_%m}"
+
+
+def is_partition(name: str) -> bool:
+    """Whether `name` is a monthly partition's, e.g. `submission_2026_10`"""
+    return any(
+        re.fullmatch(rf"{table}_\d{{4}}_\d{{2}}", name) for table in PARTITIONED_TABLES
+    )
+
+
+def create_partition_sql(table: str, month: datetime) -> str:
+    return (
+        f'CREATE TABLE IF NOT EXISTS "{partition_name(table, month)}" '
+        f'PARTITION OF "{table}" FOR VALUES '
+        f"FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+    )
+
+
+def is_partitioned(connection: Connection, table: str) -> bool:
+    return (
+        connection.execute(
+            text(
+                "SELECT 1 FROM pg_partitioned_table "
+                "WHERE partrelid = to_regclass(:table)"
+            ),
+            {"table": f'"{table}"'},
+        ).scalar()
+        is not None
+    )
+
+
+def ensure_partitions(
+    connection: Connection,
+    tables: Sequence[str] = PARTITIONED_TABLES,
+    since: Optional[datetime] = None,
+    months_ahead: int = MONTHS_AHEAD,
+) -> List[str]:
+    """Create the missing partitions from `since` (default now) to `months_ahead`
+
+    Tables that aren't partitioned yet (databases from before the migration)
+    are skipped with a warning.
+    """
+    first = month_start(since or datetime.utcnow())
+    last = add_months(month_start(datetime.utcnow()), months_ahead)
+    ensured = []
+    for table in tables:
+        if not is_partitioned(connection, table):
+            logger.warning(f"{table} isn't partitioned, run the migrations")
+            continue
+        month = first
+        while month <= last:
+            connection.execute(text(create_partition_sql(table, month)))
+            ensured.append(partition_name(table, month))
+            month = add_months(month, 1)
+    return ensured
+
+
+def list_partitions(connection: Connection, table: str) -> List[Tuple[str, datetime]]:
+    """`(name, month)` of the monthly partitions attached to `table`"""
+    names = connection.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = to_regclass(:table) "
+            "ORDER BY child.relname"
+        ),
+        {"table": f'"{table}"'},
+    ).scalars()
+    pattern = re.compile(rf"{re.escape(table)}_(\d{{4}})_(\d{{2}})")
+    partitions = []
+    for name in names:
+        match = pattern.fullmatch(name)
+        if match:
+            partitions.append((name, datetime(int(match[1]), int(match[2]), 1)))
+    return partitions
+
+
+def is_referenced(connection: Connection, table: str, partition: str) -> bool:
+    """Whether rows outside `partition` of `table` point to rows in it"""
+    if table not in REFERENCED_BY:
+        return False
+    referring, column = REFERENCED_BY[table]
+    return connection.execute(
+        text(
+            f'SELECT EXISTS (SELECT 1 FROM "{referring}" '
+            f'WHERE "{column}" IN (SELECT id FROM "{partition}"))'
+        )
+    ).scalar()
+
+
+def archive_partitions(
+    connection: Connection,
+    before: datetime,
+    tables: Sequence[str] = PARTITIONED_TABLES,
+    schema: str = ARCHIVE_SCHEMA,
+    concurrently: bool = False,
+) -> List[str]:
+    """Detach the partitions of months ended by `before` and move them to `schema`
+
+    Archived rows keep their foreign keys to `user` and `homeworktask`, and
+    no longer show up through the parent table. `concurrently` detaches
+    without blocking queries on the parent, but can't run in a transaction.
+
+    Submission partitions that feedback still in place points to are kept,
+    with a warning: feedback is archived first, so that's only feedback from
+    months after `before`.
+    """
+    connection.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{schema}"'))
+    archived = []
+    # Referring tables first, so their archived rows no longer count
+    for table in sorted(tables, key=lambda table: table in REFERENCED_BY):
+        for name, month in list_partitions(connection, table):
+            if add_months(month, 1) > before:
+                continue
+            if is_referenced(connection, table, name):
+                logger.warning(f"Not archiving {name}, rows still point to it")
+                continue
+            connection.execute(
+                text(
+                    f'ALTER TABLE "{table}" DETACH PARTITION "{name}"'
+                    + (" CONCURRENTLY" if concurrently else "")
+                )
+            )
+            connection.execute(text(f'ALTER TABLE "{name}" SET SCHEMA "{schema}"'))
+            archived.append(f"{schema}.{name}")
+    return archived
+
+
+def created_near(model, ids: Iterable[str]) -> List:
+    """Conditions on `model.created_at` implied by `ids`, for partition pruning
+
+    Empty when an id carries no time (ids from before UUIDv7, hand-made
+    ones): its row could be in any partition.
+    """
+    times = [id_time(id) for id in ids]
+    if not times or None in times:
+        return []
+    return [
+        model.created_at >= min(times) - ID_TIME_SLACK,
+        model.created_at < max(times) + ID_TIME_SLACK,
+    ]
+
+
+def created_at_matches_id(row) -> bool:
+    """Whether `row.created_at` is within `ID_TIME_SLACK` of its id's time
+
+    `created_near` bounds lookups by that time, so a row created further
+    from it couldn't be found by id. Ids without a time match any time.
+    """
+    at = id_time(row.id)
+    return at is None or abs(row.created_at - at) < ID_TIME_SLACK
+
+
+@event.listens_for(Submission.__table__, "after_create")
+@event.listens_for(Feedback.__table__, "after_create")
+def _create_first_partitions(table, connection, **kw):
+    # A partitioned table can't take rows before it has partitions
+    ensure_partitions(connection, [table.name])
+
+
+@Operations.register_operation("create_month_partitions")
+class CreateMonthPartitionsOp(MigrateOperation):
+    """`op.create_month_partitions(table, since=None, months_ahead=3)`"""
+
+    def __init__(
+        self,
+        table: str,
+        since: Optional[datetime] = None,
+        months_ahead: int = MONTHS_AHEAD,
+    ):
+        self.table = table
+        self.since = since
+        self.months_ahead = months_ahead
+
+    @classmethod
+    def create_month_partitions(cls, operations, table: str, **kwargs):
+        return operations.invoke(cls(table, **kwargs))
+
+
+@Operations.register_operation("archive_month_partitions")
+class ArchiveMonthPartitionsOp(MigrateOperation):
+    """`op.archive_month_partitions(table, before, schema="archive")`"""
+
+    def __init__(self, table: str, before: datetime, schema: str = ARCHIVE_SCHEMA):
+        self.table = table
+        self.before = before
+        self.schema = schema
+
+    @classmethod
+    def archive_month_partitions(cls, operations, table: str, **kwargs):
+        return operations.invoke(cls(table, **kwargs))
+
+
+@Operations.implementation_for(CreateMonthPartitionsOp)
+def _create_month_partitions(operations, operation: CreateMonthPartitionsOp):
+    ensure_partitions(
+        operations.get_bind(),
+        [operation.table],
+        since=operation.since,
+        months_ahead=operation.months_ahead,
+    )
+
+
+@Operations.implementation_for(ArchiveMonthPartitionsOp)
+def _archive_month_partitions(operations, operation: ArchiveMonthPartitionsOp):
+    archive_partitions(
+        operations.get_bind(),
+        operation.before,
+        [operation.table],
+        schema=operation.schema,
+    )
@@ -0,0 +1,135 @@
+"""
+Connection pool configuration and metrics.
+
+Both engines build their pool from `Settings` (see `pool_options`) and report
+it to Prometheus, labeled by engine (`sync` / `async` / `replica`):
+- `db_connections_active` (`DB_CONNECTION_GAUGE`) - connections checked out
+- `db_pool_connections_idle` - connections open in the pool, not checked out
+- `db_pool_overflow` - connections open beyond `DB_POOL_SIZE`
+- `db_pool_checkout_wait_seconds` - time to get a connection, including any
+  wait for one to be returned
+- `db_pool_checkout_timeouts_total` - checkouts that gave up after
+  `DB_POOL_TIMEOUT`
+
+Counts are kept from the pool events as they happen rather than read from the
+pool, whose own counters are only updated after the `checkin` event. There is
+no event for the start of a checkout, so the pool classes here time it.
+"""
+
+import threading
+import time
+from typing import Any, Dict
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+from ..core.config import settings
+from ..core.metrics import (
+    DB_CONNECTION_GAUGE,
+    DB_POOL_CHECKOUT_TIMEOUTS,
+    DB_POOL_CHECKOUT_WAIT,
+    DB_POOL_IDLE,
+    DB_POOL_OVERFLOW,
+)
+
+
+class _TimedCheckout:
+    # Set per pool by `instrument_pool`
+    engine_label = ""
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.engine_label = self.engine_label
+        return pool
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            DB_POOL_CHECKOUT_TIMEOUTS.labels(engine=self.engine_label).inc()
+            raise
+        finally:
+            DB_POOL_CHECKOUT_WAIT.labels(engine=self.engine_label).observe(
+                time.perf_counter() - start
+            )
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    engine_label = "sync"
+
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    engine_label = "async"
+
+
+def pool_options(async_engine: bool) -> Dict[str, Any]:
+    """`create_engine` pool arguments from the settings"""
+    return {
+        "poolclass": TimedAsyncQueuePool if async_engine else TimedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_use_lifo": settings.DB_POOL_USE_LIFO,
+    }
+
+
+class PoolStats:
+    """Open and checked out connections of one engine's pool"""
+
+    def __init__(self, engine_label: str, pool_size: int):
+        self.engine_label = engine_label
+        self.pool_size = pool_size
+        self.open = 0
+        self.checked_out = 0
+        self._lock = threading.Lock()
+
+    def update(self, opened: int = 0, checked_out: int = 0):
+        with self._lock:
+            self.open += opened
+            self.checked_out += checked_out
+            DB_CONNECTION_GAUGE.labels(engine=self.engine_label).set(self.checked_out)
+            DB_POOL_IDLE.labels(engine=self.engine_label).set(
+                self.open - self.checked_out
+            )
+            DB_POOL_OVERFLOW.labels(engine=self.engine_label).set(
+                max(0, self.open - self.pool_size)
+            )
+
+
+def instrument_pool(pool: Pool, engine_label: str) -> PoolStats:
+    """Keep the pool metrics of `engine_label` up to date from `pool`'s events
+
+    Listeners carry over when the engine is disposed and its pool recreated.
+    """
+    if isinstance(pool, _TimedCheckout):
+        pool.engine_label = engine_label
+    stats = PoolStats(engine_label, pool.size() if hasattr(pool, "size") else 0)
+    stats.update()
+
+    @event.listens_for(pool, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        stats.update(opened=1)
+
+    @event.listens_for(pool, "close")
+    def on_close(dbapi_connection, connection_record):
+        stats.update(opened=-1)
+
+    @event.listens_for(pool, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        stats.update(checked_out=1)
+
+    @event.listens_for(pool, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        stats.update(checked_out=-1)
+
+    # A detached connection leaves the pool while still checked out, and is
+    # never checked in
+    @event.listens_for(pool, "detach")
+    def on_detach(dbapi_connection, connection_record):
+        stats.update(opened=-1, checked_out=-1)
+
+    return stats
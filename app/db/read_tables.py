@@ -0,0 +1,153 @@
+"""
+Read tables materialized at write time: `teacher_inbox` and `student_dashboard`.
+
+The teacher's pending submissions and the student's homework list used to be
+joined from `submission`, `homeworktask`, `homework_assignment` and `user` on
+every read. They're now kept ready in tables of their own, updated by the
+write endpoints in the same statement, or at least the same transaction, as
+the rows they're derived from:
+
+1. `POST /homework/assign/` (and `/assign/bulk`) - a dashboard row per student
+2. `PATCH /homework/{id}/status` - the homework status on its dashboard rows
+3. `POST /submissions/` - an inbox row; `submitted_at` on the dashboard
+4. `POST /feedback/` - the inbox row goes; statuses on the dashboard
+5. `PUT /users/by_telegram_id/{telegram_id}` - renamed handles
+
+Each read is then one indexed query, costing the rows it returns.
+
+The queries below compute the same rows from the source tables. `rebuild`
+refills both tables from them, e.g. after writing to the sources by hand.
+
+Usage:
+    python -m app.db.read_tables rebuild
+"""
+
+import argparse
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import aliased
+
+from ..schemas.base import Status
+from ..schemas.homework import HomeworkAssignment, HomeworkTask
+from ..schemas.submission import Submission
+from ..schemas.user import User
+from ..schemas.views import StudentDashboard, TeacherInbox
+from .base import get_engine
+
+
+def homework_title():
+    return func.coalesce(HomeworkTask.title, "Untitled")
+
+
+def inbox_source():
+    """`teacher_inbox` rows, from the pending submissions"""
+    return (
+        select(
+            Submission.id,
+            Submission.created_at,
+            Submission.status,
+            Submission.teacher_id,
+            Submission.student_id,
+            User.tg_handle,
+            Submission.homework_task_id,
+            homework_title(),
+            Submission.content,
+        )
+        .join(User, User.id == Submission.student_id)
+        .join(HomeworkTask, HomeworkTask.id == Submission.homework_task_id)
+        .where(Submission.status == Status.PENDING)
+    )
+
+
+INBOX_COLUMNS = [
+    "id",
+    "created_at",
+    "status",
+    "teacher_id",
+    "student_id",
+    "student_handle",
+    "homework_task_id",
+    "homework_title",
+    "content",
+]
+
+
+def dashboard_source(assignments=HomeworkAssignment.__table__):
+    """`student_dashboard` rows, from `assignments`: the assignment table, or
+    rows just inserted into it (an `INSERT ... RETURNING` CTE)"""
+    teacher = aliased(User)
+    return (
+        select(
+            assignments.c.student_id,
+            HomeworkTask.id,
+            HomeworkTask.created_at,
+            HomeworkTask.status,
+            homework_title(),
+            HomeworkTask.teacher_id,
+            teacher.tg_handle,
+            teacher.telegram_id,
+            assignments.c.status,
+            assignments.c.submitted_at,
+        )
+        .select_from(assignments)
+        .join(HomeworkTask, HomeworkTask.id == assignments.c.homework_id)
+        .join(teacher, teacher.id == HomeworkTask.teacher_id)
+    )
+
+
+DASHBOARD_COLUMNS = [
+    "student_id",
+    "id",
+    "created_at",
+    "status",
+    "homework_title",
+    "teacher_id",
+    "teacher_handle",
+    "teacher_telegram_id",
+    "assignment_status",
+    "submitted_at",
+]
+
+
+def insert_dashboard_rows(assignments=HomeworkAssignment.__table__, *where):
+    """`student_dashboard` rows of `assignments` (see `dashboard_source`)"""
+    return insert(StudentDashboard).from_select(
+        DASHBOARD_COLUMNS, dashboard_source(assignments).where(*where)
+    )
+
+
+def rebuild(connection: Connection) -> None:
+    """Recompute both tables. Readers see the old rows until the transaction
+    commits"""
+    connection.execute(delete(TeacherInbox))
+    connection.execute(insert(TeacherInbox).from_select(INBOX_COLUMNS, inbox_source()))
+    connection.execute(delete(StudentDashboard))
+    connection.execute(insert_dashboard_rows())
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Maintain the teacher inbox and student dashboard tables"
+    )
+    parser.add_argument("command", choices=["rebuild"])
+    parser.parse_args()
+
+    engine = get_engine()
+    try:
+        with engine.begin() as connection:
+            rebuild(connection)
+            inbox = connection.execute(select(func.count()).select_from(TeacherInbox))
+            dashboard = connection.execute(
+                select(func.count()).select_from(StudentDashboard)
+            )
+            print(
+                f"Rebuilt teacher_inbox ({inbox.scalar()} rows) and "
+                f"student_dashboard ({dashboard.scalar()} rows)"
+            )
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Read-your-writes stickiness for the read-only sessions.
+
+GET endpoints read through `get_read_db`, from the replica when one is
+configured, and a replica may lag the primary. So that a client sees its own
+writes, a request whose session committed any change answers with a
+`last_write` cookie holding the commit time. For `READ_YOUR_WRITES_WINDOW`
+seconds after that, the client's reads go to the primary instead.
+
+The cookie is per client, not per user: the bot shares one HTTP client among
+its users, so a write on behalf of one of them keeps all of its reads on the
+primary for the window. That only costs replica offloading, never freshness.
+"""
+
+import math
+import time
+
+from fastapi import FastAPI, Request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+
+LAST_WRITE_COOKIE = "last_write"
+
+
+@event.listens_for(Session, "after_flush")
+def _flushed(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _executed(orm_execute_state):
+    # Bulk and Core style statements run through the session skip the flush
+    if (
+        orm_execute_state.is_insert
+        or orm_execute_state.is_update
+        or orm_execute_state.is_delete
+    ):
+        orm_execute_state.session.info["wrote"] = True
+
+
+def mark_write(request: Request):
+    """Record that the request committed a write"""
+    request.state.last_write = time.time()
+
+
+def wrote_recently(request: Request) -> bool:
+    """Whether the client wrote within the read-your-writes window"""
+    try:
+        last_write = float(request.cookies[LAST_WRITE_COOKIE])
+    except (KeyError, ValueError):
+        return False
+    return 0 <= time.time() - last_write < settings.READ_YOUR_WRITES_WINDOW
+
+
+def setup_read_your_writes(app: FastAPI):
+    @app.middleware("http")
+    async def read_your_writes_middleware(request, call_next):
+        response = await call_next(request)
+
+        last_write = getattr(request.state, "last_write", None)
+        if last_write is not None and settings.READ_YOUR_WRITES_WINDOW > 0:
+            response.set_cookie(
+                LAST_WRITE_COOKIE,
+                f"{last_write:.3f}",
+                max_age=math.ceil(settings.READ_YOUR_WRITES_WINDOW),
+                httponly=True,
+                samesite="lax",
+            )
+        return response
+
+    return app
@@ -2,12 +2,13 @@ import logging
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, HTTPException, status
-from sqlmodel import Session, text
+from sqlmodel import text
 
 from .api.api import api_router
 from .core.metrics import setup_metrics
-from .db.base import create_db_and_tables, get_engine
+from .db.base import create_db_and_tables, get_async_engine, get_replica_engine
 from .db.create_ai_teacher import create_ai_teacher
+from .db.read_your_writes import setup_read_your_writes
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -18,14 +19,16 @@ logger = logging.getLogger(__name__)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    create_db_and_tables()
+    await create_db_and_tables()
     logger.info("Application startup: Database tables created")
 
     # Create AI teacher
-    await create_ai_teacher(get_engine())
+    await create_ai_teacher(get_async_engine())
 
     yield
     # Shutdown
+    await get_async_engine().dispose()
+    await get_replica_engine().dispose()
     logger.info("Application shutdown")
 
 
@@ -49,15 +52,18 @@ app.add_middleware(
 # Setup metrics
 app = setup_metrics(app)
 
+# Keep a client's reads on the primary right after it writes
+app = setup_read_your_writes(app)
+
 # Include routers
 app.include_router(api_router)
 
 
 @app.get("/health")
-def health_check():
+async def health_check():
     try:
-        with Session(get_engine()) as session:
-            session.execute(text("SELECT 1"))
+        async with get_async_engine().connect() as connection:
+            await connection.execute(text("SELECT 1"))
         return {"status": "healthy", "database": "connected"}
     except Exception as e:
         logger.error(f"Health check failed: {e}")
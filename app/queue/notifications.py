@@ -1,11 +1,13 @@
+from typing import List, Tuple
+
 from .message_types import Message, MessageType
 from .producer import NotificationProducer
 
 producer = NotificationProducer()
 
 
-def notify_homework_assigned(student_tg_id: str, homework_data: dict):
-    message = Message(
+def _homework_assigned_message(student_tg_id: str, homework_data: dict) -> Message:
+    return Message(
         type=MessageType.HOMEWORK_ASSIGNED,
         recipient_id=student_tg_id,
         data={
@@ -17,9 +19,22 @@ def notify_homework_assigned(student_tg_id: str, homework_data: dict):
             ),
         },
     )
+
+
+def notify_homework_assigned(student_tg_id: str, homework_data: dict):
+    message = _homework_assigned_message(student_tg_id, homework_data)
     return producer.send_message(message)
 
 
+def notify_homework_assigned_batch(notifications: List[Tuple[str, dict]]):
+    """Send (student_tg_id, homework_data) notifications as one batch"""
+    messages = [
+        _homework_assigned_message(student_tg_id, homework_data)
+        for student_tg_id, homework_data in notifications
+    ]
+    return producer.send_messages(messages)
+
+
 def notify_submission_received(teacher_tg_id: str, submission_data: dict):
     message = Message(
         type=MessageType.SUBMISSION_RECEIVED,
@@ -1,5 +1,7 @@
 import json
 import logging
+import threading
+from typing import List
 
 import pika
 
@@ -12,13 +14,21 @@ logger = logging.getLogger(__name__)
 class NotificationProducer:
     def __init__(self):
         self.channel = None
+        self.batch_channel = None
         self.connection = None
+        # The API publishes from worker threads, and a pika connection must
+        # only be used by one thread at a time
+        self.lock = threading.Lock()
         try:
             self._initialize_connection()
         except Exception as e:
             logger.error(f"Failed to initialize connection: {e}")
 
     def send_message(self, message: Message) -> bool:
+        with self.lock:
+            return self._send_message(message)
+
+    def _send_message(self, message: Message) -> bool:
         try:
             message_dict = message.to_dict()
             logger.info(f"Attempting to send message: {message_dict}")  # Add this line
@@ -38,6 +48,52 @@ class NotificationProducer:
             )  # Add exc_info=True
             return False
 
+    def send_messages(self, messages: List[Message]) -> bool:
+        """Publish a batch of messages with publisher confirms.
+
+        The batch goes over a channel in confirm mode, where pika's blocking
+        `basic_publish` returns once the broker has acked the message, and
+        raises if it nacked it. A failed batch stops there: the messages
+        before it were delivered, the rest were not sent.
+        """
+        if not messages:
+            return True
+        with self.lock:
+            return self._send_messages(messages)
+
+    def _send_messages(self, messages: List[Message]) -> bool:
+        confirmed = 0
+        try:
+            channel = self._get_batch_channel()
+            for message in messages:
+                channel.basic_publish(
+                    exchange="",
+                    routing_key="notifications",
+                    body=json.dumps(message.to_dict()),
+                    properties=pika.BasicProperties(delivery_mode=2),
+                )
+                confirmed += 1
+            logger.info(f"Published batch of {len(messages)} messages")
+            return True
+        except Exception as e:
+            logger.error(
+                f"Failed to send batch of {len(messages)} messages, "
+                f"{confirmed} confirmed: {e}",
+                exc_info=True,
+            )
+            if self.batch_channel and self.batch_channel.is_open:
+                self.batch_channel.close()
+            self.batch_channel = None
+            return False
+
+    def _get_batch_channel(self):
+        # Kept apart from `channel` so single messages don't wait for acks
+        if self.batch_channel is None or self.batch_channel.is_closed:
+            self.batch_channel = self.connection.channel()
+            self.batch_channel.queue_declare(queue="notifications", durable=True)
+            self.batch_channel.confirm_delivery()
+        return self.batch_channel
+
     def _initialize_connection(self):
         try:
             self.connection = get_rabbitmq_connection()
@@ -52,6 +108,8 @@ class NotificationProducer:
             raise
 
     def close(self):
+        if self.batch_channel and not self.batch_channel.is_closed:
+            self.batch_channel.close()
         if self.channel and not self.channel.is_closed:
             self.channel.close()
         if self.connection and not self.connection.is_closed:
@@ -0,0 +1,17 @@
+from datetime import datetime
+from typing import List, Optional
+
+from sqlmodel import Field, SQLModel
+
+
+class AnalyticsTableExport(SQLModel):
+    table: str
+    rows: int
+    files: int
+    # `updated_at` of the last exported row; the next run starts after it
+    watermark: Optional[datetime] = None
+
+
+class AnalyticsExportResult(SQLModel):
+    output_dir: str
+    tables: List[AnalyticsTableExport] = Field(default_factory=list)
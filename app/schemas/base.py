@@ -1,11 +1,25 @@
-from datetime import datetime
+from datetime import datetime, timezone
 from enum import Enum
-from typing import Dict, Optional
-from uuid import uuid4
+from typing import Any, Dict, Optional, Set
 
-from sqlalchemy import JSON
+from sqlalchemy import (
+    DDL,
+    BigInteger,
+    Column,
+    Computed,
+    Integer,
+    Sequence,
+    Text,
+    event,
+    func,
+    text,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlmodel import Field, SQLModel
 
+from .ids import new_id
+
 
 class Status(str, Enum):
     COMPLETED = "completed"
@@ -16,15 +30,158 @@ class Status(str, Enum):
 class TimeStampedModel(SQLModel):
     id: str = Field(default=None, primary_key=True)
     created_at: datetime = Field(default_factory=datetime.utcnow, nullable=False)
+    # Row version behind the API's ETags, bumped by ORM and Core updates alike
+    updated_at: datetime = Field(
+        default_factory=datetime.utcnow,
+        nullable=False,
+        sa_column_kwargs={"onupdate": datetime.utcnow},
+    )
 
     def __init__(self, **data):
+        # Table models skip validation, so a client's `created_at` comes as
+        # text; the columns hold naive UTC
+        created_at = data.get("created_at")
+        if isinstance(created_at, str):
+            created_at = datetime.fromisoformat(created_at)
+        if isinstance(created_at, datetime) and created_at.tzinfo is not None:
+            created_at = created_at.astimezone(timezone.utc).replace(tzinfo=None)
+        if created_at is not None:
+            data["created_at"] = created_at
         if "id" not in data:
             prefix = getattr(self, "id_prefix", "item")
-            data["id"] = f"{prefix}_{uuid4()}"
+            # Minted at `created_at`, so the id tells which monthly partition
+            # holds the row (see app/db/partitions.py)
+            data.setdefault("created_at", datetime.utcnow())
+            created_at = data["created_at"]
+            at = created_at if isinstance(created_at, datetime) else None
+            data["id"] = new_id(prefix, at)
         super().__init__(**data)
 
 
+# Table arguments of the tables partitioned by month of `created_at`, see
+# app/db/partitions.py. Their primary key takes `created_at` too (PostgreSQL
+# only enforces uniqueness within a partition), while the ORM still
+# identifies rows by `id` alone
+PARTITION_BY_MONTH = {"postgresql_partition_by": "RANGE (created_at)"}
+PARTITIONED_MAPPER_ARGS = {"primary_key": ["id"]}
+
+
+def partition_key() -> Any:
+    """`created_at` of a partitioned table, part of its primary key"""
+    return Field(default_factory=datetime.utcnow, primary_key=True)
+
+
+# Shared by the tables `GET /sync` reads changes from (see
+# app/api/endpoints/sync.py)
+CHANGE_SEQ = Sequence("change_seq", metadata=SQLModel.metadata)
+
+
+def change_sequence() -> Any:
+    """Position of the row's last change, from `CHANGE_SEQ`
+
+    Taken by the database on insert, and again by every ORM or Core update.
+    Left out of model dumps (and so of request and response bodies), so Core
+    inserts leave it to the default.
+    """
+    return Field(
+        default=None,
+        exclude=True,
+        sa_column=Column(
+            BigInteger,
+            server_default=CHANGE_SEQ.next_value(),
+            onupdate=CHANGE_SEQ.next_value(),
+            nullable=False,
+        ),
+    )
+
+
 class SequenceItemBase(TimeStampedModel):
     # previous_id: Optional[str] = Field(default=None)
-    content: Dict = Field(default_factory=dict, sa_type=JSON)
+    content: Dict = Field(default_factory=dict, sa_type=JSONB)
     status: Status = Field(default=Status.PENDING)
+
+
+def content_text(key: str) -> Any:
+    """Read-only text column generated from `content ->> key`"""
+    return Field(
+        default=None,
+        sa_column=Column(Text, Computed(f"content ->> '{key}'", persisted=True)),
+    )
+
+
+def content_integer(key: str) -> Any:
+    """Read-only integer column generated from `content -> key`
+
+    `content` is free-form, so anything but a number in range becomes NULL
+    rather than failing the write.
+    """
+    value = f"(content ->> '{key}')::numeric"
+    expression = (
+        f"CASE WHEN jsonb_typeof(content -> '{key}') = 'number' "
+        f"THEN CASE WHEN abs({value}) < 2147483648 THEN {value}::integer END END"
+    )
+    return Field(
+        default=None, sa_column=Column(Integer, Computed(expression, persisted=True))
+    )
+
+
+def generated_fields(model) -> Set[str]:
+    """Columns the database computes, to leave out of Core inserts"""
+    return {
+        column.key for column in model.__table__.columns if column.computed is not None
+    }
+
+
+@event.listens_for(SequenceItemBase, "before_insert", propagate=True)
+@event.listens_for(SequenceItemBase, "before_update", propagate=True)
+def _skip_generated_columns(mapper, connection, target):
+    # Generated columns can't be written; drop whatever the object holds (e.g.
+    # from a request body) so the flush leaves them out
+    for column in mapper.columns:
+        if column.computed is not None:
+            set_committed_value(target, column.key, None)
+
+
+# Text search configuration of the full-text indexes and queries
+SEARCH_CONFIG = "english"
+
+
+def search_vector(content, *keys: str):
+    """`to_tsvector` over `content` keys, exactly as the full-text indexes are built
+
+    Literals are rendered inline (not as bind parameters) so queries using
+    this expression match the index expression. They're `text` rather than
+    `literal_column`, which `Index` would mistake for its table's column.
+    """
+    texts = [
+        func.coalesce(
+            content.op("->>", return_type=Text)(text(f"'{key}'")),
+            text("''"),
+        )
+        for key in keys
+    ]
+    document = texts[0]
+    for more in texts[1:]:
+        document = document.op("||")(text("' '")).op("||")(more)
+    return func.to_tsvector(text(f"'{SEARCH_CONFIG}'::regconfig"), document)
+
+
+def pg_trgm_available(ddl, target, bind, **kw) -> bool:
+    """Whether the server ships pg_trgm (it's a contrib extension)"""
+    return (
+        bind.execute(
+            text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        ).scalar()
+        is not None
+    )
+
+
+# Fuzzy title search uses trigrams where the extension is available, see
+# app/api/endpoints/search.py
+event.listen(
+    SQLModel.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(
+        callable_=pg_trgm_available
+    ),
+)
@@ -1,16 +1,74 @@
-from typing import ClassVar
+from datetime import datetime
+from typing import ClassVar, Optional
 
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel
 
-from .base import SequenceItemBase
+from .base import (
+    PARTITION_BY_MONTH,
+    PARTITIONED_MAPPER_ARGS,
+    SequenceItemBase,
+    change_sequence,
+    content_integer,
+    partition_key,
+    search_vector,
+)
+from .ids import PrefixedId, foreign_id, prefixed_id
 
 
 class Feedback(SequenceItemBase, table=True):
     id_prefix: ClassVar[str] = "fb"
+    id: str = prefixed_id(id_prefix)
+    created_at: datetime = partition_key()
+    __table_args__ = (
+        Index(
+            "ix_feedback_submission_id_created_at_id",
+            "submission_id",
+            "created_at",
+            "id",
+        ),
+        Index(
+            "ix_feedback_submission_id_status_created_at_id",
+            "submission_id",
+            "status",
+            "created_at",
+            "id",
+        ),
+        Index("ix_feedback_student_id_created_at_id", "student_id", "created_at", "id"),
+        Index("ix_feedback_teacher_id_created_at_id", "teacher_id", "created_at", "id"),
+        Index(
+            "ix_feedback_submission_id_score_created_at_id",
+            "submission_id",
+            "score",
+            "created_at",
+            "id",
+        ),
+        # Changes since a `GET /sync` cursor
+        Index("ix_feedback_student_id_change_seq", "student_id", "change_seq"),
+        Index("ix_feedback_teacher_id_change_seq", "teacher_id", "change_seq"),
+        # Incremental analytics export, past its `(updated_at, id)` watermark
+        Index("ix_feedback_updated_at_id", "updated_at", "id"),
+        PARTITION_BY_MONTH,
+    )
+    __mapper_args__ = {**PARTITIONED_MAPPER_ARGS, "eager_defaults": True}
 
-    student_id: str = Field(foreign_key="user.id")
-    teacher_id: str = Field(foreign_key="user.id")
-    submission_id: str = Field(foreign_key="submission.id")
+    change_seq: Optional[int] = change_sequence()
+
+    student_id: str = foreign_id("user.id", "usr")
+    teacher_id: str = foreign_id("user.id", "usr")
+    # Not a foreign key: `submission` is partitioned, so `id` alone isn't
+    # unique there. `create_feedback` checks the submission exists
+    submission_id: str = Field(sa_type=PrefixedId("sub"))
+    # Generated from `content` by the database, see `content_integer`
+    score: Optional[int] = content_integer("score")
 
     class Config:
         from_attributes = True
+
+
+# Full-text search over the feedback text
+Index(
+    "ix_feedback_search",
+    search_vector(Feedback.content, "text"),
+    postgresql_using="gin",
+)
@@ -1,20 +1,126 @@
-from typing import ClassVar, List
+from datetime import datetime
+from typing import ClassVar, List, Optional
 
-from sqlalchemy import Column, String
-from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy import DDL, Index, event
 from sqlmodel import Field, SQLModel
 
-from .base import SequenceItemBase
+from .base import (
+    SequenceItemBase,
+    Status,
+    change_sequence,
+    content_text,
+    pg_trgm_available,
+    search_vector,
+)
+from .ids import foreign_id, prefixed_id
 from .user import UserRole
 
 
-class HomeworkTask(SequenceItemBase, table=True):
+class HomeworkTaskBase(SequenceItemBase):
     id_prefix: ClassVar[str] = "hw"
+    id: str = prefixed_id(id_prefix)
 
-    teacher_id: str = Field(foreign_key="user.id")
-    student_ids: List[str] = Field(
-        default_factory=list, sa_column=Column(ARRAY(String))
+    teacher_id: str = foreign_id("user.id", "usr")
+
+
+class HomeworkTask(HomeworkTaskBase, table=True):
+    __table_args__ = (
+        Index(
+            "ix_homeworktask_teacher_id_created_at_id", "teacher_id", "created_at", "id"
+        ),
+        Index(
+            "ix_homeworktask_teacher_id_status_created_at_id",
+            "teacher_id",
+            "status",
+            "created_at",
+            "id",
+        ),
+        # Filters and sorts on the generated content columns
+        Index(
+            "ix_homeworktask_teacher_id_title_created_at_id",
+            "teacher_id",
+            "title",
+            "created_at",
+            "id",
+        ),
+        Index(
+            "ix_homeworktask_teacher_id_topic_language_level",
+            "teacher_id",
+            "topic",
+            "language_level",
+            "created_at",
+            "id",
+        ),
+        # Containment filters on any other `content` key
+        Index(
+            "ix_homeworktask_content",
+            "content",
+            postgresql_using="gin",
+            postgresql_ops={"content": "jsonb_path_ops"},
+        ),
+        # Changes since a `GET /sync` cursor
+        Index("ix_homeworktask_teacher_id_change_seq", "teacher_id", "change_seq"),
+        # Incremental analytics export, past its `(updated_at, id)` watermark
+        Index("ix_homeworktask_updated_at_id", "updated_at", "id"),
     )
+    __mapper_args__ = {"eager_defaults": True}
+
+    change_seq: Optional[int] = change_sequence()
+
+    # Generated from `content` by the database, see `content_text`
+    title: Optional[str] = content_text("title")
+    topic: Optional[str] = content_text("topic")
+    language_level: Optional[str] = content_text("language_level")
+
+    # Completion counters, kept in step with the assignments so the completion
+    # check doesn't depend on the class size
+    assigned_count: int = Field(default=0)
+    submitted_count: int = Field(default=0)
+    graded_count: int = Field(default=0)
+
+    class Config:
+        from_attributes = True
+
+
+# Full-text search over title and description
+Index(
+    "ix_homeworktask_search",
+    search_vector(HomeworkTask.content, "title", "description"),
+    postgresql_using="gin",
+)
+
+# Fuzzy title matching; needs pg_trgm, so it's created only where the
+# extension is available (the migration does the same)
+TITLE_TRIGRAM_INDEX = "ix_homeworktask_title_trgm"
+event.listen(
+    HomeworkTask.__table__,
+    "after_create",
+    DDL(
+        f"CREATE INDEX IF NOT EXISTS {TITLE_TRIGRAM_INDEX} "
+        "ON homeworktask USING gin (title gin_trgm_ops)"
+    ).execute_if(callable_=pg_trgm_available),
+)
+
+
+class HomeworkAssignment(SQLModel, table=True):
+    """One student's copy of a homework, with its own completion status"""
+
+    __tablename__ = "homework_assignment"
+    __table_args__ = (
+        Index("ix_homework_assignment_student_id", "student_id", "homework_id"),
+    )
+
+    homework_id: str = foreign_id("homeworktask.id", "hw", primary_key=True)
+    student_id: str = foreign_id("user.id", "usr", primary_key=True)
+    status: Status = Field(default=Status.PENDING)
+    assigned_at: datetime = Field(default_factory=datetime.utcnow, nullable=False)
+    submitted_at: Optional[datetime] = Field(default=None)
+
+
+class HomeworkTaskWithStudents(HomeworkTaskBase):
+    """Homework as the API accepts and returns it, with its assigned students"""
+
+    student_ids: List[str] = Field(default_factory=list)
 
     class Config:
         from_attributes = True
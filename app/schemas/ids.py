@@ -0,0 +1,116 @@
+"""
+Time-ordered ids, stored as native `uuid` columns.
+
+Above the database ids read `<prefix>_<uuid>` (`usr_...`, `hw_...`), as they
+always have, but the columns hold the 16-byte UUID alone: `PrefixedId` strips
+the prefix on the way in and adds it back on the way out. New ids are UUIDv7,
+whose leading 48 bits are the creation time in milliseconds, so inserts append
+to the right edge of the primary and foreign key indexes instead of landing on
+random pages.
+
+Ids that aren't `<prefix>_<uuid>` (hand-made ones like `usr_ai_teacher`, or
+malformed ones from a request) are stored as the md5 of the whole string, as
+the migration did with existing rows. A malformed id then finds nothing
+rather than failing the query, and `RESERVED_IDS` read back as themselves.
+"""
+
+import calendar
+import hashlib
+import os
+import re
+import time
+from datetime import datetime, timedelta
+from typing import Any, Optional
+from uuid import UUID
+
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.types import TypeDecorator
+from sqlmodel import Field
+
+UUID_PATTERN = re.compile(
+    r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", re.IGNORECASE
+)
+
+# Fixed ids of rows the application creates itself, see
+# app/db/create_ai_teacher.py
+RESERVED_IDS = ("usr_ai_teacher",)
+
+
+def uuid7(at: Optional[datetime] = None) -> UUID:
+    """Version 7 UUID (RFC 9562): Unix time in milliseconds, then random bits
+
+    The time is `at` (naive UTC, like the models' timestamps) or now.
+    """
+    if at is None:
+        millis = time.time_ns() // 1_000_000
+    else:
+        millis = calendar.timegm(at.utctimetuple()) * 1000 + at.microsecond // 1000
+    value = millis << 80 | int.from_bytes(os.urandom(10), "big")
+    value = (value & ~(0xF << 76)) | (0x7 << 76)  # version
+    value = (value & ~(0x3 << 62)) | (0x2 << 62)  # variant
+    return UUID(int=value)
+
+
+def new_id(prefix: str, at: Optional[datetime] = None) -> str:
+    return f"{prefix}_{uuid7(at)}"
+
+
+def id_time(value: str) -> Optional[datetime]:
+    """Time a UUIDv7 id was minted at, naive UTC; None for any other id"""
+    _, _, tail = value.partition("_")
+    if not UUID_PATTERN.fullmatch(tail) or value in RESERVED_IDS:
+        return None
+    uuid = UUID(tail)
+    if uuid.version != 7:
+        return None
+    return datetime(1970, 1, 1) + timedelta(milliseconds=uuid.int >> 80)
+
+
+def hashed_uuid(value: str) -> str:
+    """UUID of an id that has none, `md5(value)::uuid` in SQL"""
+    return str(UUID(hashlib.md5(value.encode()).hexdigest()))
+
+
+_RESERVED_BY_UUID = {hashed_uuid(id): id for id in RESERVED_IDS}
+
+
+def id_to_uuid(value: str, prefix: str) -> str:
+    head, _, tail = value.partition("_")
+    if head == prefix and UUID_PATTERN.fullmatch(tail) and value not in RESERVED_IDS:
+        return tail.lower()
+    return hashed_uuid(value)
+
+
+def uuid_to_id(value: Any, prefix: str) -> str:
+    value = str(value)
+    return _RESERVED_BY_UUID.get(value) or f"{prefix}_{value}"
+
+
+class PrefixedId(TypeDecorator):
+    """`<prefix>_<uuid>` ids in a native `uuid` column"""
+
+    impl = PG_UUID(as_uuid=False)
+    cache_ok = True
+
+    def __init__(self, prefix: str):
+        super().__init__()
+        self.prefix = prefix
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else id_to_uuid(str(value), self.prefix)
+
+    def process_literal_param(self, value, dialect):
+        return self.process_bind_param(value, dialect)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else uuid_to_id(value, self.prefix)
+
+
+def prefixed_id(prefix: str) -> Any:
+    """Primary key of a table whose ids start with `prefix`"""
+    return Field(default=None, primary_key=True, sa_type=PrefixedId(prefix))
+
+
+def foreign_id(foreign_key: str, prefix: str, **kwargs) -> Any:
+    """Reference to `foreign_key`, a `prefixed_id(prefix)` column"""
+    return Field(foreign_key=foreign_key, sa_type=PrefixedId(prefix), **kwargs)
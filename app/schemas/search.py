@@ -0,0 +1,48 @@
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlmodel import Field, SQLModel
+
+from .base import Status
+
+
+class HomeworkSearchResult(SQLModel):
+    """A homework matching a search, best matches first"""
+
+    id: str
+    created_at: datetime
+    status: Status
+    teacher_id: str
+    title: Optional[str] = None
+    content: Dict = Field(default_factory=dict)
+    rank: float
+
+
+class SubmissionSearchResult(SQLModel):
+    """A submission matching by its text or its homework's title"""
+
+    id: str
+    created_at: datetime
+    status: Status
+    student_id: str
+    teacher_id: str
+    homework_task_id: str
+    homework_title: Optional[str] = None
+    homework_content: Dict = Field(default_factory=dict)
+    content: Dict = Field(default_factory=dict)
+    rank: float
+
+
+class FeedbackSearchResult(SQLModel):
+    """A feedback item matching by its text or its homework's title"""
+
+    id: str
+    created_at: datetime
+    submission_id: str
+    student_id: str
+    teacher_id: str
+    homework_task_id: str
+    homework_title: Optional[str] = None
+    score: Optional[int] = None
+    content: Dict = Field(default_factory=dict)
+    rank: float
@@ -1,16 +1,76 @@
-from typing import ClassVar
+from datetime import datetime
+from typing import ClassVar, Optional
 
-from sqlmodel import Field, SQLModel
+from sqlalchemy import Index
+from sqlmodel import SQLModel
 
-from .base import SequenceItemBase
+from .base import (
+    PARTITION_BY_MONTH,
+    PARTITIONED_MAPPER_ARGS,
+    SequenceItemBase,
+    change_sequence,
+    partition_key,
+    search_vector,
+)
+from .ids import foreign_id, prefixed_id
 
 
 class Submission(SequenceItemBase, table=True):
     id_prefix: ClassVar[str] = "sub"
+    id: str = prefixed_id(id_prefix)
+    created_at: datetime = partition_key()
+    __table_args__ = (
+        Index(
+            "ix_submission_student_id_created_at_id", "student_id", "created_at", "id"
+        ),
+        Index(
+            "ix_submission_teacher_id_created_at_id", "teacher_id", "created_at", "id"
+        ),
+        # Status-filtered lists (e.g. a teacher's pending submissions)
+        Index(
+            "ix_submission_student_id_status_created_at_id",
+            "student_id",
+            "status",
+            "created_at",
+            "id",
+        ),
+        Index(
+            "ix_submission_teacher_id_status_created_at_id",
+            "teacher_id",
+            "status",
+            "created_at",
+            "id",
+        ),
+        # A student's submission for a homework, status answered from the index
+        Index(
+            "ix_submission_homework_task_id_student_id",
+            "homework_task_id",
+            "student_id",
+            postgresql_include=["status"],
+        ),
+        # Changes since a `GET /sync` cursor
+        Index("ix_submission_student_id_change_seq", "student_id", "change_seq"),
+        Index("ix_submission_teacher_id_change_seq", "teacher_id", "change_seq"),
+        # Incremental analytics export, past its `(updated_at, id)` watermark
+        Index("ix_submission_updated_at_id", "updated_at", "id"),
+        PARTITION_BY_MONTH,
+    )
+    # Eager, for `change_seq` to be read back rather than expired on update
+    __mapper_args__ = {**PARTITIONED_MAPPER_ARGS, "eager_defaults": True}
 
-    student_id: str = Field(foreign_key="user.id")
-    teacher_id: str = Field(foreign_key="user.id")
-    homework_task_id: str = Field(foreign_key="homeworktask.id")
+    change_seq: Optional[int] = change_sequence()
+
+    student_id: str = foreign_id("user.id", "usr")
+    teacher_id: str = foreign_id("user.id", "usr")
+    homework_task_id: str = foreign_id("homeworktask.id", "hw")
 
     class Config:
         from_attributes = True
+
+
+# Full-text search over the submitted text
+Index(
+    "ix_submission_search",
+    search_vector(Submission.content, "text"),
+    postgresql_using="gin",
+)
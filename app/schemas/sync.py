@@ -0,0 +1,42 @@
+from typing import List, Type
+
+from pydantic import BaseModel, create_model
+from sqlmodel import SQLModel
+
+from .feedback import Feedback
+from .homework import HomeworkTask
+from .submission import Submission
+
+
+def with_change_seq(model: Type[SQLModel]) -> Type[BaseModel]:
+    """`model`'s fields, and the `change_seq` other responses leave out
+
+    Table models can't be subclassed into response models, so the fields are
+    copied: the rows of `GET /sync` are the tables' plain rows.
+    """
+    fields = {
+        name: (field.annotation, ... if field.is_required() else None)
+        for name, field in model.model_fields.items()
+        if not field.exclude
+    }
+    return create_model(
+        f"Synced{model.__name__}",
+        __doc__=f"{model.__name__} row, with the `change_seq` of its last change",
+        change_seq=(int, ...),
+        **fields,
+    )
+
+
+SyncedHomeworkTask = with_change_seq(HomeworkTask)
+SyncedSubmission = with_change_seq(Submission)
+SyncedFeedback = with_change_seq(Feedback)
+
+
+class SyncResult(SQLModel):
+    """Rows changed since a `GET /sync` cursor, and the cursor to pass next"""
+
+    homework: List[SyncedHomeworkTask]
+    submissions: List[SyncedSubmission]
+    feedback: List[SyncedFeedback]
+    cursor: int
+    has_more: bool
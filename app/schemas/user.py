@@ -1,10 +1,11 @@
 from enum import Enum
-from typing import ClassVar, Dict, Optional
+from typing import ClassVar, Dict, List, Optional
 
-from sqlalchemy import JSON
+from sqlalchemy import JSON, Index
 from sqlmodel import Field, SQLModel
 
 from .base import TimeStampedModel
+from .ids import prefixed_id
 
 
 class UserRole(str, Enum):
@@ -14,6 +15,12 @@ class UserRole(str, Enum):
 
 class User(TimeStampedModel, table=True):
     id_prefix: ClassVar[str] = "usr"
+    id: str = prefixed_id(id_prefix)
+    __table_args__ = (
+        # Keyset pagination of /users/, /users/students/ and /users/teachers/
+        Index("ix_user_created_at_id", "created_at", "id"),
+        Index("ix_user_role_created_at_id", "role", "created_at", "id"),
+    )
 
     tg_handle: str = Field(unique=True, index=True)
     telegram_id: str = Field(unique=True, index=True)  # Numeric Telegram ID
@@ -23,3 +30,38 @@ class User(TimeStampedModel, table=True):
 
     class Config:
         from_attributes = True
+
+
+class UserUpsert(SQLModel):
+    """Body of `PUT /users/by_telegram_id/{telegram_id}`"""
+
+    tg_handle: str
+    role: UserRole
+    # Left as is on an existing user when omitted
+    meta: Optional[Dict] = None
+
+
+class UserUpsertResult(TimeStampedModel):
+    tg_handle: str
+    telegram_id: str
+    role: UserRole
+    meta: Dict
+    # Whether the user was inserted rather than updated
+    created: bool
+
+
+class UserImportConflict(SQLModel):
+    line: int
+    tg_handle: str
+    telegram_id: str
+
+
+class UserImportError(SQLModel):
+    line: int
+    detail: str
+
+
+class UserImportResult(SQLModel):
+    imported: int
+    conflicts: List[UserImportConflict] = Field(default_factory=list)
+    errors: List[UserImportError] = Field(default_factory=list)
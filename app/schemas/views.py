@@ -0,0 +1,113 @@
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy import Column, Computed, Index, Text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlmodel import Field, SQLModel
+
+from .base import Status
+from .ids import PrefixedId, foreign_id
+
+PREVIEW_LENGTH = 100
+
+
+class PendingSubmissionView(SQLModel):
+    """A submission waiting for the teacher's feedback, joined for display"""
+
+    id: str
+    created_at: datetime
+    status: Status
+    student_id: str
+    student_handle: str
+    homework_task_id: str
+    homework_title: str
+    content: Dict = Field(default_factory=dict)
+    submission_preview: Optional[str] = None
+
+
+class FeedbackView(SQLModel):
+    """A feedback item with its submission, homework and people, joined"""
+
+    id: str
+    created_at: datetime
+    submission_id: str
+    homework_task_id: str
+    homework_title: str
+    student_id: str
+    student_handle: str
+    teacher_id: str
+    teacher_handle: str
+    submission_preview: Optional[str] = None
+    feedback_preview: Optional[str] = None
+    score: Optional[int] = None
+
+
+class StudentHomeworkView(SQLModel):
+    """A homework assigned to a student, with its teacher and the student's
+    progress on it"""
+
+    id: str
+    created_at: datetime
+    status: Status
+    homework_title: str
+    teacher_id: str
+    teacher_handle: str
+    teacher_telegram_id: str
+    assignment_status: Status
+    submitted_at: Optional[datetime] = None
+
+
+# Read tables, materialized at write time: the endpoints that change their
+# sources update them in the same transaction, and
+# `python -m app.db.read_tables rebuild` recomputes them from scratch
+
+
+class TeacherInbox(PendingSubmissionView, table=True):
+    """`PendingSubmissionView` rows, one per submission awaiting feedback"""
+
+    __tablename__ = "teacher_inbox"
+    __table_args__ = (
+        Index(
+            "ix_teacher_inbox_teacher_id_created_at_id",
+            "teacher_id",
+            "created_at",
+            "id",
+        ),
+    )
+
+    # The submission's. Not a foreign key, as `submission` is partitioned
+    id: str = Field(default=None, primary_key=True, sa_type=PrefixedId("sub"))
+    created_at: datetime = Field(nullable=False)
+    status: Status = Field(default=Status.PENDING)
+    teacher_id: str = foreign_id("user.id", "usr")
+    student_id: str = foreign_id("user.id", "usr")
+    homework_task_id: str = foreign_id("homeworktask.id", "hw")
+    content: Dict = Field(default_factory=dict, sa_type=JSONB)
+    submission_preview: Optional[str] = Field(
+        default=None,
+        sa_column=Column(
+            Text,
+            Computed(f"left(content ->> 'text', {PREVIEW_LENGTH})", persisted=True),
+        ),
+    )
+
+
+class StudentDashboard(StudentHomeworkView, table=True):
+    """`StudentHomeworkView` rows, one per homework assignment"""
+
+    __tablename__ = "student_dashboard"
+    __table_args__ = (
+        Index(
+            "ix_student_dashboard_student_id_created_at_id",
+            "student_id",
+            "created_at",
+            "id",
+        ),
+    )
+
+    student_id: str = foreign_id("user.id", "usr", primary_key=True)
+    # The homework's
+    id: str = foreign_id("homeworktask.id", "hw", primary_key=True)
+    created_at: datetime = Field(nullable=False)
+    teacher_id: str = foreign_id("user.id", "usr")
+    assignment_status: Status = Field(default=Status.PENDING)
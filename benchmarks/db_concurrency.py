@@ -0,0 +1,180 @@
+"""
+Compare the async database path with the old thread-pool path.
+
+Two servers answer the same `GET /users/by_telegram_id/{telegram_id}` lookup:
+1. `sync` - a plain `def` endpoint on a psycopg2 `Session`, run by Starlette's
+   thread pool (how every endpoint worked before the async port)
+2. `async` - the real API (`app.main:app`) on the asyncpg `AsyncSession`
+
+Each server runs in its own uvicorn process so the load generator does not
+compete with it for the GIL. For each concurrency level the script reports
+requests/sec and p50/p99 latency.
+
+Usage:
+    python -m benchmarks.db_concurrency --concurrency 50 200 1000 --requests 5000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from typing import Iterator, List
+
+import httpx
+from fastapi import Depends, FastAPI, HTTPException, status
+from sqlmodel import Session, SQLModel, select
+
+from app.db.base import get_engine
+from app.schemas.user import User, UserRole
+
+USER_COUNT = 1000
+TELEGRAM_ID_PREFIX = "bench_"
+
+
+def get_sync_db() -> Iterator[Session]:
+    with Session(get_engine()) as session:
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+
+
+sync_app = FastAPI(title="LangFlow sync benchmark")
+
+
+@sync_app.get("/users/by_telegram_id/{telegram_id}", response_model=User)
+def get_user_by_telegram_id(telegram_id: str, db: Session = Depends(get_sync_db)):
+    user = db.exec(select(User).where(User.telegram_id == telegram_id)).first()
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+        )
+    return user
+
+
+def seed_users() -> List[str]:
+    telegram_ids = [f"{TELEGRAM_ID_PREFIX}{i}" for i in range(USER_COUNT)]
+    SQLModel.metadata.create_all(get_engine())
+    with Session(get_engine()) as session:
+        existing = set(
+            session.exec(
+                select(User.telegram_id).where(User.telegram_id.in_(telegram_ids))
+            ).all()
+        )
+        for telegram_id in telegram_ids:
+            if telegram_id not in existing:
+                session.add(
+                    User(
+                        tg_handle=f"handle_{telegram_id}",
+                        telegram_id=telegram_id,
+                        role=UserRole.STUDENT,
+                    )
+                )
+        session.commit()
+    return telegram_ids
+
+
+def start_server(target: str, port: int) -> subprocess.Popen:
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", target, "--port", str(port)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        env=os.environ.copy(),
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/docs", timeout=1.0)
+            return process
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"Server {target} did not start on port {port}")
+
+
+async def run_load(
+    base_url: str, telegram_ids: List[str], concurrency: int, total_requests: int
+) -> dict:
+    latencies: List[float] = []
+    errors = 0
+    remaining = iter(range(total_requests))
+
+    limits = httpx.Limits(
+        max_connections=concurrency, max_keepalive_connections=concurrency
+    )
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=60.0
+    ) as client:
+
+        async def worker():
+            nonlocal errors
+            for _ in remaining:
+                telegram_id = random.choice(telegram_ids)
+                start = time.perf_counter()
+                try:
+                    response = await client.get(f"/users/by_telegram_id/{telegram_id}")
+                    response.raise_for_status()
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "rps": total_requests / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--port", type=int, default=8100)
+    args = parser.parse_args()
+
+    telegram_ids = seed_users()
+    servers = {
+        "sync": "benchmarks.db_concurrency:sync_app",
+        "async": "app.main:app",
+    }
+
+    print(
+        f"{'path':<6} {'clients':>8} {'req/s':>10} {'p50 ms':>10} {'p99 ms':>10} {'errors':>7}"
+    )
+    for offset, (name, target) in enumerate(servers.items()):
+        port = args.port + offset
+        process = start_server(target, port)
+        try:
+            for concurrency in args.concurrency:
+                result = asyncio.run(
+                    run_load(
+                        f"http://127.0.0.1:{port}",
+                        telegram_ids,
+                        concurrency,
+                        args.requests,
+                    )
+                )
+                print(
+                    f"{name:<6} {concurrency:>8} {result['rps']:>10.1f} "
+                    f"{result['p50_ms']:>10.1f} {result['p99_ms']:>10.1f} "
+                    f"{result['errors']:>7}"
+                )
+        finally:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
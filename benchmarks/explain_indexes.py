@@ -0,0 +1,280 @@
+"""
+Check that every hot API query is answered from an index.
+
+For each endpoint query shape the script runs `EXPLAIN (FORMAT JSON)` and
+asserts that the plan uses the index designed for it, and that no table is
+read with a sequential scan. Sequential scans are disabled for the
+session, because on a small or empty database the planner rightly prefers
+them. So this checks that the index *can* serve the query, not what the
+planner picks for the current data volume.
+
+Exits non-zero if any query misses its index, so it can run in CI after
+`alembic upgrade head`.
+
+Usage:
+    python -m benchmarks.explain_indexes
+"""
+
+import sys
+from datetime import datetime
+from typing import Dict, Iterator, List, NamedTuple
+
+from sqlalchemy.dialects import postgresql
+from sqlmodel import Session, select
+
+from app.api.endpoints.views import (
+    feedback_view_query,
+    student_dashboard_query,
+    teacher_inbox_query,
+)
+from app.api.pagination import encode_cursor, paginate
+from app.db.base import get_engine
+from app.schemas.base import Status
+from app.schemas.feedback import Feedback
+from app.schemas.homework import HomeworkAssignment, HomeworkTask
+from app.schemas.submission import Submission
+from app.schemas.user import User, UserRole
+from app.schemas.views import StudentDashboard, TeacherInbox
+
+LIMIT = 100
+CURSOR = encode_cursor(datetime(2025, 1, 1), "item_00000000")
+
+
+class QueryCheck(NamedTuple):
+    name: str
+    query: object
+    index: str
+
+
+def query_checks() -> List[QueryCheck]:
+    """Query shapes issued by the endpoints, with the index each should use"""
+    student_homework = (
+        select(HomeworkTask)
+        .join(HomeworkAssignment, HomeworkAssignment.homework_id == HomeworkTask.id)
+        .where(HomeworkAssignment.student_id == "usr_student")
+    )
+    return [
+        QueryCheck(
+            "GET /users/by_telegram_id/{telegram_id}",
+            select(User).where(User.telegram_id == "123456789"),
+            "ix_user_telegram_id",
+        ),
+        QueryCheck(
+            "GET /users/?role=",
+            paginate(
+                select(User).where(User.role == UserRole.STUDENT), User, CURSOR, LIMIT
+            ),
+            "ix_user_role_created_at_id",
+        ),
+        QueryCheck(
+            "GET /homework/student/{student_id}",
+            paginate(student_homework, HomeworkTask, None, LIMIT),
+            "ix_homework_assignment_student_id",
+        ),
+        QueryCheck(
+            "GET /homework/teacher/{teacher_id}",
+            paginate(
+                select(HomeworkTask).where(HomeworkTask.teacher_id == "usr_teacher"),
+                HomeworkTask,
+                CURSOR,
+                LIMIT,
+            ),
+            "ix_homeworktask_teacher_id_created_at_id",
+        ),
+        QueryCheck(
+            "GET /homework/teacher/{teacher_id}?homework_status=",
+            paginate(
+                select(HomeworkTask).where(
+                    HomeworkTask.teacher_id == "usr_teacher",
+                    HomeworkTask.status == Status.PENDING,
+                ),
+                HomeworkTask,
+                CURSOR,
+                LIMIT,
+            ),
+            "ix_homeworktask_teacher_id_status_created_at_id",
+        ),
+        QueryCheck(
+            "GET /submissions/student/{student_id}",
+            paginate(
+                select(Submission).where(Submission.student_id == "usr_student"),
+                Submission,
+                CURSOR,
+                LIMIT,
+            ),
+            "ix_submission_student_id_created_at_id",
+        ),
+        QueryCheck(
+            "GET /submissions/student/{student_id}?submission_status=",
+            paginate(
+                select(Submission).where(
+                    Submission.student_id == "usr_student",
+                    Submission.status == Status.COMPLETED,
+                ),
+                Submission,
+                CURSOR,
+                LIMIT,
+            ),
+            "ix_submission_student_id_status_created_at_id",
+        ),
+        QueryCheck(
+            "GET /submissions/teacher/{teacher_id}",
+            paginate(
+                select(Submission).where(Submission.teacher_id == "usr_teacher"),
+                Submission,
+                CURSOR,
+                LIMIT,
+            ),
+            "ix_submission_teacher_id_created_at_id",
+        ),
+        QueryCheck(
+            "GET /submissions/teacher/{teacher_id}?submission_status=",
+            paginate(
+                select(Submission).where(
+                    Submission.teacher_id == "usr_teacher",
+                    Submission.status == Status.PENDING,
+                ),
+                Submission,
+                CURSOR,
+                LIMIT,
+            ),
+            "ix_submission_teacher_id_status_created_at_id",
+        ),
+        QueryCheck(
+            "submission of a student for a homework",
+            select(Submission.status).where(
+                Submission.homework_task_id == "hw_homework",
+                Submission.student_id == "usr_student",
+            ),
+            "ix_submission_homework_task_id_student_id",
+        ),
+        QueryCheck(
+            "GET /feedback/submission/{submission_id}",
+            paginate(
+                select(Feedback).where(Feedback.submission_id == "sub_submission"),
+                Feedback,
+                CURSOR,
+                LIMIT,
+            ),
+            "ix_feedback_submission_id_created_at_id",
+        ),
+        QueryCheck(
+            "GET /feedback/submission/{submission_id}?submission_status=",
+            paginate(
+                select(Feedback).where(
+                    Feedback.submission_id == "sub_submission",
+                    Feedback.status == Status.COMPLETED,
+                ),
+                Feedback,
+                CURSOR,
+                LIMIT,
+            ),
+            "ix_feedback_submission_id_status_created_at_id",
+        ),
+        QueryCheck(
+            "POST /users/analysis/{user_id} feedback",
+            select(Feedback).where(Feedback.student_id == "usr_student"),
+            # Unordered, so the narrowest index on `student_id` does
+            "ix_feedback_student_id_change_seq",
+        ),
+        QueryCheck(
+            "GET /views/teacher/{teacher_id}/pending",
+            paginate(teacher_inbox_query("usr_teacher"), TeacherInbox, CURSOR, LIMIT),
+            "ix_teacher_inbox_teacher_id_created_at_id",
+        ),
+        QueryCheck(
+            "GET /views/student/{student_id}/homework",
+            paginate(
+                student_dashboard_query("usr_student"), StudentDashboard, CURSOR, LIMIT
+            ),
+            "ix_student_dashboard_student_id_created_at_id",
+        ),
+        QueryCheck(
+            "GET /views/teacher/{teacher_id}/feedback",
+            paginate(
+                feedback_view_query().where(Feedback.teacher_id == "usr_teacher"),
+                Feedback,
+                CURSOR,
+                LIMIT,
+            ),
+            "ix_feedback_teacher_id_created_at_id",
+        ),
+        QueryCheck(
+            "GET /views/student/{student_id}/feedback",
+            paginate(
+                feedback_view_query().where(Feedback.student_id == "usr_student"),
+                Feedback,
+                CURSOR,
+                LIMIT,
+            ),
+            "ix_feedback_student_id_created_at_id",
+        ),
+    ]
+
+
+def walk(plan: dict) -> Iterator[dict]:
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from walk(child)
+
+
+def explain(session: Session, query) -> dict:
+    sql = str(
+        query.compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+        )
+    )
+    result = session.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}")
+    return result.scalar()[0]["Plan"]
+
+
+def parent_indexes(session: Session) -> Dict[str, str]:
+    """Name of the index each partition's index is attached to
+
+    Plans on a partitioned table name the indexes of its partitions, e.g.
+    `submission_2025_01_student_id_created_at_id_idx` for
+    `ix_submission_student_id_created_at_id`.
+    """
+    rows = session.connection().exec_driver_sql(
+        "SELECT child.relname, parent.relname FROM pg_inherits "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+        "WHERE child.relkind = 'i'"
+    )
+    return dict(rows.all())
+
+
+def main() -> int:
+    failures = 0
+    with Session(get_engine()) as session:
+        session.connection().exec_driver_sql("SET LOCAL enable_seqscan = off")
+        parents = parent_indexes(session)
+        for check in query_checks():
+            nodes = list(walk(explain(session, check.query)))
+            indexes = {
+                parents.get(node.get("Index Name"), node.get("Index Name"))
+                for node in nodes
+            }
+            seq_scans = [
+                node["Relation Name"]
+                for node in nodes
+                if node["Node Type"] == "Seq Scan"
+            ]
+
+            if check.index in indexes and not seq_scans:
+                print(f"ok    {check.name}: {check.index}")
+                continue
+
+            failures += 1
+            used = ", ".join(sorted(name for name in indexes if name)) or "none"
+            print(f"FAIL  {check.name}: expected {check.index}, used {used}")
+            for relation in seq_scans:
+                print(f"      sequential scan on {relation}")
+        session.rollback()
+
+    print(f"\n{len(query_checks()) - failures} ok, {failures} failed")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""
+Insert throughput and index size of the primary key schemes.
+
+Each scheme fills its own table, shaped like `submission` (an id primary key,
+an indexed reference to a parent row, a timestamp), with the same number of
+rows:
+1. `text` - `sub_<uuid4>` strings, how ids were stored before
+2. `uuid4` - the same random UUIDs in a native `uuid` column
+3. `uuid7` - time-ordered UUIDs in a native `uuid` column, the current scheme
+
+Rows go in with COPY, in batches, so the timings are dominated by heap and
+index writes rather than by the client. Random keys land all over the
+primary key index, so once it outgrows memory every batch touches pages
+across the whole index. Time-ordered keys append to its right edge. The
+script reports rows/sec over the whole load and for the last batch, and the
+table and index sizes.
+
+Tables live in a scratch schema, dropped at the end unless `--keep`.
+
+Usage:
+    python -m benchmarks.id_keys --rows 10000000 --batch 100000
+"""
+
+import argparse
+import io
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+from uuid import uuid4
+
+from sqlalchemy import text
+
+from app.db.base import get_engine
+from app.schemas.ids import uuid7
+
+SCHEMA = "id_benchmark"
+PARENT_COUNT = 10000
+
+SCHEMES: Dict[str, Dict] = {
+    "text": {"type": "varchar", "parent": "usr_{}", "id": "sub_{}", "new": uuid4},
+    "uuid4": {"type": "uuid", "parent": "{}", "id": "{}", "new": uuid4},
+    "uuid7": {"type": "uuid", "parent": "{}", "id": "{}", "new": uuid7},
+}
+
+
+def create_table(connection, name: str, type_: str):
+    connection.execute(
+        text(
+            f"CREATE TABLE {SCHEMA}.{name} ("
+            f"id {type_} PRIMARY KEY, parent_id {type_} NOT NULL, "
+            "created_at timestamp NOT NULL)"
+        )
+    )
+    connection.execute(
+        text(f"CREATE INDEX ix_{name}_parent_id ON {SCHEMA}.{name} (parent_id)")
+    )
+
+
+def make_batch(
+    count: int, id_format: str, new: Callable, parents: List[str], start: datetime
+) -> io.StringIO:
+    buffer = io.StringIO()
+    for offset in range(count):
+        buffer.write(
+            f"{id_format.format(new())}\t{random.choice(parents)}\t"
+            f"{start + timedelta(microseconds=offset)}\n"
+        )
+    buffer.seek(0)
+    return buffer
+
+
+def load(name: str, scheme: Dict, rows: int, batch: int) -> Dict:
+    engine = get_engine()
+    with engine.begin() as connection:
+        create_table(connection, name, scheme["type"])
+
+    parents = [scheme["parent"].format(scheme["new"]()) for _ in range(PARENT_COUNT)]
+    raw = engine.raw_connection()
+    total = last = 0.0
+    try:
+        cursor = raw.cursor()
+        for start in range(0, rows, batch):
+            count = min(batch, rows - start)
+            buffer = make_batch(
+                count, scheme["id"], scheme["new"], parents, datetime.utcnow()
+            )
+            began = time.perf_counter()
+            cursor.copy_expert(
+                f"COPY {SCHEMA}.{name} (id, parent_id, created_at) FROM STDIN", buffer
+            )
+            raw.commit()
+            last = time.perf_counter() - began
+            total += last
+    finally:
+        raw.close()
+
+    with engine.connect() as connection:
+        sizes = connection.execute(
+            text(
+                "SELECT pg_relation_size(:table), pg_relation_size(:pkey), "
+                "pg_relation_size(:parent)"
+            ),
+            {
+                "table": f"{SCHEMA}.{name}",
+                "pkey": f"{SCHEMA}.{name}_pkey",
+                "parent": f"{SCHEMA}.ix_{name}_parent_id",
+            },
+        ).one()
+    return {
+        "rps": rows / total,
+        "last_rps": min(batch, rows) / last,
+        "table": sizes[0],
+        "pkey": sizes[1],
+        "parent": sizes[2],
+    }
+
+
+def mb(size: int) -> str:
+    return f"{size / 2**20:.1f}MB"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--batch", type=int, default=100_000)
+    parser.add_argument(
+        "--schemes", nargs="+", choices=list(SCHEMES), default=list(SCHEMES)
+    )
+    parser.add_argument("--keep", action="store_true", help="keep the tables")
+    args = parser.parse_args()
+
+    engine = get_engine()
+    with engine.begin() as connection:
+        connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        connection.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+
+    print(
+        f"{'scheme':<6} {'rows/s':>10} {'last rows/s':>12} {'table':>10} "
+        f"{'pkey':>10} {'parent ix':>10}"
+    )
+    try:
+        for name in args.schemes:
+            result = load(name, SCHEMES[name], args.rows, args.batch)
+            print(
+                f"{name:<6} {result['rps']:>10.0f} {result['last_rps']:>12.0f} "
+                f"{mb(result['table']):>10} {mb(result['pkey']):>10} "
+                f"{mb(result['parent']):>10}"
+            )
+    finally:
+        if not args.keep:
+            with engine.begin() as connection:
+                connection.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+CPU per request of the validated response path vs `serialization.fast_json`.
+
+Two in-process routes return the same page of homework rows (built in memory,
+so the database is out of the picture):
+1. `validated` - `response_model=List[HomeworkTaskWithStudents]`, i.e. how the
+   list endpoints worked before: every row is re-validated by pydantic, then
+   encoded with `json.dumps`
+2. `fast` - the same route returning `fast_json(...)`
+
+Each route is measured without compression and with gzip (and brotli when
+installed). The script reports process CPU time per request and body size.
+
+Usage:
+    python -m benchmarks.serialization --rows 100 --content-size 4000 --requests 300
+"""
+
+import argparse
+import time
+from datetime import datetime
+from typing import List
+
+from fastapi import FastAPI, Request, Response
+from fastapi.testclient import TestClient
+
+from app.api.serialization import brotli, fast_json
+from app.schemas.homework import HomeworkTaskWithStudents
+
+
+def make_rows(count: int, content_size: int) -> List[HomeworkTaskWithStudents]:
+    words = ("lorem ipsum dolor sit amet " * (content_size // 27 + 1))[:content_size]
+    return [
+        HomeworkTaskWithStudents(
+            id=f"hw_{i}",
+            created_at=datetime.utcnow(),
+            teacher_id="usr_teacher",
+            content={
+                "title": f"Homework {i}",
+                "description": words,
+                "exercises": [{"n": n, "text": words[:200]} for n in range(5)],
+            },
+            student_ids=[f"usr_student_{n}" for n in range(20)],
+        )
+        for i in range(count)
+    ]
+
+
+def make_app(rows: List[HomeworkTaskWithStudents]) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/validated", response_model=List[HomeworkTaskWithStudents])
+    async def validated():
+        return rows
+
+    @app.get("/fast", response_model=List[HomeworkTaskWithStudents])
+    async def fast(request: Request, response: Response):
+        return fast_json(request, response, rows)
+
+    return app
+
+
+def measure(client: TestClient, path: str, encoding: str, requests: int):
+    headers = {"Accept-Encoding": encoding}
+    response = client.get(path, headers=headers)  # warm up
+    size = int(response.headers["content-length"])
+
+    start = time.process_time()
+    for _ in range(requests):
+        client.get(path, headers=headers)
+    return (time.process_time() - start) / requests, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--content-size", type=int, default=4000)
+    parser.add_argument("--requests", type=int, default=300)
+    args = parser.parse_args()
+
+    client = TestClient(make_app(make_rows(args.rows, args.content_size)))
+    encodings = ["identity", "gzip"] + (["br"] if brotli else [])
+
+    print(f"{'path':<10} {'encoding':<9} {'cpu/request':>12} {'body':>10}")
+    for path in ("validated", "fast"):
+        for encoding in encodings:
+            # The validated path has no compression of its own
+            if path == "validated" and encoding != "identity":
+                continue
+            cpu, size = measure(client, f"/{path}", encoding, args.requests)
+            print(f"{path:<10} {encoding:<9} {cpu * 1000:>10.2f}ms {size:>9}B")
+
+
+if __name__ == "__main__":
+    main()
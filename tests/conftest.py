@@ -1,18 +1,31 @@
 import asyncio
+from functools import partial
 from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 import pytest_asyncio
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
 from sqlmodel import Session, SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
 from telegram import Chat, Update
 from telegram import User as TelegramUser
 from telegram.ext import ContextTypes
 
+from app.api.user_cache import user_cache
 from app.bot.client import APIClient
 from app.core.config import settings
-from app.db.base import get_db
+from app.db.base import (
+    get_async_database_url,
+    get_db,
+    get_primary_read_db,
+    get_read_db,
+    get_read_session_factory,
+    get_session_factory,
+)
 from app.main import app
 from app.queue.consumer import TelegramConsumer
 from app.queue.producer import NotificationProducer
@@ -42,20 +55,65 @@ def session(db_engine):
     connection.close()
 
 
-@pytest.fixture(scope="function")
-def client(session):
-    """Create FastAPI test client"""
+@pytest.fixture(scope="session")
+def async_db_engine(db_engine):
+    """Create async test database engine"""
+    return create_async_engine(
+        get_async_database_url(settings.TEST_DATABASE_URL), poolclass=NullPool
+    )
 
-    def override_get_db():
-        try:
-            yield session
-        finally:
-            session.close()
 
-    app.dependency_overrides[get_db] = override_get_db
+@pytest.fixture(scope="function")
+def client(async_db_engine):
+    """Create FastAPI test client"""
     with TestClient(app) as test_client:
+        # asyncpg connections are bound to the loop the app runs on
+        portal = test_client.portal
+        connection = portal.call(async_db_engine.connect)
+        transaction = portal.call(connection.begin)
+
+        async def override_get_db():
+            async with AsyncSession(
+                bind=connection,
+                expire_on_commit=False,
+                join_transaction_mode="create_savepoint",
+            ) as session:
+                yield session
+                await session.commit()
+
+        session_factory = partial(
+            AsyncSession,
+            bind=connection,
+            expire_on_commit=False,
+            join_transaction_mode="create_savepoint",
+        )
+        # Reads share the test transaction too, to see the rows written in it
+        app.dependency_overrides[get_db] = override_get_db
+        app.dependency_overrides[get_read_db] = override_get_db
+        app.dependency_overrides[get_primary_read_db] = override_get_db
+        app.dependency_overrides[get_session_factory] = lambda: session_factory
+        app.dependency_overrides[get_read_session_factory] = lambda: session_factory
         yield test_client
-    app.dependency_overrides.clear()
+        app.dependency_overrides.clear()
+        # Cached users would outlive the rolled back transaction
+        user_cache.clear()
+
+        portal.call(transaction.rollback)
+        portal.call(connection.close)
+
+
+@pytest.fixture
+def statements():
+    """SQL statements run from here on, bar the test transaction's savepoints"""
+    executed = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        if not statement.startswith(("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO")):
+            executed.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", before_cursor_execute)
+    yield executed
+    event.remove(Engine, "before_cursor_execute", before_cursor_execute)
 
 
 # Queue Fixtures
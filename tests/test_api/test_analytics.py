@@ -0,0 +1,157 @@
+"""
+These tests cover:
+1. Parquet export with flattened, typed content columns
+2. Incremental runs from the watermark
+3. One run at a time per directory
+"""
+
+from datetime import timedelta
+
+import pytest
+
+from app.db import analytics_export
+
+pa_dataset = pytest.importorskip("pyarrow.dataset")
+
+
+@pytest.fixture
+def export_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(analytics_export, "WATERMARK_LAG", timedelta(0))
+    monkeypatch.setattr(
+        analytics_export,
+        "settings",
+        analytics_export.settings.model_copy(
+            update={"ANALYTICS_EXPORT_DIR": str(tmp_path)}
+        ),
+    )
+    return tmp_path
+
+
+def create_user(client, handle, telegram_id, role):
+    response = client.post(
+        "/users/",
+        json={"tg_handle": handle, "telegram_id": telegram_id, "role": role},
+    )
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+def read_table(export_dir, table):
+    return (
+        pa_dataset.dataset(export_dir / table, format="parquet", partitioning="hive")
+        .to_table()
+        .to_pylist()
+    )
+
+
+def test_analytics_export(client, export_dir):
+    # Given
+    teacher_id = create_user(client, "analytics_teacher1", "616161611", "teacher")
+    student_id = create_user(client, "analytics_student1", "161616161", "student")
+    homework_id = client.post(
+        "/homework/assign/",
+        json={
+            "teacher_id": teacher_id,
+            "student_ids": [student_id],
+            "content": {
+                "title": "Past tenses",
+                "topic": "Grammar",
+                "language_level": "B1",
+                "description": "Write about your weekend",
+            },
+        },
+    ).json()["id"]
+    submission_id = client.post(
+        "/submissions/",
+        json={
+            "homework_task_id": homework_id,
+            "student_id": student_id,
+            "teacher_id": teacher_id,
+            "content": {"text": "I went hiking"},
+        },
+    ).json()["id"]
+    client.post(
+        "/feedback/",
+        json={
+            "submission_id": submission_id,
+            "teacher_id": teacher_id,
+            "student_id": student_id,
+            "content": {"text": "Nice", "score": 87},
+        },
+    )
+
+    # When
+    response = client.post("/analytics/export")
+
+    # Then
+    assert response.status_code == 200, response.text
+    rows = {table["table"]: table["rows"] for table in response.json()["tables"]}
+    assert rows["homework"] >= 1 and rows["feedback"] >= 1
+
+    homework = next(
+        row for row in read_table(export_dir, "homework") if row["id"] == homework_id
+    )
+    assert homework["title"] == "Past tenses"
+    assert homework["topic"] == "Grammar"
+    assert homework["language_level"] == "B1"
+    assert homework["assigned_count"] == 1
+    assert homework["created_date"] == homework["created_at"].date().isoformat()
+
+    feedback = next(
+        row
+        for row in read_table(export_dir, "feedback")
+        if row["submission_id"] == submission_id
+    )
+    assert feedback["score"] == 87
+    assert feedback["status"] == "pending"
+    assert (export_dir / "_watermarks.json").exists()
+
+
+def test_analytics_export_incremental(client, export_dir):
+    # Given
+    teacher_id = create_user(client, "analytics_teacher2", "616161612", "teacher")
+    homework_id = client.post(
+        "/homework/assign/",
+        json={"teacher_id": teacher_id, "student_ids": [], "content": {}},
+    ).json()["id"]
+    client.post("/analytics/export")
+
+    # When
+    unchanged = client.post("/analytics/export").json()
+    client.patch(f"/homework/{homework_id}/status", params={"status": "completed"})
+    changed = client.post("/analytics/export").json()
+
+    # Then
+    assert all(table["rows"] == 0 for table in unchanged["tables"])
+    homework = next(
+        table for table in changed["tables"] if table["table"] == "homework"
+    )
+    assert homework["rows"] == 1
+    versions = [
+        row["status"]
+        for row in read_table(export_dir, "homework")
+        if row["id"] == homework_id
+    ]
+    assert sorted(versions) == ["completed", "pending"]
+
+
+def test_analytics_export_one_run_at_a_time(client, export_dir):
+    # Given a run in progress
+    teacher_id = create_user(client, "analytics_teacher3", "616161613", "teacher")
+    client.post(
+        "/homework/assign/",
+        json={"teacher_id": teacher_id, "student_ids": [], "content": {}},
+    )
+    with analytics_export.export_lock(str(export_dir)):
+        # When
+        overlapping = client.post("/analytics/export")
+
+    # Then
+    assert overlapping.status_code == 409
+    assert not (export_dir / "_watermarks.json").exists()
+
+    # And once it's done, the next run goes ahead
+    assert client.post("/analytics/export").status_code == 200
+    assert sorted(path.name for path in export_dir.glob("_watermarks.json*")) == [
+        "_watermarks.json"
+    ]
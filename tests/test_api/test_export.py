@@ -0,0 +1,114 @@
+"""
+These tests cover:
+1. Teacher and student NDJSON exports
+2. Role checks on the exported user
+"""
+
+import json
+
+from app.api.endpoints import export
+
+
+def create_user(client, handle, telegram_id, role):
+    response = client.post(
+        "/users/",
+        json={"tg_handle": handle, "telegram_id": telegram_id, "role": role},
+    )
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+def create_history(client, teacher_id, student_id, count):
+    for i in range(count):
+        homework_id = client.post(
+            "/homework/assign/",
+            json={
+                "teacher_id": teacher_id,
+                "student_ids": [student_id],
+                "content": {"title": f"Export {i}", "description": "Export test"},
+            },
+        ).json()["id"]
+        submission_id = client.post(
+            "/submissions/",
+            json={
+                "homework_task_id": homework_id,
+                "student_id": student_id,
+                "teacher_id": teacher_id,
+                "content": {"text": f"Answer {i}"},
+            },
+        ).json()["id"]
+        client.post(
+            "/feedback/",
+            json={
+                "submission_id": submission_id,
+                "teacher_id": teacher_id,
+                "student_id": student_id,
+                "content": {"text": "Good", "score": i},
+            },
+        )
+
+
+def read_export(response):
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"] == "application/x-ndjson"
+    return [json.loads(line) for line in response.iter_lines() if line]
+
+
+def test_export_teacher(client, monkeypatch):
+    # Given
+    monkeypatch.setattr(export, "EXPORT_BATCH_SIZE", 2)
+    teacher_id = create_user(client, "export_teacher1", "515151511", "teacher")
+    student_id = create_user(client, "export_student1", "151515151", "student")
+    create_history(client, teacher_id, student_id, 3)
+
+    # When
+    with client.stream("GET", f"/export/teacher/{teacher_id}") as response:
+        lines = read_export(response)
+
+    # Then
+    assert [line["type"] for line in lines] == ["user"] + [
+        type
+        for type in ["homework", "assignment", "submission", "feedback"]
+        for _ in range(3)
+    ]
+    assert lines[0]["data"]["id"] == teacher_id
+    homework = [line["data"] for line in lines if line["type"] == "homework"]
+    assert [hw["content"]["title"] for hw in homework] == [
+        "Export 0",
+        "Export 1",
+        "Export 2",
+    ]
+    feedback = [line["data"] for line in lines if line["type"] == "feedback"]
+    assert [fb["content"]["score"] for fb in feedback] == [0, 1, 2]
+
+
+def test_export_student(client):
+    # Given
+    teacher_id = create_user(client, "export_teacher2", "515151512", "teacher")
+    student_id = create_user(client, "export_student2", "151515152", "student")
+    other_id = create_user(client, "export_student3", "151515153", "student")
+    create_history(client, teacher_id, student_id, 2)
+    create_history(client, teacher_id, other_id, 1)
+
+    # When
+    with client.stream("GET", f"/export/student/{student_id}") as response:
+        lines = read_export(response)
+
+    # Then
+    assert len(lines) == 1 + 4 * 2
+    assert all(
+        line["data"]["student_id"] == student_id
+        for line in lines
+        if line["type"] in ("assignment", "submission", "feedback")
+    )
+
+
+def test_export_wrong_role(client):
+    # Given
+    student_id = create_user(client, "export_student4", "151515154", "student")
+
+    # When
+    response = client.get(f"/export/teacher/{student_id}")
+
+    # Then
+    assert response.status_code == 404
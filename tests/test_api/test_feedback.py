@@ -1,6 +1,9 @@
+from datetime import datetime, timedelta
+
 import pytest
 
 from app.schemas.base import Status
+from app.schemas.ids import new_id
 
 
 def test_create_feedback(client):
@@ -301,3 +304,161 @@ def test_feedback_status_filter(client):
     assert response.status_code == 200
     data = response.json()
     assert all(feedback["status"] == "completed" for feedback in data)
+
+
+def test_homework_completed_after_all_students_graded(client):
+    # Given
+    teacher_id = client.post(
+        "/users/",
+        json={
+            "tg_handle": "feedback_teacher_counts",
+            "telegram_id": "121212121",
+            "role": "teacher",
+            "meta": {},
+        },
+    ).json()["id"]
+    student_ids = [
+        client.post(
+            "/users/",
+            json={
+                "tg_handle": f"feedback_student_counts_{i}",
+                "telegram_id": f"21212121{i}",
+                "role": "student",
+                "meta": {},
+            },
+        ).json()["id"]
+        for i in range(2)
+    ]
+    homework_response = client.post(
+        "/homework/assign/",
+        json={
+            "teacher_id": teacher_id,
+            "student_ids": student_ids,
+            "content": {"title": "Counted Homework", "description": "Count me"},
+        },
+    )
+    assert homework_response.status_code == 200, homework_response.text
+    homework_id = homework_response.json()["id"]
+
+    def submit_and_grade(student_id):
+        submission_id = client.post(
+            "/submissions/",
+            json={
+                "homework_task_id": homework_id,
+                "student_id": student_id,
+                "teacher_id": teacher_id,
+                "content": {"text": "My answer"},
+            },
+        ).json()["id"]
+        response = client.post(
+            "/feedback/",
+            json={
+                "submission_id": submission_id,
+                "teacher_id": teacher_id,
+                "student_id": student_id,
+                "content": {"text": "Graded"},
+            },
+        )
+        assert response.status_code == 200, response.text
+
+    # When - The first student is graded twice, the second not yet
+    submit_and_grade(student_ids[0])
+    submit_and_grade(student_ids[0])
+
+    # Then
+    assert client.get(f"/homework/{homework_id}").json()["status"] == "pending"
+
+    # When - The last student is graded
+    submit_and_grade(student_ids[1])
+
+    # Then
+    assert client.get(f"/homework/{homework_id}").json()["status"] == "completed"
+
+
+def test_submission_feedback_score_filter_and_sort(client):
+    # Given
+    teacher_id = client.post(
+        "/users/",
+        json={
+            "tg_handle": "feedback_teacher9",
+            "telegram_id": "333444699",
+            "role": "teacher",
+        },
+    ).json()["id"]
+    student_id = client.post(
+        "/users/",
+        json={
+            "tg_handle": "feedback_student9",
+            "telegram_id": "666444399",
+            "role": "student",
+        },
+    ).json()["id"]
+    homework_id = client.post(
+        "/homework/assign/",
+        json={
+            "teacher_id": teacher_id,
+            "student_ids": [student_id],
+            "content": {"title": "Scored Feedback Test", "description": "Scores"},
+        },
+    ).json()["id"]
+    submission_id = client.post(
+        "/submissions/",
+        json={
+            "homework_task_id": homework_id,
+            "student_id": student_id,
+            "teacher_id": teacher_id,
+            "content": {"text": "Test submission"},
+        },
+    ).json()["id"]
+    for score in [40, 95, "n/a", 70]:
+        response = client.post(
+            "/feedback/",
+            json={
+                "submission_id": submission_id,
+                "teacher_id": teacher_id,
+                "student_id": student_id,
+                "content": {"text": f"Scored {score}", "score": score},
+                # Generated from content, a client's value is ignored
+                "score": 1,
+            },
+        )
+        assert response.status_code == 200, response.text
+        assert response.json()["score"] == (score if score != "n/a" else None)
+    url = f"/feedback/submission/{submission_id}"
+
+    # When
+    passing = client.get(url, params={"min_score": 50, "sort": "-score"})
+    first_page = client.get(url, params={"sort": "score", "limit": 2})
+    second_page = client.get(
+        url,
+        params={
+            "sort": "score",
+            "limit": 2,
+            "cursor": first_page.headers["X-Next-Cursor"],
+        },
+    )
+
+    # Then
+    assert [feedback["score"] for feedback in passing.json()] == [95, 70]
+    assert [
+        feedback["score"] for feedback in first_page.json() + second_page.json()
+    ] == [40, 70, 95, None]
+
+
+def test_feedback_created_at_must_match_its_id(client):
+    # When the id was minted days after the given `created_at`
+    response = client.post(
+        "/feedback/",
+        json={
+            "id": new_id("fb"),
+            "created_at": (datetime.utcnow() - timedelta(days=3)).isoformat(),
+            "submission_id": new_id("sub"),
+            "teacher_id": new_id("usr"),
+            "student_id": new_id("usr"),
+            "content": {"text": "Good"},
+        },
+    )
+
+    # Then
+    assert response.status_code == 400
+    assert response.json()["detail"] == "created_at doesn't match the time in the id"
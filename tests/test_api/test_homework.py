@@ -1,3 +1,6 @@
+import asyncio
+from unittest.mock import patch
+
 import pytest
 
 from app.schemas.base import Status
@@ -201,6 +204,8 @@ def test_get_teacher_homework(client):
     data = response.json()
     assert len(data) == 3, f"Expected 3 homework assignments, got {len(data)}"
     assert all(hw["teacher_id"] == teacher_id for hw in data)
+    # Only `GET /sync` returns the change sequence
+    assert all("change_seq" not in hw for hw in data)
 
 
 def test_invalid_teacher_homework(client):
@@ -351,3 +356,433 @@ def test_get_student_homework_with_status(client):
     assert response.status_code == 200
     data = response.json()
     assert all(hw["status"] == "pending" for hw in data)
+
+
+def test_get_student_homework_only_assigned(client):
+    # Given
+    teacher_id = client.post(
+        "/users/",
+        json={
+            "tg_handle": "homework_teacher7",
+            "telegram_id": "999888777",
+            "role": "teacher",
+            "meta": {},
+        },
+    ).json()["id"]
+    student_ids = [
+        client.post(
+            "/users/",
+            json={
+                "tg_handle": f"homework_student7_{i}",
+                "telegram_id": f"77788899{7 + i}",
+                "role": "student",
+                "meta": {},
+            },
+        ).json()["id"]
+        for i in range(2)
+    ]
+
+    for student_id in student_ids:
+        response = client.post(
+            "/homework/assign/",
+            json={
+                "teacher_id": teacher_id,
+                "student_ids": [student_id],
+                "content": {"title": "Own Homework", "description": "Only mine"},
+            },
+        )
+        assert response.status_code == 200, response.text
+
+    # When
+    response = client.get(f"/homework/student/{student_ids[0]}")
+
+    # Then
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data) == 1
+    assert data[0]["student_ids"] == [student_ids[0]]
+
+
+def test_get_homework_batch(client):
+    # Given
+    teacher_id = client.post(
+        "/users/",
+        json={
+            "tg_handle": "homework_teacher8",
+            "telegram_id": "999888778",
+            "role": "teacher",
+            "meta": {},
+        },
+    ).json()["id"]
+    student_id = client.post(
+        "/users/",
+        json={
+            "tg_handle": "homework_student8",
+            "telegram_id": "777888998",
+            "role": "student",
+            "meta": {},
+        },
+    ).json()["id"]
+    homework_ids = [
+        client.post(
+            "/homework/assign/",
+            json={
+                "teacher_id": teacher_id,
+                "student_ids": [student_id],
+                "content": {"title": f"Batch {i}", "description": "Batched"},
+            },
+        ).json()["id"]
+        for i in range(2)
+    ]
+
+    # When
+    response = client.post("/homework/batch", json={"ids": homework_ids})
+
+    # Then
+    assert response.status_code == 200
+    data = response.json()
+    assert [hw["id"] for hw in data] == homework_ids
+    assert all(hw["student_ids"] == [student_id] for hw in data)
+
+
+def test_assign_homework_bulk(client):
+    # Given
+    teacher_id = client.post(
+        "/users/",
+        json={
+            "tg_handle": "homework_teacher9",
+            "telegram_id": "999888779",
+            "role": "teacher",
+            "meta": {},
+        },
+    ).json()["id"]
+    student_ids = [
+        client.post(
+            "/users/",
+            json={
+                "tg_handle": f"homework_student9_{i}",
+                "telegram_id": f"7778889{90 + i}",
+                "role": "student",
+                "meta": {},
+            },
+        ).json()["id"]
+        for i in range(3)
+    ]
+    tasks = [
+        {
+            "teacher_id": teacher_id,
+            "student_ids": student_ids,
+            "content": {"title": f"Week 1 day {day}", "description": "Bulk"},
+        }
+        for day in range(5)
+    ]
+
+    # When
+    with patch(
+        "app.api.endpoints.homework.notify_homework_assigned_batch"
+    ) as mock_notify:
+        response = client.post("/homework/assign/bulk", json={"tasks": tasks})
+
+    # Then
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert len(data) == 5
+    mock_notify.assert_called_once()
+    assert len(mock_notify.call_args[0][0]) == 15
+
+    student_homework = client.get(f"/homework/student/{student_ids[0]}").json()
+    assert {hw["id"] for hw in student_homework} == {hw["id"] for hw in data}
+
+
+def test_assign_homework_bulk_invalid_student(client):
+    # Given
+    teacher_id = client.post(
+        "/users/",
+        json={
+            "tg_handle": "homework_teacher10",
+            "telegram_id": "999888710",
+            "role": "teacher",
+            "meta": {},
+        },
+    ).json()["id"]
+    tasks = [
+        {
+            "teacher_id": teacher_id,
+            "student_ids": ["usr_missing"],
+            "content": {"title": "Never assigned", "description": "Bulk"},
+        }
+    ]
+
+    # When
+    response = client.post("/homework/assign/bulk", json={"tasks": tasks})
+
+    # Then
+    assert response.status_code == 400
+    assert "usr_missing" in response.json()["detail"]
+    assert client.get(f"/homework/teacher/{teacher_id}").json() == []
+
+
+def test_get_homework_etag(client):
+    # Given
+    teacher_id = client.post(
+        "/users/",
+        json={
+            "tg_handle": "homework_teacher11",
+            "telegram_id": "999888781",
+            "role": "teacher",
+            "meta": {},
+        },
+    ).json()["id"]
+    homework_id = client.post(
+        "/homework/assign/",
+        json={
+            "teacher_id": teacher_id,
+            "student_ids": [],
+            "content": {"title": "Cached", "description": "Revalidated"},
+        },
+    ).json()["id"]
+    etag = client.get(f"/homework/{homework_id}").headers["ETag"]
+
+    # When
+    unchanged = client.get(f"/homework/{homework_id}", headers={"If-None-Match": etag})
+    client.patch(f"/homework/{homework_id}/status", params={"status": "completed"})
+    changed = client.get(f"/homework/{homework_id}", headers={"If-None-Match": etag})
+
+    # Then
+    assert unchanged.status_code == 304
+    assert unchanged.headers["ETag"] == etag
+    assert unchanged.content == b""
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert changed.json()["status"] == "completed"
+
+
+def test_get_teacher_homework_summary(client):
+    # Given
+    teacher_id = client.post(
+        "/users/",
+        json={
+            "tg_handle": "homework_teacher12",
+            "telegram_id": "999888782",
+            "role": "teacher",
+            "meta": {},
+        },
+    ).json()["id"]
+    student_id = client.post(
+        "/users/",
+        json={
+            "tg_handle": "homework_student12",
+            "telegram_id": "777888902",
+            "role": "student",
+            "meta": {},
+        },
+    ).json()["id"]
+    for content in [
+        {"title": "Summarised", "description": "x" * 1000},
+        {"description": "No title"},
+    ]:
+        client.post(
+            "/homework/assign/",
+            json={
+                "teacher_id": teacher_id,
+                "student_ids": [student_id],
+                "content": content,
+            },
+        )
+
+    # When
+    summary = client.get(f"/homework/teacher/{teacher_id}", params={"view": "summary"})
+    sparse = client.get(
+        f"/homework/teacher/{teacher_id}",
+        params={"fields": "content.description", "limit": 1},
+    )
+
+    # Then
+    assert summary.status_code == 200
+    first, second = summary.json()
+    assert set(first) == {
+        "id",
+        "created_at",
+        "status",
+        "teacher_id",
+        "content",
+        "student_ids",
+    }
+    assert first["content"] == {"title": "Summarised"}
+    assert first["student_ids"] == [student_id]
+    assert second["content"] == {}
+
+    assert sparse.status_code == 200
+    assert sparse.json() == [
+        {
+            "id": first["id"],
+            "created_at": first["created_at"],
+            "content": {"description": "x" * 1000},
+        }
+    ]
+    assert "X-Next-Cursor" in sparse.headers
+
+
+@pytest.mark.parametrize(
+    "params",
+    [{"fields": "secret"}, {"fields": "status.title"}, {"view": "tiny"}],
+)
+def test_get_teacher_homework_invalid_fields(client, params):
+    # Given
+    teacher_id = client.post(
+        "/users/",
+        json={
+            "tg_handle": "homework_teacher13",
+            "telegram_id": "999888783",
+            "role": "teacher",
+            "meta": {},
+        },
+    ).json()["id"]
+
+    # When
+    response = client.get(f"/homework/teacher/{teacher_id}", params=params)
+
+    # Then
+    assert response.status_code == 400
+
+
+def test_get_teacher_homework_content_filters_and_sort(client):
+    # Given
+    teacher_id = client.post(
+        "/users/",
+        json={
+            "tg_handle": "homework_teacher14",
+            "telegram_id": "999888784",
+            "role": "teacher",
+            "meta": {},
+        },
+    ).json()["id"]
+    student_id = client.post(
+        "/users/",
+        json={
+            "tg_handle": "homework_student14",
+            "telegram_id": "777888914",
+            "role": "student",
+            "meta": {},
+        },
+    ).json()["id"]
+    for title, topic, level in [
+        ("Past tense", "Grammar", "B1"),
+        ("Irregular verbs", "Grammar", "A2"),
+        ("At the airport", "Vocabulary", "B1"),
+        (None, "Grammar", "B1"),
+    ]:
+        content = {"topic": topic, "language_level": level, "stress_level": "low"}
+        if title:
+            content["title"] = title
+        client.post(
+            "/homework/assign/",
+            json={
+                "teacher_id": teacher_id,
+                "student_ids": [student_id],
+                "content": content,
+            },
+        )
+    url = f"/homework/teacher/{teacher_id}"
+
+    # When
+    by_title = client.get(url, params={"title": "TENSE"})
+    by_topic = client.get(url, params={"topic": "Grammar", "language_level": "B1"})
+    by_content = client.get(url, params={"content": '{"stress_level": "low"}'})
+    first_page = client.get(url, params={"sort": "-title", "limit": 2})
+    second_page = client.get(
+        url,
+        params={
+            "sort": "-title",
+            "limit": 2,
+            "cursor": first_page.headers["X-Next-Cursor"],
+        },
+    )
+
+    # Then
+    assert [hw["content"]["title"] for hw in by_title.json()] == ["Past tense"]
+    assert len(by_topic.json()) == 2
+    assert len(by_content.json()) == 4
+    titles = [
+        hw["content"].get("title") for hw in first_page.json() + second_page.json()
+    ]
+    assert titles == ["Past tense", "Irregular verbs", "At the airport", None]
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"sort": "description"},
+        {"content": "[1, 2]"},
+        {"content": "{not json"},
+    ],
+)
+def test_get_teacher_homework_invalid_filters(client, params):
+    # Given
+    teacher_id = client.post(
+        "/users/",
+        json={
+            "tg_handle": "homework_teacher15",
+            "telegram_id": "999888785",
+            "role": "teacher",
+            "meta": {},
+        },
+    ).json()["id"]
+
+    # When
+    response = client.get(f"/homework/teacher/{teacher_id}", params=params)
+
+    # Then
+    assert response.status_code == 400
+
+
+def test_assign_homework_publishes_off_the_event_loop(client):
+    # Given
+    teacher_id = client.post(
+        "/users/",
+        json={
+            "tg_handle": "homework_teacher11",
+            "telegram_id": "9998887711",
+            "role": "teacher",
+            "meta": {},
+        },
+    ).json()["id"]
+    student_ids = [
+        client.post(
+            "/users/",
+            json={
+                "tg_handle": f"homework_student11_{i}",
+                "telegram_id": f"77788811{i}",
+                "role": "student",
+                "meta": {},
+            },
+        ).json()["id"]
+        for i in range(2)
+    ]
+    published = []
+
+    def publish(student_tg_id, homework_data):
+        # pika blocks, so there must be no event loop in this thread
+        try:
+            asyncio.get_running_loop()
+            published.append("on the loop")
+        except RuntimeError:
+            published.append(student_tg_id)
+        return True
+
+    # When
+    with patch(
+        "app.api.endpoints.homework.notify_homework_assigned", side_effect=publish
+    ):
+        response = client.post(
+            "/homework/assign/",
+            json={
+                "teacher_id": teacher_id,
+                "student_ids": student_ids,
+                "content": {"title": "Off the loop", "description": "Threaded"},
+            },
+        )
+
+    # Then every student is notified
+    assert response.status_code == 200, response.text
+    assert published == ["777888110", "777888111"]
@@ -0,0 +1,129 @@
+"""
+Statements run by each create endpoint. Validation is one query with joins,
+and rows come back from INSERT ... RETURNING rather than a refresh.
+"""
+
+from app.db.base import get_db
+from app.main import app
+from app.schemas.homework import HomeworkTask
+
+
+def fetch(client, model, id):
+    """Read a row in the test transaction, for columns the API doesn't return"""
+
+    async def get():
+        async for db in app.dependency_overrides[get_db]():
+            row = await db.get(model, id)
+        return row
+
+    return client.portal.call(get)
+
+
+def create_user(client, handle, role):
+    response = client.post(
+        "/users/",
+        json={"tg_handle": handle, "telegram_id": handle, "role": role, "meta": {}},
+    )
+    assert response.status_code == 200
+    return response.json()["id"]
+
+
+def test_create_endpoints_query_budget(client, statements):
+    # Given
+    teacher_id = create_user(client, "budget_teacher", "teacher")
+    student_id = create_user(client, "budget_student", "student")
+
+    # When
+    statements.clear()
+    response = client.post(
+        "/users/",
+        json={
+            "tg_handle": "budget_other",
+            "telegram_id": "budget_other",
+            "role": "student",
+            "meta": {},
+        },
+    )
+
+    # Then
+    assert response.status_code == 200
+    assert len(statements) == 1
+
+    # When
+    statements.clear()
+    response = client.post(
+        "/homework/assign/",
+        json={
+            "teacher_id": teacher_id,
+            "student_ids": [student_id],
+            "content": {"title": "Budget", "description": "Count the queries"},
+        },
+    )
+
+    # Then
+    assert response.status_code == 200
+    assert len(statements) == 3  # users, homework, assignments
+    homework_id = response.json()["id"]
+
+    # When
+    statements.clear()
+    response = client.post(
+        "/submissions/",
+        json={
+            "homework_task_id": homework_id,
+            "student_id": student_id,
+            "teacher_id": teacher_id,
+            "content": {"text": "Done"},
+        },
+    )
+
+    # Then
+    assert response.status_code == 200
+    assert len(statements) == 2
+    submission_id = response.json()["id"]
+
+    # When
+    statements.clear()
+    response = client.post(
+        "/feedback/",
+        json={
+            "submission_id": submission_id,
+            "teacher_id": teacher_id,
+            "student_id": student_id,
+            "content": {"text": "Well done", "score": 90},
+        },
+    )
+
+    # Then
+    assert response.status_code == 200
+    assert len(statements) == 2
+    assert response.json()["score"] == 90
+
+
+def test_create_submission_updates_counters(client):
+    # Given
+    teacher_id = create_user(client, "counter_teacher", "teacher")
+    student_id = create_user(client, "counter_student", "student")
+    homework_id = client.post(
+        "/homework/assign/",
+        json={
+            "teacher_id": teacher_id,
+            "student_ids": [student_id],
+            "content": {"title": "Counters", "description": "Submit twice"},
+        },
+    ).json()["id"]
+    submission = {
+        "homework_task_id": homework_id,
+        "student_id": student_id,
+        "teacher_id": teacher_id,
+        "content": {"text": "Done"},
+    }
+
+    # When
+    first = client.post("/submissions/", json=submission)
+    second = client.post("/submissions/", json=submission)
+
+    # Then
+    assert first.status_code == second.status_code == 200
+    assert first.json()["id"] != second.json()["id"]
+    assert fetch(client, HomeworkTask, homework_id).submitted_count == 1
@@ -0,0 +1,150 @@
+"""
+These tests cover:
+1. Homework search by title and description, scoped to a student
+2. Submission and feedback search by text and homework title
+3. Scope validation
+
+The test database has no pg_trgm, so titles match by substring here.
+"""
+
+import pytest
+
+
+def create_user(client, handle, telegram_id, role):
+    response = client.post(
+        "/users/",
+        json={"tg_handle": handle, "telegram_id": telegram_id, "role": role},
+    )
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+def assign(client, teacher_id, student_id, title, description):
+    response = client.post(
+        "/homework/assign/",
+        json={
+            "teacher_id": teacher_id,
+            "student_ids": [student_id],
+            "content": {"title": title, "description": description},
+        },
+    )
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+def submit(client, teacher_id, student_id, homework_id, text):
+    response = client.post(
+        "/submissions/",
+        json={
+            "homework_task_id": homework_id,
+            "student_id": student_id,
+            "teacher_id": teacher_id,
+            "content": {"text": text},
+        },
+    )
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+@pytest.fixture
+def people(client):
+    return (
+        create_user(client, "search_teacher", "414141411", "teacher"),
+        create_user(client, "search_student", "141414141", "student"),
+        create_user(client, "search_other", "141414142", "student"),
+    )
+
+
+def test_search_homework(client, people):
+    # Given
+    teacher_id, student_id, other_id = people
+    tense_id = assign(client, teacher_id, student_id, "Past tense", "Write a story")
+    airport_id = assign(
+        client, teacher_id, student_id, "Travel", "Describe airports and flights"
+    )
+    assign(client, teacher_id, other_id, "Past tense again", "Not yours")
+
+    # When
+    by_title = client.get(
+        "/search/homework", params={"student_id": student_id, "q": "TENSE"}
+    )
+    by_text = client.get(
+        "/search/homework", params={"student_id": student_id, "q": "airport"}
+    )
+    by_teacher = client.get(
+        "/search/homework", params={"teacher_id": teacher_id, "q": "past tense"}
+    )
+
+    # Then
+    assert by_title.status_code == 200
+    assert [row["id"] for row in by_title.json()] == [tense_id]
+    assert by_title.json()[0]["title"] == "Past tense"
+    assert by_title.json()[0]["rank"] > 0
+    assert [row["id"] for row in by_text.json()] == [airport_id]
+    assert len(by_teacher.json()) == 2
+
+
+def test_search_submissions_and_feedback(client, people):
+    # Given
+    teacher_id, student_id, _ = people
+    tense_id = assign(client, teacher_id, student_id, "Past tense", "Write a story")
+    travel_id = assign(client, teacher_id, student_id, "Travel", "Plan a trip")
+    graded_id = submit(
+        client, teacher_id, student_id, tense_id, "Yesterday I walked home"
+    )
+    pending_id = submit(
+        client, teacher_id, student_id, travel_id, "We flew to Lisbon by plane"
+    )
+    client.post(
+        "/feedback/",
+        json={
+            "submission_id": graded_id,
+            "teacher_id": teacher_id,
+            "student_id": student_id,
+            "content": {"text": "Great use of irregular verbs", "score": 90},
+        },
+    )
+
+    # When
+    by_title = client.get(
+        "/search/submissions", params={"student_id": student_id, "q": "past tense"}
+    )
+    by_text = client.get(
+        "/search/submissions", params={"student_id": student_id, "q": "planes"}
+    )
+    pending = client.get(
+        "/search/submissions",
+        params={
+            "student_id": student_id,
+            "q": "tense",
+            "submission_status": "pending",
+        },
+    )
+    feedback = client.get(
+        "/search/feedback", params={"teacher_id": teacher_id, "q": "verb"}
+    )
+
+    # Then
+    assert [row["id"] for row in by_title.json()] == [graded_id]
+    assert by_title.json()[0]["homework_content"]["description"] == "Write a story"
+    assert [row["id"] for row in by_text.json()] == [pending_id]
+    assert pending.json() == []
+    assert [row["homework_title"] for row in feedback.json()] == ["Past tense"]
+    assert feedback.json()[0]["score"] == 90
+
+
+@pytest.mark.parametrize(
+    "params, status_code",
+    [
+        ({"q": "x"}, 400),
+        ({"q": "x", "student_id": "usr_a", "teacher_id": "usr_b"}, 400),
+        ({"q": "x", "student_id": "usr_missing"}, 404),
+        ({"student_id": "usr_missing"}, 422),
+    ],
+)
+def test_search_scope(client, params, status_code):
+    # When
+    response = client.get("/search/homework", params=params)
+
+    # Then
+    assert response.status_code == status_code
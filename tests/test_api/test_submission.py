@@ -6,11 +6,15 @@
 5. Status filtering
 6. Pagination
 7. Error cases
+8. Lookups bounded to a submission's partition
 """
 
+from datetime import datetime, timedelta
+
 import pytest
 
 from app.schemas.base import Status
+from app.schemas.ids import id_time, new_id
 
 
 def test_create_submission(client):
@@ -299,3 +303,112 @@ def test_submission_pagination(client):
     assert response.status_code == 200
     data = response.json()
     assert len(data) <= 2
+
+
+def test_submission_found_in_its_partition(client):
+    # Given
+    teacher_id = client.post(
+        "/users/",
+        json={
+            "tg_handle": "partition_teacher",
+            "telegram_id": "880011",
+            "role": "teacher",
+            "meta": {},
+        },
+    ).json()["id"]
+    student_id = client.post(
+        "/users/",
+        json={
+            "tg_handle": "partition_student",
+            "telegram_id": "880022",
+            "role": "student",
+            "meta": {},
+        },
+    ).json()["id"]
+    homework_id = client.post(
+        "/homework/assign/",
+        json={
+            "teacher_id": teacher_id,
+            "student_ids": [student_id],
+            "content": {"title": "Partitions", "description": "Find it by id"},
+        },
+    ).json()["id"]
+    response = client.post(
+        "/submissions/",
+        json={
+            "homework_task_id": homework_id,
+            "student_id": student_id,
+            "teacher_id": teacher_id,
+            "content": {"text": "Bounded by its id"},
+        },
+    )
+    assert response.status_code == 200
+    submission_id = response.json()["id"]
+    created_at = datetime.fromisoformat(response.json()["created_at"])
+
+    # When
+    by_id = client.get(f"/submissions/{submission_id}")
+    batch = client.post("/submissions/batch", json={"ids": [submission_id]})
+    feedback = client.get(f"/feedback/submission/{submission_id}")
+    listed = client.get(f"/submissions/student/{student_id}")
+
+    # Then
+    assert created_at - id_time(submission_id) < timedelta(milliseconds=1)
+    assert by_id.status_code == 200
+    assert by_id.json()["id"] == submission_id
+    assert [row["id"] for row in batch.json()] == [submission_id]
+    assert feedback.status_code == 200
+    assert feedback.json() == []
+    assert [row["id"] for row in listed.json()] == [submission_id]
+    # Only `GET /sync` returns the change sequence
+    assert "change_seq" not in listed.json()[0]
+    assert "change_seq" not in by_id.json()
+
+
+def test_submission_created_at_must_match_its_id(client):
+    # Given
+    teacher_id = client.post(
+        "/users/",
+        json={
+            "tg_handle": "id_time_teacher",
+            "telegram_id": "880033",
+            "role": "teacher",
+            "meta": {},
+        },
+    ).json()["id"]
+    student_id = client.post(
+        "/users/",
+        json={
+            "tg_handle": "id_time_student",
+            "telegram_id": "880044",
+            "role": "student",
+            "meta": {},
+        },
+    ).json()["id"]
+    homework_id = client.post(
+        "/homework/assign/",
+        json={
+            "teacher_id": teacher_id,
+            "student_ids": [student_id],
+            "content": {"title": "Id time", "description": "Client-made ids"},
+        },
+    ).json()["id"]
+    created_at = datetime.utcnow() - timedelta(days=3)
+    submission = {
+        "homework_task_id": homework_id,
+        "student_id": student_id,
+        "teacher_id": teacher_id,
+        "content": {"text": "Made offline"},
+        "created_at": created_at.isoformat(),
+    }
+
+    # When the id was minted days after `created_at`
+    mismatched = client.post("/submissions/", json={**submission, "id": new_id("sub")})
+    # And when it was minted at `created_at`
+    submission_id = new_id("sub", created_at)
+    matching = client.post("/submissions/", json={**submission, "id": submission_id})
+
+    # Then only the second is taken, and is found by its id
+    assert mismatched.status_code == 400
+    assert matching.status_code == 200, matching.text
+    assert client.get(f"/submissions/{submission_id}").status_code == 200
@@ -0,0 +1,208 @@
+"""
+These tests cover:
+1. Changes of a teacher's and a student's rows since a cursor
+2. Paging through changes with `limit`
+3. Recently changed rows holding the cursor back, including past values
+   that may still commit
+4. Scope checks
+5. `change_seq` in the documented response
+"""
+
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from app.api.endpoints import sync
+
+
+@pytest.fixture
+def no_lag(monkeypatch):
+    monkeypatch.setattr(sync, "SYNC_LAG", timedelta(0))
+
+
+def create_user(client, handle, telegram_id, role):
+    response = client.post(
+        "/users/",
+        json={"tg_handle": handle, "telegram_id": telegram_id, "role": role},
+    )
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+def assign(client, teacher_id, student_id, title):
+    response = client.post(
+        "/homework/assign/",
+        json={
+            "teacher_id": teacher_id,
+            "student_ids": [student_id],
+            "content": {"title": title, "description": "Sync test"},
+        },
+    )
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+def submit(client, teacher_id, student_id, homework_id):
+    response = client.post(
+        "/submissions/",
+        json={
+            "homework_task_id": homework_id,
+            "student_id": student_id,
+            "teacher_id": teacher_id,
+            "content": {"text": "Answer"},
+        },
+    )
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+def ids(rows):
+    return [row["id"] for row in rows]
+
+
+def test_sync_since_cursor(client, no_lag):
+    # Given
+    teacher_id = create_user(client, "sync_teacher1", "414141411", "teacher")
+    student_id = create_user(client, "sync_student1", "141414141", "student")
+    other_id = create_user(client, "sync_student2", "141414142", "student")
+    homework_id = assign(client, teacher_id, student_id, "Synced HW")
+    assign(client, teacher_id, other_id, "Other HW")
+    submission_id = submit(client, teacher_id, student_id, homework_id)
+
+    # When
+    first = client.get("/sync", params={"scope": f"student:{student_id}"})
+
+    # Then
+    assert first.status_code == 200, first.text
+    data = first.json()
+    assert ids(data["homework"]) == [homework_id]
+    assert ids(data["submissions"]) == [submission_id]
+    assert data["feedback"] == []
+    assert data["has_more"] is False
+    cursor = data["cursor"]
+    assert cursor == max(
+        row["change_seq"] for row in data["homework"] + data["submissions"]
+    )
+
+    # Nothing changed since
+    unchanged = client.get(
+        "/sync", params={"scope": f"student:{student_id}", "since": cursor}
+    ).json()
+    assert unchanged["homework"] == unchanged["submissions"] == []
+    assert unchanged["cursor"] == cursor
+
+    # When the teacher grades the submission
+    feedback_response = client.post(
+        "/feedback/",
+        json={
+            "submission_id": submission_id,
+            "teacher_id": teacher_id,
+            "student_id": student_id,
+            "content": {"text": "Good"},
+        },
+    )
+    assert feedback_response.status_code == 200, feedback_response.text
+    changed = client.get(
+        "/sync", params={"scope": f"student:{student_id}", "since": cursor}
+    ).json()
+
+    # Then the feedback, the completed submission and the graded homework
+    assert ids(changed["feedback"]) == [feedback_response.json()["id"]]
+    assert ids(changed["submissions"]) == [submission_id]
+    assert changed["submissions"][0]["status"] == "completed"
+    assert ids(changed["homework"]) == [homework_id]
+    assert changed["homework"][0]["graded_count"] == 1
+    assert changed["cursor"] > cursor
+
+    # The teacher sees both students' rows
+    teacher = client.get("/sync", params={"scope": f"teacher:{teacher_id}"}).json()
+    assert len(teacher["homework"]) == 2
+    assert ids(teacher["feedback"]) == [feedback_response.json()["id"]]
+
+
+def test_sync_pages(client, no_lag):
+    # Given
+    teacher_id = create_user(client, "sync_teacher3", "434343431", "teacher")
+    student_id = create_user(client, "sync_student3", "343434341", "student")
+    homework_ids = [
+        assign(client, teacher_id, student_id, f"Paged HW {n}") for n in range(3)
+    ]
+
+    # When
+    seen, since, has_more = [], 0, True
+    while has_more:
+        page = client.get(
+            "/sync",
+            params={"scope": f"teacher:{teacher_id}", "since": since, "limit": 2},
+        ).json()
+        seen += ids(page["homework"])
+        since, has_more = page["cursor"], page["has_more"]
+
+    # Then
+    assert seen == homework_ids
+
+
+def test_sync_holds_cursor_for_recent_changes(client):
+    # Given
+    teacher_id = create_user(client, "sync_teacher4", "454545451", "teacher")
+    student_id = create_user(client, "sync_student4", "545454541", "student")
+    homework_id = assign(client, teacher_id, student_id, "Fresh HW")
+
+    # When
+    data = client.get("/sync", params={"scope": f"teacher:{teacher_id}"}).json()
+
+    # Then the row is returned, and comes again after the cursor
+    assert ids(data["homework"]) == [homework_id]
+    assert data["cursor"] < data["homework"][0]["change_seq"]
+    again = client.get(
+        "/sync", params={"scope": f"teacher:{teacher_id}", "since": data["cursor"]}
+    ).json()
+    assert ids(again["homework"]) == [homework_id]
+
+
+def test_cursor_stops_at_last_settled_row():
+    # Given seq 8 settled, 10 still in flight (not returned) and 11 recent
+    now, old = datetime.utcnow(), datetime.utcnow() - timedelta(hours=1)
+    rows = [
+        SimpleNamespace(change_seq=8, updated_at=old),
+        SimpleNamespace(change_seq=11, updated_at=now),
+    ]
+
+    # When
+    cursor = sync.next_cursor(5, [rows, [], []], limit=100)
+
+    # Then 10 is still ahead of the cursor once it commits
+    assert cursor == 8
+
+    # And without a settled row before the recent one, the cursor stays put
+    assert sync.next_cursor(5, [rows[1:], [], []], limit=100) == 5
+
+
+def test_sync_checks_scope(client):
+    # Given
+    student_id = create_user(client, "sync_student5", "565656561", "student")
+
+    # When / Then
+    assert client.get("/sync", params={"scope": "admin:1"}).status_code == 400
+    assert client.get("/sync", params={"scope": "teacher:"}).status_code == 400
+    assert (
+        client.get("/sync", params={"scope": f"teacher:{student_id}"}).status_code
+        == 404
+    )
+    assert (
+        client.get("/sync", params={"scope": f"student:{student_id}"}).status_code
+        == 200
+    )
+
+
+def test_sync_rows_declare_change_seq(client):
+    # When
+    schemas = client.get("/openapi.json").json()["components"]["schemas"]
+    result = schemas["SyncResult"]["properties"]
+
+    # Then every row type documents the field clients key on
+    for section in ("homework", "submissions", "feedback"):
+        row = result[section]["items"]["$ref"].rsplit("/", 1)[-1]
+        assert "change_seq" in schemas[row]["required"]
+        assert schemas[row]["properties"]["change_seq"]["type"] == "integer"
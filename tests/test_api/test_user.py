@@ -9,6 +9,9 @@ These tests cover:
 7. Edge cases with empty/invalid data
 """
 
+import json
+from unittest.mock import patch
+
 import pytest
 
 from app.schemas.user import UserRole
@@ -54,6 +57,31 @@ def test_get_user_by_telegram_id(client):
     assert data["role"] == user_data["role"]
 
 
+def test_get_user_by_telegram_id_cached(client):
+    # Given
+    user_data = {
+        "tg_handle": "cached_user",
+        "telegram_id": "555000111",
+        "role": "student",
+        "meta": {},
+    }
+    user_id = client.post("/users/", json=user_data).json()["id"]
+    client.get(f"/users/by_telegram_id/{user_data['telegram_id']}")
+
+    # When
+    with patch("app.api.user_cache.select") as select:
+        by_telegram_id = client.get(f"/users/by_telegram_id/{user_data['telegram_id']}")
+        by_handle = client.get(f"/users/by_telegram_handle/{user_data['tg_handle']}")
+        by_id = client.get(f"/users/{user_id}")
+
+    # Then
+    select.assert_not_called()
+    assert by_telegram_id.json()["id"] == user_id
+    assert by_handle.json()["id"] == user_id
+    assert by_id.json()["tg_handle"] == user_data["tg_handle"]
+    assert "user_cache_hits_total" in client.get("/metrics").text
+
+
 import pytest
 
 from app.schemas.user import UserRole
@@ -123,6 +151,72 @@ def test_duplicate_telegram_id(client):
     assert "already exists" in response.json()["detail"].lower()
 
 
+def test_upsert_user_by_telegram_id(client):
+    # When
+    created = client.put(
+        "/users/by_telegram_id/555000111",
+        json={"tg_handle": "upsert_user", "role": "student", "meta": {"lang": "en"}},
+    )
+
+    # Then
+    assert created.status_code == 201
+    user = created.json()
+    assert user["created"] is True
+    assert user["telegram_id"] == "555000111"
+    assert user["role"] == "student"
+
+    # Given
+    # Cache the user
+    assert client.get("/users/by_telegram_id/555000111").json()["role"] == "student"
+
+    # When
+    updated = client.put(
+        "/users/by_telegram_id/555000111",
+        json={"tg_handle": "upsert_renamed", "role": "teacher"},
+    )
+
+    # Then
+    assert updated.status_code == 200
+    assert updated.json()["created"] is False
+    assert updated.json()["id"] == user["id"]
+    assert updated.json()["tg_handle"] == "upsert_renamed"
+    assert updated.json()["meta"] == {"lang": "en"}  # kept when omitted
+    assert client.get("/users/by_telegram_id/555000111").json()["role"] == "teacher"
+    assert client.get("/users/by_telegram_handle/upsert_user").status_code == 404
+
+
+def test_upsert_user_unchanged_keeps_updated_at(client):
+    # Given
+    body = {"tg_handle": "upsert_same", "role": "student"}
+    first = client.put("/users/by_telegram_id/555000222", json=body).json()
+
+    # When
+    second = client.put("/users/by_telegram_id/555000222", json=body)
+
+    # Then
+    assert second.status_code == 200
+    assert second.json()["created"] is False
+    assert second.json()["updated_at"] == first["updated_at"]
+
+
+def test_upsert_user_handle_taken(client):
+    # Given
+    client.put(
+        "/users/by_telegram_id/555000333",
+        json={"tg_handle": "upsert_taken", "role": "student"},
+    )
+
+    # When
+    response = client.put(
+        "/users/by_telegram_id/555000444",
+        json={"tg_handle": "upsert_taken", "role": "student"},
+    )
+
+    # Then
+    assert response.status_code == 400
+    assert "taken" in response.json()["detail"]
+
+
 def test_get_all_teachers(client):
     # Given
     teacher_data = {
@@ -198,6 +292,101 @@ def test_get_users_pagination(client):
     assert len(data) <= 3  # Should respect the limit
 
 
+def test_get_users_cursor_pagination(client):
+    # Given
+    for i in range(5):
+        user_data = {
+            "tg_handle": f"cursor_user_{i}",
+            "telegram_id": f"66666{i}",
+            "role": "student",
+            "meta": {},
+        }
+        client.post("/users/", json=user_data)
+
+    # When - Follow cursors until the last page
+    seen = []
+    params = {"role": "student", "limit": 2}
+    while True:
+        response = client.get("/users/", params=params)
+        assert response.status_code == 200
+        seen.extend(user["id"] for user in response.json())
+        next_cursor = response.headers.get("X-Next-Cursor")
+        if not next_cursor:
+            break
+        params["cursor"] = next_cursor
+
+    # Then - Every user is returned exactly once
+    assert len(seen) == len(set(seen))
+    assert len(seen) == 5
+
+
+def test_get_students_etag(client):
+    # Given
+    for i in range(2):
+        client.post(
+            "/users/",
+            json={
+                "tg_handle": f"etag_student_{i}",
+                "telegram_id": f"44400{i}",
+                "role": "student",
+            },
+        )
+    first = client.get("/users/students/")
+    etag = first.headers["ETag"]
+
+    # When
+    unchanged = client.get("/users/students/", headers={"If-None-Match": etag})
+    client.post(
+        "/users/",
+        json={
+            "tg_handle": "etag_student_2",
+            "telegram_id": "444002",
+            "role": "student",
+        },
+    )
+    changed = client.get("/users/students/", headers={"If-None-Match": etag})
+
+    # Then
+    assert unchanged.status_code == 304
+    assert unchanged.content == b""
+    assert changed.status_code == 200
+    assert len(changed.json()) == len(first.json()) + 1
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "br"])
+def test_get_students_compressed(client, encoding):
+    # Given
+    for i in range(10):
+        client.post(
+            "/users/",
+            json={
+                "tg_handle": f"compressed_student_{i}",
+                "telegram_id": f"33300{i}",
+                "role": "student",
+                "meta": {"bio": "x" * 200},
+            },
+        )
+
+    # When
+    response = client.get("/users/students/", headers={"Accept-Encoding": encoding})
+    revalidated = client.get(
+        "/users/students/", headers={"If-None-Match": response.headers["ETag"]}
+    )
+
+    # Then
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == encoding
+    assert response.headers["ETag"].endswith(f'-{encoding}"')
+    assert len(response.json()) >= 10
+    assert response.json()[0]["meta"] == {"bio": "x" * 200}
+    assert revalidated.status_code == 304
+
+
+def test_get_users_invalid_cursor(client):
+    response = client.get("/users/", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+
 def test_empty_telegram_handle(client):
     # Given
     user_data = {
@@ -233,3 +422,103 @@ def test_valid_meta_json(client):
     assert response.status_code == 200
     data = response.json()
     assert data["meta"]["preferences"]["style"] == "contemporary"
+
+
+def test_get_users_batch(client):
+    # Given
+    user_ids = [
+        client.post(
+            "/users/",
+            json={
+                "tg_handle": f"batch_user_{i}",
+                "telegram_id": f"77777{i}",
+                "role": "student",
+                "meta": {},
+            },
+        ).json()["id"]
+        for i in range(3)
+    ]
+
+    # When - Request in a custom order, with a duplicate and an unknown id
+    requested = [user_ids[2], "usr_missing", user_ids[0], user_ids[2]]
+    response = client.post("/users/batch", json={"ids": requested})
+
+    # Then
+    assert response.status_code == 200
+    assert [user["id"] for user in response.json()] == [user_ids[2], user_ids[0]]
+
+
+def test_get_users_batch_too_large(client):
+    response = client.post(
+        "/users/batch", json={"ids": [f"usr_{i}" for i in range(501)]}
+    )
+    assert response.status_code == 422
+
+
+def test_import_users_csv(client):
+    # Given
+    client.post(
+        "/users/",
+        json={
+            "tg_handle": "import_existing",
+            "telegram_id": "880000",
+            "role": "student",
+        },
+    )
+    body = "\n".join(
+        [
+            "tg_handle,telegram_id,role,meta",
+            'import_user_1,880001,student,"{""level"": ""B1""}"',
+            "import_user_2,880002,Teacher,",
+            "import_existing,880003,student,",  # Handle already taken
+            "import_user_4,880001,student,",  # Telegram ID repeated in the file
+            "import_user_5,880005,admin,",  # Invalid role
+        ]
+    )
+
+    # When
+    response = client.post(
+        "/users/import", content=body, headers={"Content-Type": "text/csv"}
+    )
+
+    # Then
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert data["imported"] == 2
+    assert [conflict["line"] for conflict in data["conflicts"]] == [4, 5]
+    assert [error["line"] for error in data["errors"]] == [6]
+
+    imported = client.get("/users/by_telegram_id/880001").json()
+    assert imported["tg_handle"] == "import_user_1"
+    assert imported["meta"] == {"level": "B1"}
+    assert client.get("/users/by_telegram_id/880002").json()["role"] == "teacher"
+
+
+def test_import_users_ndjson(client):
+    # Given
+    body = "\n".join(
+        json.dumps(
+            {
+                "tg_handle": f"ndjson_user_{i}",
+                "telegram_id": f"89000{i}",
+                "role": "student",
+            }
+        )
+        for i in range(3)
+    )
+
+    # When
+    response = client.post(
+        "/users/import", content=body, headers={"Content-Type": "application/x-ndjson"}
+    )
+
+    # Then
+    assert response.status_code == 200, response.text
+    assert response.json() == {"imported": 3, "conflicts": [], "errors": []}
+
+
+def test_import_users_unsupported_format(client):
+    response = client.post(
+        "/users/import", content="{}", headers={"Content-Type": "application/json"}
+    )
+    assert response.status_code == 415
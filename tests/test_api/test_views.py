@@ -0,0 +1,191 @@
+"""
+These tests cover:
+1. Teacher's pending submissions view
+2. Student's and teacher's feedback timelines
+3. Role checks on the viewed user
+4. Student's homework list, kept up to date by the write endpoints
+5. Renamed handles reaching the materialized views
+"""
+
+
+def create_user(client, handle, telegram_id, role):
+    response = client.post(
+        "/users/",
+        json={"tg_handle": handle, "telegram_id": telegram_id, "role": role},
+    )
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+def create_submission(client, teacher_id, student_id, title):
+    homework_response = client.post(
+        "/homework/assign/",
+        json={
+            "teacher_id": teacher_id,
+            "student_ids": [student_id],
+            "content": {"title": title, "description": "View test"},
+        },
+    )
+    assert homework_response.status_code == 200, homework_response.text
+    submission_response = client.post(
+        "/submissions/",
+        json={
+            "homework_task_id": homework_response.json()["id"],
+            "student_id": student_id,
+            "teacher_id": teacher_id,
+            "content": {"text": "x" * 150},
+        },
+    )
+    assert submission_response.status_code == 200, submission_response.text
+    return submission_response.json()["id"]
+
+
+def test_teacher_pending_view(client):
+    # Given
+    teacher_id = create_user(client, "views_teacher1", "313131311", "teacher")
+    student_id = create_user(client, "views_student1", "131313131", "student")
+    pending_id = create_submission(client, teacher_id, student_id, "Pending HW")
+    graded_id = create_submission(client, teacher_id, student_id, "Graded HW")
+    client.post(
+        "/feedback/",
+        json={
+            "submission_id": graded_id,
+            "teacher_id": teacher_id,
+            "student_id": student_id,
+            "content": {"text": "Done"},
+        },
+    )
+
+    # When
+    response = client.get(f"/views/teacher/{teacher_id}/pending")
+
+    # Then
+    assert response.status_code == 200
+    data = response.json()
+    assert [row["id"] for row in data] == [pending_id]
+    assert data[0]["student_handle"] == "views_student1"
+    assert data[0]["homework_title"] == "Pending HW"
+    assert data[0]["submission_preview"] == "x" * 100
+    assert data[0]["content"]["text"] == "x" * 150
+
+
+def test_feedback_views(client):
+    # Given
+    teacher_id = create_user(client, "views_teacher2", "323232322", "teacher")
+    student_id = create_user(client, "views_student2", "232323232", "student")
+    submission_id = create_submission(client, teacher_id, student_id, "Scored HW")
+    feedback_response = client.post(
+        "/feedback/",
+        json={
+            "submission_id": submission_id,
+            "teacher_id": teacher_id,
+            "student_id": student_id,
+            "content": {"text": "Well done", "score": 87},
+        },
+    )
+    assert feedback_response.status_code == 200, feedback_response.text
+
+    # When
+    student_view = client.get(f"/views/student/{student_id}/feedback")
+    teacher_view = client.get(f"/views/teacher/{teacher_id}/feedback")
+
+    # Then
+    assert student_view.status_code == 200
+    assert teacher_view.status_code == 200
+    assert student_view.json() == teacher_view.json()
+    row = student_view.json()[0]
+    assert row["id"] == feedback_response.json()["id"]
+    assert row["homework_title"] == "Scored HW"
+    assert row["student_handle"] == "views_student2"
+    assert row["teacher_handle"] == "views_teacher2"
+    assert row["feedback_preview"] == "Well done"
+    assert row["score"] == 87
+
+
+def test_views_check_role(client):
+    # Given
+    student_id = create_user(client, "views_student3", "333333334", "student")
+
+    # When
+    response = client.get(f"/views/teacher/{student_id}/pending")
+
+    # Then
+    assert response.status_code == 404
+
+
+def test_student_homework_view(client):
+    # Given
+    teacher_id = create_user(client, "views_teacher4", "343434344", "teacher")
+    student_id = create_user(client, "views_student4", "434343434", "student")
+    create_submission(client, teacher_id, student_id, "Graded HW")
+    submission_id = client.get(f"/views/teacher/{teacher_id}/pending").json()[0]["id"]
+    assigned = client.post(
+        "/homework/assign/",
+        json={
+            "teacher_id": teacher_id,
+            "student_ids": [student_id],
+            "content": {"title": "Open HW", "description": "View test"},
+        },
+    ).json()
+
+    # When
+    feedback_response = client.post(
+        "/feedback/",
+        json={
+            "submission_id": submission_id,
+            "teacher_id": teacher_id,
+            "student_id": student_id,
+            "content": {"text": "Done"},
+        },
+    )
+    response = client.get(f"/views/student/{student_id}/homework")
+
+    # Then
+    assert feedback_response.status_code == 200, feedback_response.text
+    assert response.status_code == 200
+    graded, open_ = response.json()
+    assert graded["homework_title"] == "Graded HW"
+    assert graded["status"] == "completed"
+    assert graded["assignment_status"] == "completed"
+    assert graded["submitted_at"] is not None
+    assert graded["teacher_handle"] == "views_teacher4"
+    assert graded["teacher_telegram_id"] == "343434344"
+    assert open_["id"] == assigned["id"]
+    assert open_["status"] == "pending"
+    assert open_["assignment_status"] == "pending"
+    assert open_["submitted_at"] is None
+    assert client.get(f"/views/teacher/{teacher_id}/pending").json() == []
+
+    # When the homework is cancelled
+    client.patch(f"/homework/{assigned['id']}/status", params={"status": "cancelled"})
+
+    # Then
+    rows = client.get(f"/views/student/{student_id}/homework").json()
+    assert rows[1]["status"] == "cancelled"
+
+    # Unknown students and teachers are told apart from empty lists
+    assert client.get(f"/views/student/{teacher_id}/homework").status_code == 404
+
+
+def test_views_follow_renames(client):
+    # Given
+    teacher_id = create_user(client, "views_teacher5", "353535355", "teacher")
+    student_id = create_user(client, "views_student5", "535353535", "student")
+    create_submission(client, teacher_id, student_id, "Renamed HW")
+
+    # When
+    for handle, telegram_id, role in [
+        ("views_teacher5_new", "353535355", "teacher"),
+        ("views_student5_new", "535353535", "student"),
+    ]:
+        response = client.put(
+            f"/users/by_telegram_id/{telegram_id}",
+            json={"tg_handle": handle, "role": role},
+        )
+        assert response.status_code == 200, response.text
+
+    # Then
+    pending = client.get(f"/views/teacher/{teacher_id}/pending").json()
+    assert pending[0]["student_handle"] == "views_student5_new"
+    homework = client.get(f"/views/student/{student_id}/homework").json()
+    assert homework[0]["teacher_handle"] == "views_teacher5_new"
@@ -33,7 +33,7 @@ async def test_role_callback_student(mock_update, mock_context, mock_api_client)
     mock_update.callback_query.from_user = mock_update.effective_user
 
     # Mock API client response
-    mock_api_client.get_or_create_user.return_value = {
+    mock_api_client.upsert_user.return_value = {
         "role": "student",
         "tg_handle": "test_user",
     }
@@ -42,7 +42,7 @@ async def test_role_callback_student(mock_update, mock_context, mock_api_client)
     await handler.role_callback(mock_update, mock_context)
 
     # Then
-    mock_api_client.get_or_create_user.assert_called_once_with(
+    mock_api_client.upsert_user.assert_called_once_with(
         telegram_id="123456789", username="test_user", role="student"
     )
     mock_update.callback_query.edit_message_text.assert_called_once()
@@ -59,7 +59,7 @@ async def test_homework_list_student(mock_update, mock_context, mock_api_client)
     mock_api_client.get_homework_for_student.return_value = [
         {
             "id": "hw_1",
-            "content": {"title": "Test Homework"},
+            "homework_title": "Test Homework",
             "status": "pending",
             "teacher_handle": "test_teacher",
         }
@@ -110,7 +110,7 @@ async def test_start_submit_homework(mock_update, mock_context, mock_api_client)
     mock_api_client.get_homework_for_student.return_value = [
         {
             "id": "hw_1",
-            "content": {"title": "Test Homework"},
+            "homework_title": "Test Homework",
             "status": "pending",
             "teacher_handle": "test_teacher",  # Added this
             "teacher_telegram_id": "987654321",  # Added this
@@ -135,7 +135,7 @@ async def test_list_pending_feedback(mock_update, mock_context, mock_api_client)
         "id": "teacher_1",
         "role": "teacher",
     }
-    mock_api_client.get_teacher_submissions.return_value = [
+    mock_api_client.get_teacher_pending_submissions.return_value = [
         {
             "id": "sub_1",
             "student_handle": "test_student",
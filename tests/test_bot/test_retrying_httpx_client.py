@@ -0,0 +1,93 @@
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from app.bot.retrying_httpx_client import AsyncRetryingClient
+
+
+@pytest.mark.asyncio
+async def test_conditional_get_reuses_cached_response(httpx_mock):
+    students = [{"id": "usr_1", "tg_handle": "student"}]
+    httpx_mock.add_response(
+        url="http://test/users/students/", json=students, headers={"ETag": '"v1"'}
+    )
+    for _ in range(2):
+        httpx_mock.add_response(
+            url="http://test/users/students/",
+            status_code=304,
+            headers={"ETag": '"v1"'},
+            match_headers={"If-None-Match": '"v1"'},
+        )
+
+    async with AsyncRetryingClient(base_url="http://test", max_retries=1) as client:
+        first = await client.get("/users/students/")
+        # Callers may change what they got without touching the cache
+        first.json().append({"id": "usr_2"})
+        with patch("httpx._models.jsonlib.loads") as loads:
+            second = await client.get("/users/students/")
+            second.json()[0]["tg_handle"] = "changed"
+            third = await client.get("/users/students/")
+
+    # The 304s reuse the parsed payload
+    loads.assert_not_called()
+    assert second.status_code == 200
+    assert second.json() == students
+    assert third.json() == students
+
+
+@pytest.mark.asyncio
+async def test_conditional_get_takes_send_options(httpx_mock):
+    httpx_mock.add_response(
+        url="http://test/users/usr_1",
+        json={"id": "usr_1"},
+        match_headers={"Authorization": "Basic dXNlcjpwYXNz"},
+    )
+
+    async with AsyncRetryingClient(base_url="http://test", max_retries=1) as client:
+        response = await client.get(
+            "/users/usr_1", auth=httpx.BasicAuth("user", "pass"), follow_redirects=True
+        )
+
+    assert response.json() == {"id": "usr_1"}
+
+
+@pytest.mark.asyncio
+async def test_conditional_get_replaces_changed_response(httpx_mock):
+    httpx_mock.add_response(
+        url="http://test/homework/hw_1",
+        json={"status": "pending"},
+        headers={"ETag": '"v1"'},
+    )
+    httpx_mock.add_response(
+        url="http://test/homework/hw_1",
+        json={"status": "completed"},
+        headers={"ETag": '"v2"'},
+        match_headers={"If-None-Match": '"v1"'},
+    )
+
+    async with AsyncRetryingClient(base_url="http://test", max_retries=1) as client:
+        await client.get("/homework/hw_1")
+        response = await client.get("/homework/hw_1")
+
+    assert response.json() == {"status": "completed"}
+    assert client.validator_cache["http://test/homework/hw_1"][0] == '"v2"'
+
+
+@pytest.mark.asyncio
+async def test_validator_cache_is_bounded(httpx_mock):
+    for i in range(3):
+        httpx_mock.add_response(
+            url=f"http://test/users/usr_{i}", json={"id": i}, headers={"ETag": f'"{i}"'}
+        )
+
+    async with AsyncRetryingClient(
+        base_url="http://test", max_retries=1, validator_cache_size=2
+    ) as client:
+        for i in range(3):
+            await client.get(f"/users/usr_{i}")
+
+    assert list(client.validator_cache) == [
+        "http://test/users/usr_1",
+        "http://test/users/usr_2",
+    ]
@@ -0,0 +1,65 @@
+"""
+1. New ids are prefixed, time-ordered UUIDv7
+2. Ids are stored as bare UUIDs and read back prefixed
+3. Reserved and malformed ids
+"""
+
+import time
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlmodel import Session, select
+
+from app.schemas.ids import PrefixedId, hashed_uuid, uuid7
+from app.schemas.user import User, UserRole
+
+
+def test_uuid7_is_time_ordered():
+    # When
+    first = uuid7()
+    time.sleep(0.002)
+    second = uuid7()
+
+    # Then
+    assert first.version == 7
+    assert first.variant == "specified in RFC 4122"
+    assert first < second
+    assert abs((first.int >> 80) - time.time() * 1000) < 1000
+
+
+def test_id_stored_as_uuid(session: Session):
+    # Given
+    user = User(tg_handle="uuid_user", telegram_id="900100", role=UserRole.STUDENT)
+
+    # When
+    session.add(user)
+    session.commit()
+    user_id = user.id
+    session.expunge_all()
+
+    # Then
+    prefix, _, stored = user_id.partition("_")
+    assert prefix == "usr"
+    assert UUID(stored).version == 7
+    raw = session.exec(
+        text("SELECT id FROM \"user\" WHERE telegram_id = '900100'")
+    ).scalar()
+    assert str(raw) == stored
+    assert session.get(User, user_id).id == user_id
+
+
+def test_reserved_and_malformed_ids(session: Session):
+    # Given
+    column = PrefixedId("usr")
+
+    # When
+    stored = column.process_bind_param("usr_ai_teacher", None)
+    malformed = session.exec(select(User).where(User.id == "not-an-id")).first()
+
+    # Then
+    assert stored == hashed_uuid("usr_ai_teacher")
+    assert column.process_result_value(stored, None) == "usr_ai_teacher"
+    # Another table's id can't match a user
+    homework_id = f"hw_{uuid7()}"
+    assert column.process_bind_param(homework_id, None) == hashed_uuid(homework_id)
+    assert malformed is None
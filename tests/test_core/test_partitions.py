@@ -0,0 +1,145 @@
+"""
+1. Rows land in the partition of their month, with ids minted at `created_at`
+2. Lookups by id only scan the partition of the id's month
+3. Partitions are created ahead and archived, but not submission partitions
+   that later feedback still points to
+"""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import text
+from sqlmodel import Session, select
+
+from app.db.partitions import (
+    archive_partitions,
+    created_near,
+    ensure_partitions,
+    list_partitions,
+)
+from app.schemas.feedback import Feedback
+from app.schemas.homework import HomeworkTask
+from app.schemas.ids import id_time
+from app.schemas.submission import Submission
+from app.schemas.user import User, UserRole
+
+MARCH = datetime(2025, 3, 4, 5, 6, 7, 890000)
+
+
+@pytest.fixture
+def submission(session: Session) -> Submission:
+    """A submission from March 2025, in its own partition"""
+    ensure_partitions(session.connection(), since=datetime(2025, 1, 1))
+    teacher = User(
+        tg_handle="part_teacher", telegram_id="910001", role=UserRole.TEACHER
+    )
+    student = User(
+        tg_handle="part_student", telegram_id="910002", role=UserRole.STUDENT
+    )
+    session.add_all([teacher, student])
+    session.flush()
+    homework = HomeworkTask(teacher_id=teacher.id, content={"title": "Old term"})
+    session.add(homework)
+    session.flush()
+    submission = Submission(
+        student_id=student.id,
+        teacher_id=teacher.id,
+        homework_task_id=homework.id,
+        content={"text": "Last spring"},
+        created_at=MARCH,
+    )
+    session.add(submission)
+    session.flush()
+    return submission
+
+
+def explain(session: Session, query) -> str:
+    compiled = query.compile(
+        dialect=session.bind.dialect, compile_kwargs={"literal_binds": True}
+    )
+    return "\n".join(session.exec(text(f"EXPLAIN {compiled}")).scalars())
+
+
+def test_rows_go_to_their_month(session: Session, submission: Submission):
+    # When
+    partition = session.exec(
+        text("SELECT tableoid::regclass::text FROM submission WHERE created_at = :at"),
+        params={"at": MARCH},
+    ).scalar()
+
+    # Then
+    assert partition == "submission_2025_03"
+    assert id_time(submission.id) == MARCH.replace(microsecond=890000)
+
+
+def test_id_lookup_prunes_partitions(session: Session, submission: Submission):
+    # Given
+    query = select(Submission).where(
+        Submission.id == submission.id, *created_near(Submission, [submission.id])
+    )
+
+    # When
+    plan = explain(session, query)
+
+    # Then
+    assert "submission_2025_03" in plan
+    assert "submission_2025_04" not in plan
+    assert session.exec(query).one().id == submission.id
+
+    # Ids that carry no time can't be bounded
+    assert created_near(Submission, ["sub_ai_made_up"]) == []
+    assert created_near(Feedback, []) == []
+
+
+def test_ensure_and_archive_partitions(session: Session, submission: Submission):
+    # Given
+    connection = session.connection()
+
+    # When
+    ensure_partitions(connection, since=datetime(2025, 1, 1), months_ahead=6)
+    archived = archive_partitions(
+        connection, datetime(2025, 4, 1), schema="archive_test"
+    )
+
+    # Then
+    months = [month for _, month in list_partitions(connection, "submission")]
+    assert months[0] == datetime(2025, 4, 1)
+    assert len(months) >= 7
+    assert "archive_test.submission_2025_03" in archived
+    assert "archive_test.feedback_2025_01" in archived
+    assert (
+        session.exec(select(Submission).where(Submission.id == submission.id)).all()
+        == []
+    )
+    archived_rows = session.exec(
+        text("SELECT count(*) FROM archive_test.submission_2025_03")
+    ).scalar()
+    assert archived_rows == 1
+
+
+def test_archive_keeps_submissions_with_later_feedback(
+    session: Session, submission: Submission
+):
+    # Given feedback given in May to the March submission
+    connection = session.connection()
+    session.add(
+        Feedback(
+            submission_id=submission.id,
+            teacher_id=submission.teacher_id,
+            student_id=submission.student_id,
+            content={"text": "Late, but good"},
+            created_at=datetime(2025, 5, 2),
+        )
+    )
+    session.flush()
+
+    # When
+    archived = archive_partitions(
+        connection, datetime(2025, 4, 1), schema="archive_test"
+    )
+
+    # Then the submission stays where its feedback can find it
+    assert "archive_test.submission_2025_03" not in archived
+    assert "archive_test.submission_2025_02" in archived
+    assert "archive_test.feedback_2025_03" in archived
+    assert session.exec(select(Submission).where(Submission.id == submission.id)).one()
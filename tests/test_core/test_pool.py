@@ -0,0 +1,82 @@
+"""
+1. Pool options come from the settings
+2. Pool events keep the active/idle/overflow gauges in step
+3. Checkout waits and timeouts are recorded
+"""
+
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.core.config import settings
+from app.db.pool import TimedQueuePool, instrument_pool, pool_options
+
+
+def sample(name, engine="sync"):
+    return REGISTRY.get_sample_value(name, {"engine": engine}) or 0
+
+
+@pytest.fixture
+def small_engine():
+    engine = create_engine(
+        settings.TEST_DATABASE_URL,
+        poolclass=TimedQueuePool,
+        pool_size=1,
+        max_overflow=1,
+        pool_timeout=0.1,
+    )
+    instrument_pool(engine.pool, "sync")
+    yield engine
+    engine.dispose()
+
+
+def test_pool_options_from_settings():
+    # When
+    options = pool_options(async_engine=False)
+
+    # Then
+    assert options["poolclass"] is TimedQueuePool
+    assert options["pool_size"] == settings.DB_POOL_SIZE
+    assert options["max_overflow"] == settings.DB_MAX_OVERFLOW
+    assert options["pool_timeout"] == settings.DB_POOL_TIMEOUT
+    assert options["pool_recycle"] == settings.DB_POOL_RECYCLE
+    assert options["pool_pre_ping"] == settings.DB_POOL_PRE_PING
+
+
+def test_pool_gauges_follow_checkouts(small_engine):
+    # When
+    first = small_engine.connect()
+    second = small_engine.connect()
+
+    # Then
+    assert sample("db_connections_active") == 2
+    assert sample("db_pool_connections_idle") == 0
+    assert sample("db_pool_overflow") == 1
+
+    # When
+    second.close()  # the overflow connection is closed, not kept
+    first.close()
+
+    # Then
+    assert sample("db_connections_active") == 0
+    assert sample("db_pool_connections_idle") == 1
+    assert sample("db_pool_overflow") == 0
+
+
+def test_pool_checkout_wait_and_timeout(small_engine):
+    # Given
+    waits = sample("db_pool_checkout_wait_seconds_count")
+    timeouts = sample("db_pool_checkout_timeouts_total")
+    held = [small_engine.connect(), small_engine.connect()]
+
+    # When
+    with pytest.raises(PoolTimeoutError):
+        small_engine.connect()
+
+    # Then
+    assert sample("db_pool_checkout_wait_seconds_count") == waits + 3
+    assert sample("db_pool_checkout_timeouts_total") == timeouts + 1
+    assert sample("db_pool_checkout_wait_seconds_sum") >= 0.1
+    for connection in held:
+        connection.close()
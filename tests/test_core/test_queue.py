@@ -3,6 +3,7 @@ import json
 from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
+from pika.exceptions import NackError
 
 from app.queue.consumer import TelegramConsumer
 from app.queue.message_types import Message, MessageType
@@ -58,6 +59,43 @@ def test_producer_send_message(producer, mock_channel):
     assert isinstance(call_args.kwargs["body"], str)
 
 
+def test_producer_send_messages_batch(producer, mock_channel):
+    messages = [
+        Message(
+            type=MessageType.HOMEWORK_ASSIGNED,
+            recipient_id=str(recipient_id),
+            data={"title": "Test"},
+        )
+        for recipient_id in range(3)
+    ]
+
+    result = producer.send_messages(messages)
+
+    assert result is True
+    mock_channel.confirm_delivery.assert_called_once()
+    assert mock_channel.basic_publish.call_count == 3
+    mock_channel.tx_select.assert_not_called()
+
+
+def test_producer_send_messages_failure(producer, mock_channel):
+    mock_channel.basic_publish.side_effect = [None, NackError([])]
+    messages = [
+        Message(
+            type=MessageType.HOMEWORK_ASSIGNED,
+            recipient_id=str(recipient_id),
+            data={"title": "Test"},
+        )
+        for recipient_id in range(3)
+    ]
+
+    result = producer.send_messages(messages)
+
+    # The batch stops at the nacked message
+    assert result is False
+    assert mock_channel.basic_publish.call_count == 2
+    assert producer.batch_channel is None
+
+
 def test_consumer_initialization(consumer, mock_channel):
     assert consumer.channel is not None
     mock_channel.queue_declare.assert_called_with(queue="notifications", durable=True)
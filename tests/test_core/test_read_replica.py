@@ -0,0 +1,147 @@
+"""
+1. Read sessions run read-only transactions
+2. Reads stick to the primary for a while after the client wrote
+3. Writes are detected and answered with the `last_write` cookie
+4. The user cache is only filled from the primary
+"""
+
+import inspect
+import time
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlmodel import select
+
+from app.api.endpoints import user as user_endpoints
+from app.core.config import settings
+from app.db.base import (
+    get_async_engine,
+    get_primary_read_db,
+    get_read_db,
+    get_read_engine,
+)
+from app.db.read_your_writes import (
+    LAST_WRITE_COOKIE,
+    mark_write,
+    setup_read_your_writes,
+    wrote_recently,
+)
+from app.schemas.user import User, UserRole
+
+
+def make_request(last_write=None) -> Request:
+    headers = []
+    if last_write is not None:
+        headers.append((b"cookie", f"{LAST_WRITE_COOKIE}={last_write}".encode()))
+    return Request({"type": "http", "headers": headers})
+
+
+@pytest.fixture
+async def read_session():
+    sessions = get_read_db(make_request())
+    yield await sessions.__anext__()
+    await sessions.aclose()
+    await get_async_engine().dispose()
+
+
+async def test_read_session_is_read_only(read_session):
+    # When
+    read_only = await read_session.execute(text("SHOW transaction_read_only"))
+
+    # Then
+    assert read_only.scalar() == "on"
+
+    # When / Then
+    with pytest.raises(DBAPIError, match="read-only transaction"):
+        await read_session.execute(text("CREATE TEMP TABLE scratch (id int)"))
+
+
+def test_recent_write_reads_the_primary():
+    # Given
+    recent = make_request(time.time())
+    stale = make_request(time.time() - settings.READ_YOUR_WRITES_WINDOW - 1)
+
+    # Then
+    assert wrote_recently(recent)
+    assert not wrote_recently(stale)
+    assert not wrote_recently(make_request())
+    assert not wrote_recently(make_request("garbage"))
+
+
+async def test_read_db_routes_by_last_write():
+    # Given
+    recent = get_read_db(make_request(time.time()))
+    fresh = get_read_db(make_request())
+
+    # When
+    sticky_session = await recent.__anext__()
+    replica_session = await fresh.__anext__()
+
+    # Then
+    assert sticky_session.bind is get_read_engine(primary=True)
+    assert replica_session.bind is get_read_engine(primary=False)
+
+    await recent.aclose()
+    await fresh.aclose()
+
+
+async def test_cached_user_lookups_read_the_primary():
+    # Given the endpoints that fill the user cache
+    endpoints = [
+        user_endpoints.get_user_by_telegram_id,
+        user_endpoints.get_user_by_telegram_handle,
+        user_endpoints.get_user_by_id,
+    ]
+
+    # When
+    sessions = get_primary_read_db()
+    session = await sessions.__anext__()
+
+    # Then the primary is read, with no recent write of the client's
+    assert session.bind is get_read_engine(primary=True)
+    for endpoint in endpoints:
+        db = inspect.signature(endpoint).parameters["db"].default
+        assert db.dependency is get_primary_read_db
+
+    await sessions.aclose()
+
+
+def test_writes_are_detected(session):
+    # When
+    session.exec(select(User)).all()
+
+    # Then
+    assert not session.info.get("wrote")
+
+    # When
+    session.add(User(tg_handle="writer", telegram_id="write-1", role=UserRole.STUDENT))
+    session.flush()
+
+    # Then
+    assert session.info["wrote"]
+
+
+def test_write_sets_last_write_cookie():
+    # Given
+    app = setup_read_your_writes(FastAPI())
+
+    @app.post("/write")
+    def write(request: Request):
+        mark_write(request)
+
+    @app.get("/read")
+    def read():
+        pass
+
+    with TestClient(app) as client:
+        # When
+        read_response = client.get("/read")
+        write_response = client.post("/write")
+
+    # Then
+    assert LAST_WRITE_COOKIE not in read_response.cookies
+    last_write = float(write_response.cookies[LAST_WRITE_COOKIE])
+    assert time.time() - last_write < settings.READ_YOUR_WRITES_WINDOW
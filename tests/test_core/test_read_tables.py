@@ -0,0 +1,82 @@
+"""
+1. `rebuild` recomputes the teacher inbox and student dashboard from the
+   source tables
+"""
+
+from sqlmodel import Session, select
+
+from app.db.read_tables import rebuild
+from app.schemas.base import Status
+from app.schemas.homework import HomeworkAssignment, HomeworkTask
+from app.schemas.submission import Submission
+from app.schemas.user import User, UserRole
+from app.schemas.views import StudentDashboard, TeacherInbox
+
+
+def test_rebuild(session: Session):
+    # Given rows written around the endpoints, and a stale inbox row
+    teacher = User(tg_handle="rt_teacher", telegram_id="920001", role=UserRole.TEACHER)
+    student = User(tg_handle="rt_student", telegram_id="920002", role=UserRole.STUDENT)
+    session.add_all([teacher, student])
+    session.flush()
+    homework = HomeworkTask(teacher_id=teacher.id, content={"title": "By hand"})
+    untitled = HomeworkTask(teacher_id=teacher.id, content={})
+    session.add_all([homework, untitled])
+    session.flush()
+    session.add_all(
+        [
+            HomeworkAssignment(homework_id=homework.id, student_id=student.id),
+            HomeworkAssignment(homework_id=untitled.id, student_id=student.id),
+        ]
+    )
+    pending = Submission(
+        student_id=student.id,
+        teacher_id=teacher.id,
+        homework_task_id=homework.id,
+        content={"text": "Pending"},
+    )
+    graded = Submission(
+        student_id=student.id,
+        teacher_id=teacher.id,
+        homework_task_id=homework.id,
+        content={"text": "Graded"},
+        status=Status.COMPLETED,
+    )
+    session.add_all([pending, graded])
+    session.flush()
+    session.add(
+        TeacherInbox(
+            id=graded.id,
+            created_at=graded.created_at,
+            teacher_id=teacher.id,
+            student_id=student.id,
+            student_handle="rt_student",
+            homework_task_id=homework.id,
+            homework_title="By hand",
+            content=graded.content,
+        )
+    )
+    session.flush()
+
+    # When
+    rebuild(session.connection())
+
+    # Then
+    inbox = session.exec(
+        select(TeacherInbox).where(TeacherInbox.teacher_id == teacher.id)
+    ).all()
+    assert [row.id for row in inbox] == [pending.id]
+    assert inbox[0].student_handle == "rt_student"
+    assert inbox[0].homework_title == "By hand"
+    assert inbox[0].submission_preview == "Pending"
+
+    dashboard = session.exec(
+        select(StudentDashboard)
+        .where(StudentDashboard.student_id == student.id)
+        .order_by(StudentDashboard.created_at, StudentDashboard.id)
+    ).all()
+    assert [row.id for row in dashboard] == [homework.id, untitled.id]
+    assert [row.homework_title for row in dashboard] == ["By hand", "Untitled"]
+    assert dashboard[0].teacher_handle == "rt_teacher"
+    assert dashboard[0].teacher_telegram_id == "920001"
+    assert dashboard[0].assignment_status == Status.PENDING
@@ -0,0 +1,36 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from app.api.serialization import dumps, negotiate_encoding
+from app.schemas.user import User, UserRole
+
+
+def test_fast_json_matches_pydantic():
+    user = User(
+        tg_handle="fast_user",
+        telegram_id="1",
+        role=UserRole.TEACHER,
+        meta={"levels": ["A1", "B2"]},
+        created_at=datetime(2026, 1, 2, 3, 4, 5, 678),
+    )
+
+    fast = dumps([user])
+
+    assert json.loads(fast) == [json.loads(user.model_dump_json())]
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        ("gzip, deflate, br", "br"),
+        ("gzip;q=1.0, br;q=0.5", "gzip"),
+        ("br;q=0, gzip", "gzip"),
+        ("*", "br"),
+        ("identity", None),
+        (None, None),
+    ],
+)
+def test_negotiate_encoding(accept_encoding, expected):
+    assert negotiate_encoding(accept_encoding) == expected
@@ -0,0 +1,69 @@
+from unittest.mock import patch
+
+from app.api.user_cache import UserCache
+from app.schemas.user import User, UserRole
+
+
+def make_user(n: int) -> User:
+    return User(tg_handle=f"user_{n}", telegram_id=str(n), role=UserRole.STUDENT)
+
+
+def test_user_cache_lookups():
+    cache = UserCache(max_size=10, ttl=60)
+    user = make_user(1)
+    cache.put(user, cache.version)
+
+    assert cache.get("id", user.id).tg_handle == "user_1"
+    assert cache.get("telegram_id", "1").id == user.id
+    assert cache.get("tg_handle", "user_1").id == user.id
+    assert cache.get("telegram_id", "2") is None
+    assert len(cache) == 1
+
+
+def test_user_cache_evicts_least_recently_used():
+    cache = UserCache(max_size=2, ttl=60)
+    first, second, third = make_user(1), make_user(2), make_user(3)
+    cache.put(first, cache.version)
+    cache.put(second, cache.version)
+
+    cache.get("id", first.id)
+    cache.put(third, cache.version)
+
+    assert cache.get("id", first.id) is not None
+    assert cache.get("id", second.id) is None
+    assert cache.get("tg_handle", "user_2") is None
+    assert cache.get("id", third.id) is not None
+
+
+def test_user_cache_expires_entries():
+    cache = UserCache(max_size=10, ttl=60)
+    user = make_user(1)
+    with patch("app.api.user_cache.time.monotonic", return_value=100):
+        cache.put(user, cache.version)
+        assert cache.get("id", user.id) is not None
+    with patch("app.api.user_cache.time.monotonic", return_value=161):
+        assert cache.get("id", user.id) is None
+    assert len(cache) == 0
+
+
+def test_user_cache_invalidate_drops_old_keys():
+    cache = UserCache(max_size=10, ttl=60)
+    user = make_user(1)
+    cache.put(user, cache.version)
+
+    renamed = user.model_copy(update={"tg_handle": "renamed"})
+    cache.invalidate(renamed)
+
+    assert len(cache) == 0
+    assert cache.get("tg_handle", "user_1") is None
+
+
+def test_user_cache_skips_put_after_invalidation():
+    cache = UserCache(max_size=10, ttl=60)
+    user = make_user(1)
+    version = cache.version
+    cache.invalidate(user)
+
+    cache.put(user, version)
+
+    assert cache.get("id", user.id) is None